@@ -1,17 +1,49 @@
 import streamlit as st
 import pandas as pd
 from src import parsers
-from src.column_utils import extract_column_names, get_standardized_column_name, DEFAULT_MAPPING_RULES
-from src.matcher import find_duplicates 
-import io 
-
-# Helper function to convert DataFrame to Excel for download
-def to_excel(df):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Results')
-    processed_data = output.getvalue()
-    return processed_data
+from src.column_utils import extract_column_names, get_column_mapper, DEFAULT_MAPPING_RULES
+from src.corpus import CorpusRegistry
+from src.dedup import DEDUP_METHODS, find_duplicate_groups
+from src.exporters import EXPORT_FORMATS, ExportCache
+from src.matcher import db_columns_to_load
+from src.incremental import IncrementalMatcher
+from src.instrumentation import MatchStats
+from src.jobs import IncrementalMatchJob, MatchJob
+from src.match_store import MatchStore
+from src.parse_cache import ParseCache, content_hash
+import functools
+import hashlib
+import json
+import os
+import time
+import uuid
+
+@st.cache_resource
+def get_parse_cache():
+    # One on-disk parse cache per server process; unchanged re-uploads are loaded from it
+    return ParseCache()
+
+@st.cache_resource
+def get_match_store():
+    # The persistent store of earlier database files, shared by every session of this server process
+    return MatchStore()
+
+@st.cache_resource
+def get_corpus_registry():
+    # Parsed DB files and their match indexes, shared by every session of this server process
+    return CorpusRegistry()
+
+@st.cache_resource
+def get_export_cache():
+    # Exported result files per server process; each result set is exported once per format
+    return ExportCache()
+
+def read_export(results_df, output_format):
+    # Called by the download button only when it is clicked. The open file is handed over rather than
+    # its bytes, but Streamlit (as of 1.65) still reads it whole into its in-memory media store, so a
+    # download holds one copy of the exported file in RAM; the streaming writers only spare the copies
+    # of the results that building the file in memory would make. The file is closed once it is collected.
+    return open(get_export_cache().get(results_df, output_format), "rb")
 
 def load_client_file(uploaded_file):
     file_name = uploaded_file.name
@@ -19,21 +51,21 @@ def load_client_file(uploaded_file):
 
     if file_name.endswith(('.xlsx', '.xls')):
         st.info(f"Parsing Excel file: {file_name}")
-        parsed_data = parsers.parse_excel(file_content, file_name)
+        parsed_data = get_parse_cache().cached_parse(parsers.parse_excel, file_content, file_name)
         if not parsed_data:
             st.error(f"Failed to parse Excel file: {file_name}. It might be empty, corrupted, or an unsupported format.")
             return None
         return parsed_data
     elif file_name.endswith('.pdf'):
         st.info(f"Parsing PDF file: {file_name}")
-        parsed_data = parsers.parse_pdf(file_content, file_name)
+        parsed_data = get_parse_cache().cached_parse(parsers.parse_pdf, file_content, file_name)
         if not parsed_data: 
             st.warning(f"No tables found or failed to parse PDF file: {file_name}.")
             return [] 
         return parsed_data
     elif file_name.endswith(('.docx', '.doc')):
         st.info(f"Parsing Word file: {file_name}")
-        parsed_data = parsers.parse_word(file_content, file_name)
+        parsed_data = get_parse_cache().cached_parse(parsers.parse_word, file_content, file_name)
         if not parsed_data: 
             st.error(f"Failed to parse Word file: {file_name}. It might be empty, not a valid Word document, or contain no tables.")
             return None
@@ -42,6 +74,123 @@ def load_client_file(uploaded_file):
         st.error(f"Unsupported file type: {file_name}. Please upload .xlsx, .xls, .pdf, .doc, or .docx files.")
         return None
 
+def load_db_columns(db_files):
+    """
+    Second phase of the database load: reads only the match and display columns of every
+    DB file with headers into st.session_state.db_data_collection, with compact dtypes.
+    Files already loaded with the same columns are kept as they are, and files another session
+    has loaded with the same content and columns are taken from the shared corpus registry.
+    """
+    columns = db_columns_to_load(st.session_state.db_headers, st.session_state.selected_client_columns_original,
+                                 st.session_state.selected_db_columns_original, st.session_state.db_display_columns)
+    if columns != st.session_state.db_loaded_columns:
+        st.session_state.db_data_collection = {}
+        st.session_state.db_loaded_columns = columns
+
+    previous_db_data = st.session_state.db_data_collection
+    files_to_load = [(db_file_obj.name, db_file_obj) for db_file_obj in db_files
+                     if db_file_obj.name in st.session_state.db_headers and db_file_obj.name not in previous_db_data]
+    # The cache entry is specific to the column set, so its name includes a digest of the columns
+    columns_digest = hashlib.sha256(json.dumps([str(col) for col in columns]).encode("utf-8")).hexdigest()[:16]
+    kind = f"parse_excel_columns-{columns_digest}"
+    corpus_registry = get_corpus_registry()
+    loaded, corpus_keys, files_to_parse = {}, {}, []
+    for db_file_name, db_file_obj in files_to_load:
+        corpus_keys[db_file_name] = (kind, content_hash(db_file_obj))
+        loaded[db_file_name] = corpus_registry.get(corpus_keys[db_file_name])
+        if loaded[db_file_name] is None:
+            files_to_parse.append((db_file_name, db_file_obj))
+    for _, db_file_name, parsed_db_sheets, _ in get_parse_cache().cached_parse_many(functools.partial(parsers.parse_excel_columns, columns=columns),
+                                                                                     files_to_parse, kind=kind):
+        if parsed_db_sheets:
+            # Another session may have registered the same file meanwhile; put returns the shared copy
+            loaded[db_file_name] = corpus_registry.put(corpus_keys[db_file_name], parsed_db_sheets)
+
+    # The collection keeps upload order
+    st.session_state.db_data_collection = {db_file_name: previous_db_data.get(db_file_name) or loaded.get(db_file_name)
+                                           for db_file_name in st.session_state.db_headers
+                                           if previous_db_data.get(db_file_name) or loaded.get(db_file_name)}
+    hold_corpus_files()
+
+def hold_corpus_files():
+    """
+    Renews this session's hold on the shared corpus files in st.session_state.db_data_collection,
+    so they are not evicted while the session keeps them (and its results) alive.
+    """
+    corpus_registry = get_corpus_registry()
+    corpus_registry.hold(st.session_state.session_key, [corpus_registry.key_of(parsed_db_sheets)
+                                                        for parsed_db_sheets in st.session_state.db_data_collection.values()])
+
+def db_content_key(use_match_store):
+    """
+    content_key for IncrementalMatcher: the content hash of a DB file loaded by this app, from
+    the shared corpus registry (uploads) or the match store, so reloading a file with other
+    display columns keeps its scores. It runs in the job thread, so it does not use session_state.
+    """
+    corpus_registry = get_corpus_registry()
+    match_store = get_match_store() if use_match_store else None
+    def content_key(file_name, sheets_dict):
+        file_key = corpus_registry.key_of(sheets_dict)
+        if file_key is None and match_store is not None:
+            file_key = match_store.key_of(sheets_dict)
+        return file_key[1] if file_key is not None else None
+    return content_key
+
+def collect_db_data(db_files, store_headers):
+    """
+    The database sheets to match against: the uploaded files (loaded by load_db_columns) followed
+    by the stored files in store_headers. The store returns the same frames while a file is unchanged.
+    """
+    load_db_columns(db_files or [])
+    db_data_collection = dict(st.session_state.db_data_collection) if db_files else {}
+    if store_headers:
+        store_columns = db_columns_to_load(store_headers, st.session_state.selected_client_columns_original,
+                                           st.session_state.selected_db_columns_original, st.session_state.db_display_columns)
+        db_data_collection.update(get_match_store().load(store_columns, file_names=list(store_headers)))
+    return db_data_collection
+
+def show_matching_outcome(results_df):
+    if results_df is not None and not results_df.empty:
+        st.success("Matching process completed!")
+    elif results_df is not None and results_df.empty:
+         st.info("Matching process completed. No duplicates found or no client data to process.")
+    else: 
+        st.error("An unexpected issue occurred during matching.")
+
+@st.fragment(run_every=1)
+def show_match_job():
+    """
+    Live view of the background matching job, refreshed every second without rerunning the
+    whole page: progress, throughput and ETA, a cancel button and the results so far.
+    Once the job ends its results become the session's results.
+    """
+    hold_corpus_files() # Fragment reruns skip main(), and a long job must keep its files
+    job = st.session_state.match_job
+    progress = job.progress()
+    if job.finished:
+        st.session_state.results_df = job.results()
+        st.session_state.match_stats = job.stats
+        st.session_state.match_job = None
+        if progress["state"] == "cancelled":
+            st.session_state.match_job_message = ("warning", f"Matching cancelled after {progress['rows_done']:,} of {progress['rows_total']:,} client rows. Partial results are shown.")
+        elif progress["state"] == "failed":
+            st.session_state.match_job_message = ("error", f"Matching failed: {progress['error']}")
+        else:
+            st.session_state.match_job_message = ("done", None)
+        st.rerun() # Redraw the whole page with the results
+        return
+
+    eta = f"{progress['eta_seconds']:.0f}s" if progress["eta_seconds"] is not None else "estimating..."
+    throughput = f"{progress['rows_per_second']:,.0f} rows/s" if progress["rows_per_second"] else "building database indexes..."
+    st.progress(progress["fraction"], text=f"Matched {progress['rows_done']:,} of {progress['rows_total']:,} client rows - {throughput} - ETA {eta}")
+    if st.button("Cancel Matching", key="cancel_match_job"):
+        job.cancel()
+        st.info("Cancelling after the current chunk...")
+    partial_results = job.results()
+    if not partial_results.empty:
+        with st.expander(f"Partial results ({len(partial_results):,} rows so far)", expanded=False):
+            st.dataframe(partial_results)
+
 def main():
     st.title("Scholarship Eligibility Checker")
 
@@ -50,7 +199,10 @@ def main():
 
     # Initialize session state variables
     if 'client_data' not in st.session_state: st.session_state.client_data = None
-    if 'db_data_collection' not in st.session_state: st.session_state.db_data_collection = {}
+    if 'db_data_collection' not in st.session_state: st.session_state.db_data_collection = {} # Loaded (column-projected) sheets per DB file
+    if 'db_headers' not in st.session_state: st.session_state.db_headers = {} # Header and preview rows per DB file
+    if 'db_loaded_columns' not in st.session_state: st.session_state.db_loaded_columns = None
+    if 'db_display_columns' not in st.session_state: st.session_state.db_display_columns = []
     if 'selected_client_columns_original' not in st.session_state: st.session_state.selected_client_columns_original = []
     if 'selected_db_columns_original' not in st.session_state: st.session_state.selected_db_columns_original = []
     if 'results_df' not in st.session_state: st.session_state.results_df = None
@@ -58,18 +210,34 @@ def main():
     if 'last_client_file_name' not in st.session_state: st.session_state.last_client_file_name = None
     if 'last_db_files_count' not in st.session_state: st.session_state.last_db_files_count = 0
     if 'db_files_processed_names' not in st.session_state: st.session_state.db_files_processed_names = []
+    if 'incremental_matcher' not in st.session_state: st.session_state.incremental_matcher = None
+    if 'parse_seconds' not in st.session_state: st.session_state.parse_seconds = {} # Latest client/database parse time, for the statistics panel
+    if 'match_stats' not in st.session_state: st.session_state.match_stats = None
+    if 'match_job' not in st.session_state: st.session_state.match_job = None # Background MatchJob while one runs
+    if 'match_job_message' not in st.session_state: st.session_state.match_job_message = None # (level, message) shown once the job ends
+    if 'dedup_df' not in st.session_state: st.session_state.dedup_df = None # Duplicate groups from the latest within-file search
+    if 'session_key' not in st.session_state: st.session_state.session_key = uuid.uuid4().hex # Identifies this session's hold on the shared corpus
+    # Every rerun counts as activity, so the hold only lapses once the session goes quiet (e.g. a closed tab)
+    hold_corpus_files()
+
+    # Compiled once per rule set; labels below reuse its memoized lookups on every rerun
+    column_mapper = get_column_mapper(DEFAULT_MAPPING_RULES)
 
 
     st.sidebar.header("Upload Files")
     client_file = st.sidebar.file_uploader("Upload Client File (.xlsx, .xls, .pdf, .doc, .docx)", type=['xlsx', 'xls', 'pdf', 'doc', 'docx'], key="client_uploader")
     db_files = st.sidebar.file_uploader("Upload Database Excel Files (.xlsx, .xls)", type=['xlsx', 'xls'], accept_multiple_files=True, key="db_uploader")
+    use_match_store = st.sidebar.checkbox("Use the persistent database store", value=False, key="use_match_store",
+                                          help="Also match against database files stored in earlier sessions, without uploading them again. Uploaded files can be added to the store.")
 
     # --- Client File Section ---
     if client_file:
         # Re-process client file if it's new or hasn't been processed yet
         if not st.session_state.client_file_processed or st.session_state.last_client_file_name != client_file.name:
             st.subheader("Client File Processing")
+            parse_start = time.perf_counter()
             st.session_state.client_data = load_client_file(client_file)
+            st.session_state.parse_seconds['client'] = time.perf_counter() - parse_start
             st.session_state.selected_client_columns_original = [] 
             st.session_state.results_df = None 
             st.session_state.client_file_processed = True
@@ -121,7 +289,7 @@ def main():
                 if not client_all_columns:
                     st.warning("No columns found in the client file to select.")
                 else:
-                    client_column_options = {f"{original_col} (Std: {get_standardized_column_name(original_col, DEFAULT_MAPPING_RULES)})": original_col for original_col in client_all_columns}
+                    client_column_options = {f"{original_col} (Std: {column_mapper.standardize(original_col)})": original_col for original_col in client_all_columns}
                     selected_display = st.multiselect("Select 1 or 2 client columns:", options=list(client_column_options.keys()), max_selections=2, key="client_cols_select_ms", default=[k for k,v in client_column_options.items() if v in st.session_state.selected_client_columns_original])
                     st.session_state.selected_client_columns_original = [client_column_options[disp_name] for disp_name in selected_display]
                     if st.session_state.selected_client_columns_original:
@@ -131,39 +299,59 @@ def main():
 
 
     # --- Database Files Section ---
+    # Database workbooks are loaded in two phases: only headers and a short preview here, and only
+    # the columns needed for matching and display once matching runs (see load_db_columns)
     if db_files:
         current_db_file_names = sorted([f.name for f in db_files])
-        # Re-process DB files if the list of files changes or if no DB data is currently loaded
-        if st.session_state.db_files_processed_names != current_db_file_names or not st.session_state.db_data_collection:
+        # Re-read DB headers if the list of files changes or if no headers are currently loaded
+        if st.session_state.db_files_processed_names != current_db_file_names or not st.session_state.db_headers:
             st.subheader("Database Files Processing")
-            st.session_state.db_data_collection = {} 
-            st.session_state.selected_db_columns_original = [] 
+            # Files that are still uploaded keep their headers and loaded columns (and the incremental matcher its scores for them)
+            previous_db_headers = st.session_state.db_headers
+            st.session_state.db_headers = {}
+            st.session_state.db_data_collection = {name: sheets for name, sheets in st.session_state.db_data_collection.items()
+                                                   if name in current_db_file_names}
             st.session_state.results_df = None 
             
             processed_db_count = 0
-            for db_file_obj in db_files:
-                st.write(f"Processing database file: {db_file_obj.name}...")
-                parsed_db_sheets = parsers.parse_excel(db_file_obj, db_file_obj.name)
-                if parsed_db_sheets and any(not df.empty for df in parsed_db_sheets.values()):
-                    st.session_state.db_data_collection[db_file_obj.name] = parsed_db_sheets
+            header_db_files = [previous_db_headers.get(db_file_obj.name) for db_file_obj in db_files]
+            new_db_files = [(position, db_file_obj) for position, db_file_obj in enumerate(db_files) if header_db_files[position] is None]
+            st.write(f"Reading headers of {len(new_db_files)} new database file(s)...")
+            parse_progress = st.progress(0.0)
+            # Files are read concurrently and reported as each one finishes
+            db_file_list = [(db_file_obj.name, db_file_obj) for _, db_file_obj in new_db_files]
+            parse_start = time.perf_counter()
+            for done_count, (new_position, db_file_name, db_sheet_headers, from_cache) in enumerate(get_parse_cache().cached_parse_many(parsers.parse_excel_headers, db_file_list), start=1):
+                position = new_db_files[new_position][0]
+                header_db_files[position] = db_sheet_headers
+                source_note = " (from cache)" if from_cache else ""
+                if db_sheet_headers and any(not df.empty for df in db_sheet_headers.values()):
+                    st.success(f"Read: {db_file_name}{source_note} - found {len(db_sheet_headers)} sheet(s) with data.")
+                elif db_sheet_headers: # Parsed but all sheets are empty
+                     st.warning(f"Read: {db_file_name}, but all sheets are empty.")
+                # else: parse_excel_headers already logs error
+                parse_progress.progress(done_count / len(new_db_files), text=f"Read {done_count} of {len(new_db_files)} new database file(s)")
+
+            st.session_state.parse_seconds['database'] = time.perf_counter() - parse_start
+
+            # The headers keep upload order, whatever order the files finished in
+            for db_file_obj, db_sheet_headers in zip(db_files, header_db_files):
+                if db_sheet_headers and any(not df.empty for df in db_sheet_headers.values()):
+                    st.session_state.db_headers[db_file_obj.name] = db_sheet_headers
                     processed_db_count += 1
-                    st.success(f"Parsed: {db_file_obj.name} - found {len(parsed_db_sheets)} sheet(s) with data.")
-                elif parsed_db_sheets: # Parsed but all sheets are empty
-                     st.warning(f"Parsed: {db_file_obj.name}, but all sheets are empty.")
-                # else: parse_excel already logs error
 
             st.session_state.db_files_processed_names = current_db_file_names
             st.session_state.last_db_files_count = len(db_files) # Though name check is more robust
             
-            if st.session_state.db_data_collection:
-                 st.info(f"Total {processed_db_count} database file(s) successfully parsed with data.")
+            if st.session_state.db_headers:
+                 st.info(f"Total {processed_db_count} database file(s) successfully read with data.")
             elif db_files: # Files were uploaded, but none yielded data
                 st.warning("Uploaded database files were processed, but none contained usable data or tables after parsing.")
             # If no db_files were uploaded, no message is needed here for DB processing
 
-        if st.session_state.db_data_collection:
+        if st.session_state.db_headers:
             with st.expander("Show Database Files Preview", expanded=False): # Default to collapsed
-                for db_file_name, sheets_data in st.session_state.db_data_collection.items():
+                for db_file_name, sheets_data in st.session_state.db_headers.items():
                     st.subheader(f"Preview of database file: {db_file_name}")
                     if not sheets_data:
                         st.markdown("*No sheets found or all sheets are empty in this file.*")
@@ -175,49 +363,115 @@ def main():
                         else:
                              st.markdown(f"Sheet: *{sheet_name}* is empty.")
             
-            st.subheader("Select Database Columns for Matching")
-            all_db_dfs = [df for file_data in st.session_state.db_data_collection.values() for df in file_data.values() if isinstance(df, pd.DataFrame) and not df.empty]
-            if not all_db_dfs:
-                st.warning("No data tables with columns found in the parsed database files for selection.")
+    # --- Persistent Database Store Section ---
+    # Stored files keep only their match and selected display columns; uploaded files with the same name take precedence
+    store_headers = {}
+    if use_match_store:
+        match_store = get_match_store()
+        st.subheader("Persistent Database Store")
+        if db_files and st.button("Add uploaded database files to the store", key="store_add_button"):
+            store_columns = st.session_state.selected_db_columns_original + st.session_state.db_display_columns
+            with st.spinner("Storing database files..."):
+                for db_file_obj in db_files:
+                    if match_store.ingest_file(db_file_obj.name, db_file_obj, parse_cache=get_parse_cache(), columns=store_columns):
+                        st.success(f"Stored: {db_file_obj.name}")
+                    else:
+                        st.info(f"Unchanged or unreadable, not stored again: {db_file_obj.name}")
+        stored_files = match_store.files()
+        if stored_files.empty:
+            st.info("The store is empty. Upload database files and add them to the store to match against them in later sessions.")
+        else:
+            with st.expander(f"Stored database files ({len(stored_files)})", expanded=False):
+                st.caption(f"Store: {match_store.path}")
+                st.dataframe(stored_files, hide_index=True)
+                files_to_remove = st.multiselect("Remove files from the store:", options=stored_files['file_name'].tolist(), key="store_remove_ms")
+                if files_to_remove and st.button("Remove selected files", key="store_remove_button"):
+                    for file_name in files_to_remove:
+                        match_store.remove_file(file_name)
+                    st.rerun()
+        uploaded_db_file_names = {db_file_obj.name for db_file_obj in db_files} if db_files else set()
+        store_headers = {file_name: sheets for file_name, sheets in match_store.headers().items() if file_name not in uploaded_db_file_names}
+
+    # --- Database Column Selection (uploaded files and, if used, the match store) ---
+    uploaded_db_headers = st.session_state.db_headers if db_files else {}
+    if uploaded_db_headers or store_headers:
+        st.subheader("Select Database Columns for Matching")
+        all_db_dfs = [df for file_data in uploaded_db_headers.values() for df in file_data.values() if isinstance(df, pd.DataFrame) and not df.empty]
+        all_db_dfs += [df for file_data in store_headers.values() for df in file_data.values()] # Stored sheets have columns but no preview rows
+        if not all_db_dfs:
+            st.warning("No data tables with columns found in the parsed database files for selection.")
+        else:
+            db_all_columns = extract_column_names(all_db_dfs)
+            if not db_all_columns:
+                st.warning("No columns found in the database files to select.")
             else:
-                db_all_columns = extract_column_names(all_db_dfs)
-                if not db_all_columns:
-                    st.warning("No columns found in the database files to select.")
-                else:
-                    db_column_options = {f"{original_col} (Std: {get_standardized_column_name(original_col, DEFAULT_MAPPING_RULES)})": original_col for original_col in db_all_columns}
-                    selected_db_display = st.multiselect("Select 1 or 2 database columns:", options=list(db_column_options.keys()), max_selections=2, key="db_cols_select_ms", default=[k for k,v in db_column_options.items() if v in st.session_state.selected_db_columns_original])
-                    st.session_state.selected_db_columns_original = [db_column_options[disp_name] for disp_name in selected_db_display]
-                    if st.session_state.selected_db_columns_original:
-                        st.info(f"Selected database columns: {', '.join(st.session_state.selected_db_columns_original)}")
+                db_column_options = {f"{original_col} (Std: {column_mapper.standardize(original_col)})": original_col for original_col in db_all_columns}
+                selected_db_display = st.multiselect("Select 1 or 2 database columns:", options=list(db_column_options.keys()), max_selections=2, key="db_cols_select_ms", default=[k for k,v in db_column_options.items() if v in st.session_state.selected_db_columns_original])
+                st.session_state.selected_db_columns_original = [db_column_options[disp_name] for disp_name in selected_db_display]
+                if st.session_state.selected_db_columns_original:
+                    st.info(f"Selected database columns: {', '.join(st.session_state.selected_db_columns_original)}")
+                st.session_state.db_display_columns = st.multiselect("Additional database columns to load for display (optional):", options=db_all_columns, key="db_display_cols_ms",
+                                                                     default=[col for col in st.session_state.db_display_columns if col in db_all_columns],
+                                                                     help="Only the matching columns and these are loaded from the database files, which keeps memory low for wide workbooks.")
 
     # --- Matching Section ---
     st.header("Run Matching")
     can_run_matching = (st.session_state.client_data is not None and \
-                        st.session_state.db_data_collection and \
+                        (st.session_state.db_headers or store_headers) and \
                         len(st.session_state.selected_client_columns_original) > 0 and \
                         len(st.session_state.selected_db_columns_original) > 0)
 
     if not can_run_matching:
-        st.warning("Please upload client and database files, ensure they are parsed successfully, and select columns for matching from both.")
+        st.warning("Please upload client and database files (or use the persistent database store), ensure they are parsed successfully, and select columns for matching from both.")
 
     fuzzy_threshold = st.slider("Fuzzy Match Sensitivity (0-100)", min_value=0, max_value=100, value=85, key="fuzzy_slider")
+    match_workers = st.number_input("Worker processes for matching", min_value=1, max_value=os.cpu_count() or 1, value=1, key="match_workers",
+                                    help="Values above 1 split the client rows and database sheets across several processes. Used when incremental re-matching is off.")
+    incremental_matching = st.checkbox("Incremental re-matching", value=True, key="incremental_matching",
+                                       help="Keep match scores between runs: after adding database files only unmatched rows are checked against them, after removing files only the rows that matched them are re-checked, and threshold changes reuse earlier scores.")
+    best_match_mode = st.checkbox("Report best matches with scores", value=False, key="best_match_mode",
+                                  help="Score every database sheet and report the best candidates with their score, file, sheet and row, plus the display columns of the best match. Slower than stopping at the first match; incremental re-matching and worker processes are not used.")
+    top_k = st.number_input("Candidates per client row", min_value=1, max_value=5, value=1, key="top_k", disabled=not best_match_mode)
+    field_match_plan = st.checkbox("Match identifier columns exactly", value=False, key="field_match_plan", disabled=best_match_mode,
+                                   help="Roll/application numbers, mobile numbers and emails among the selected columns are compared exactly (ignoring spaces, dashes and country codes), and only the other columns, such as names, are fuzzy matched for the rows whose identifier is not found. Much faster when most rows have an identifier. Incremental re-matching is not used.")
+    field_match_plan = field_match_plan and not best_match_mode
+
+    if st.button("Run Matching", disabled=not can_run_matching or st.session_state.match_job is not None):
+        match_stats = MatchStats()
+        with st.spinner("Loading the selected database columns..."):
+            with match_stats.timer("parse"):
+                db_data_collection = collect_db_data(db_files, store_headers)
+        match_stats.add_time("parse", sum(st.session_state.parse_seconds.values()))
+        st.session_state.results_df = None
+        st.session_state.match_stats = None
+        # Matching runs as a background job, so the page stays responsive and the run can be watched and cancelled
+        if incremental_matching and not best_match_mode and not field_match_plan:
+            # Re-runs only score what changed; the first run scores everything
+            matcher = st.session_state.incremental_matcher
+            if matcher is None or not matcher.is_for(st.session_state.client_data, st.session_state.selected_client_columns_original,
+                                                     st.session_state.selected_db_columns_original):
+                matcher = IncrementalMatcher(st.session_state.client_data, st.session_state.selected_client_columns_original,
+                                             st.session_state.selected_db_columns_original, index_builder=get_corpus_registry().match_indexes,
+                                             content_key=db_content_key(use_match_store))
+                st.session_state.incremental_matcher = matcher
+            st.session_state.match_job = IncrementalMatchJob(matcher, db_data_collection, fuzzy_threshold, stats=match_stats).start()
+        else:
+            match_kwargs = dict(fuzzy_threshold=fuzzy_threshold, match_mode="best", top_k=int(top_k),
+                                db_detail_columns=st.session_state.db_display_columns) if best_match_mode \
+                           else dict(fuzzy_threshold=fuzzy_threshold, workers=int(match_workers), match_plan="fields" if field_match_plan else "combined")
+            st.session_state.match_job = MatchJob(st.session_state.client_data, st.session_state.selected_client_columns_original,
+                                                  db_data_collection, st.session_state.selected_db_columns_original,
+                                                  stats=match_stats, index_builder=get_corpus_registry().match_indexes, **match_kwargs).start()
 
-    if st.button("Run Matching", disabled=not can_run_matching):
-        with st.spinner("Finding duplicates... This may take a while."):
-            st.session_state.results_df = find_duplicates(
-                client_data_parsed=st.session_state.client_data,
-                selected_client_columns_original=st.session_state.selected_client_columns_original,
-                db_data_parsed=st.session_state.db_data_collection,
-                selected_db_columns_original=st.session_state.selected_db_columns_original,
-                fuzzy_threshold=fuzzy_threshold
-            )
-        
-        if st.session_state.results_df is not None and not st.session_state.results_df.empty:
-            st.success("Matching process completed!")
-        elif st.session_state.results_df is not None and st.session_state.results_df.empty:
-             st.info("Matching process completed. No duplicates found or no client data to process.")
-        else: 
-            st.error("An unexpected issue occurred during matching.")
+    if st.session_state.match_job is not None:
+        show_match_job()
+    if st.session_state.match_job_message is not None:
+        level, message = st.session_state.match_job_message
+        st.session_state.match_job_message = None
+        if level == "done":
+            show_matching_outcome(st.session_state.results_df)
+        else:
+            getattr(st, level)(message)
 
     if st.session_state.results_df is not None and not st.session_state.results_df.empty:
         st.subheader("Matching Results")
@@ -234,10 +488,51 @@ def main():
         st.write(f"Number of 'Not Found': {not_found}")
         if skipped > 0: st.write(f"Number of client entries skipped (empty data): {skipped}")
 
-        excel_data = to_excel(st.session_state.results_df)
-        st.download_button(label="Export Results to Excel", data=excel_data, file_name="matching_results.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", key="export_button")
+        if st.session_state.match_stats is not None:
+            with st.expander("Matching Statistics", expanded=False):
+                st.write("Time per stage (parse is the latest client and database file parsing):")
+                st.dataframe(st.session_state.match_stats.timings_frame(), hide_index=True)
+                st.write("Counters:")
+                st.dataframe(st.session_state.match_stats.counters_frame(), hide_index=True)
+                corpus = get_corpus_registry().summary()
+                st.caption(f"Shared database cache: {corpus['files']} file(s) and {corpus['indexes']} match index set(s) in {corpus['mb']} of "
+                           f"{corpus['max_mb']} MB, used by {corpus['sessions']} session(s).")
+
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS), key="export_format_sb",
+                                     help="xlsx for Excel; csv and parquet are faster to write and open for large result sets.")
+        extension, mime = EXPORT_FORMATS[export_format]
+        st.download_button(label=f"Export Results ({extension})", data=functools.partial(read_export, st.session_state.results_df, export_format),
+                           file_name=f"matching_results.{extension}", mime=mime, key="export_button")
     elif st.session_state.results_df is not None and st.session_state.results_df.empty:
         st.info("No results to display or export from the latest matching run.")
 
+    # --- Duplicates Within Files Section ---
+    st.header("Find Duplicates Within Files")
+    st.write("Groups rows that refer to the same person inside the client file, or across the database files (e.g. repeat beneficiaries over the years).")
+    dedup_sources = {"Client file": "client", "Database files": "database"}
+    dedup_source = dedup_sources[st.radio("Search in:", options=list(dedup_sources), key="dedup_source_radio", horizontal=True)]
+    dedup_columns = st.session_state.selected_client_columns_original if dedup_source == "client" else st.session_state.selected_db_columns_original
+    can_run_dedup = bool(dedup_columns) and (st.session_state.client_data is not None if dedup_source == "client"
+                                             else bool(st.session_state.db_headers or store_headers))
+    dedup_method = st.selectbox("Method", options=list(DEDUP_METHODS), key="dedup_method_sb",
+                                help="sorted_neighbourhood compares each name with its nearest names in a few sort orders and scales to very large files; blocked compares names sharing enough character trigrams, which finds more misspellings but is slower.")
+    if not can_run_dedup:
+        st.info("Load the client or database files and select their matching columns above to search them for duplicates.")
+    if st.button("Find Duplicate Groups", disabled=not can_run_dedup, key="dedup_button"):
+        with st.spinner("Finding duplicate groups..."):
+            dedup_data = st.session_state.client_data if dedup_source == "client" else collect_db_data(db_files, store_headers)
+            st.session_state.dedup_df = find_duplicate_groups(dedup_data, dedup_columns, fuzzy_threshold=fuzzy_threshold, method=dedup_method)
+
+    dedup_df = st.session_state.dedup_df
+    if dedup_df is not None and not dedup_df.empty:
+        st.write(f"Found {dedup_df['cluster_id'].nunique():,} duplicate group(s) covering {len(dedup_df):,} rows. Rows with the same cluster_id belong together.")
+        st.dataframe(dedup_df)
+        dedup_format = st.selectbox("Export format", list(EXPORT_FORMATS), key="dedup_export_format_sb")
+        extension, mime = EXPORT_FORMATS[dedup_format]
+        st.download_button(label=f"Export Duplicate Groups ({extension})", data=functools.partial(read_export, dedup_df, dedup_format),
+                           file_name=f"duplicate_groups.{extension}", mime=mime, key="dedup_export_button")
+    elif dedup_df is not None:
+        st.info("No duplicate groups found.")
+
 if __name__ == "__main__":
     main()
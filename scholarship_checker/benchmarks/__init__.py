@@ -0,0 +1 @@
+# Benchmarks for the parsing and matching pipeline. Run them from the scholarship_checker directory.
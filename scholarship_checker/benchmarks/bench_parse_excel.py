@@ -0,0 +1,94 @@
+"""
+Parse time and peak memory of parsers.parse_excel, before and after the single-pass rewrite.
+
+Usage (from the scholarship_checker directory):
+    python -m benchmarks.bench_parse_excel --rows 200000
+
+Each variant runs in a fresh subprocess so peak RSS (which also covers memory
+allocated outside Python, e.g. by calamine) is measured independently.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from src import parsers
+
+def generate_workbook(path, rows, sheets=2):
+    """
+    Writes an xlsx with `sheets` sheets of `rows // sheets` scholarship-like rows each.
+    """
+    from openpyxl import Workbook
+    rng = random.Random(42)
+    workbook = Workbook(write_only=True)
+    rows_per_sheet = rows // sheets
+    for sheet_number in range(sheets):
+        sheet = workbook.create_sheet(f"Year_{2020 + sheet_number}")
+        sheet.append(["Student Name", "Father's Name", "Roll No", "Mobile No", "Amount"])
+        for i in range(rows_per_sheet):
+            sheet.append([f"Student {rng.randrange(10**6)}", f"Father {rng.randrange(10**6)}",
+                          f"{2020 + sheet_number}UCS{i:06d}", 9000000000 + rng.randrange(10**9), rng.randrange(5000, 50000)])
+    workbook.save(path)
+
+def parse_excel_baseline(file_content, file_name):
+    """
+    The previous parse_excel: a copy of the upload, then one read_excel call per sheet.
+    """
+    file_content = io.BytesIO(file_content.getvalue())
+    xls = pd.ExcelFile(file_content)
+    return {sheet_name: pd.read_excel(xls, sheet_name=sheet_name) for sheet_name in xls.sheet_names}
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KiB on Linux
+
+def run_variant(variant, path):
+    with open(path, "rb") as f:
+        upload = io.BytesIO(f.read())
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    if variant == "baseline":
+        sheets = parse_excel_baseline(upload, path)
+    else:
+        parsers.CALAMINE_AVAILABLE = variant == "calamine"
+        sheets = parsers.parse_excel(upload, path)
+    seconds = time.perf_counter() - start
+    return {"variant": variant, "seconds": round(seconds, 3), "rows": sum(len(df) for df in sheets.values()),
+            "peak_rss_mb": round(_peak_rss_mb(), 1), "parse_rss_mb": round(_peak_rss_mb() - rss_before, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--file", help="Existing xlsx to parse instead of a generated one.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_variant(args.child, args.file)))
+        return
+
+    path = args.file
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), f"bench_parse_excel_{args.rows}.xlsx")
+        if not os.path.exists(path):
+            print(f"Generating {args.rows}-row workbook at {path} ...", file=sys.stderr)
+            generate_workbook(path, args.rows)
+
+    variants = ["baseline", "openpyxl"] + (["calamine"] if parsers.CALAMINE_AVAILABLE else [])
+    print(f"{'variant':<10} {'rows':>8} {'seconds':>9} {'parse RSS MB':>13} {'peak RSS MB':>12}")
+    for variant in variants:
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_parse_excel", "--child", variant, "--file", path],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{result['variant']:<10} {result['rows']:>8} {result['seconds']:>9.3f} {result['parse_rss_mb']:>13.1f} {result['peak_rss_mb']:>12.1f}")
+
+if __name__ == "__main__":
+    main()
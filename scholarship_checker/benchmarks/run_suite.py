@@ -0,0 +1,204 @@
+"""
+Times and memory-profiles the parsing and matching pipeline on synthetic scholarship data
+and writes the results to a JSON file, so runs from different versions can be compared.
+
+Usage (from the scholarship_checker directory):
+    python -m benchmarks.run_suite --sizes 1000 10000 100000 1000000 --output bench.json
+    python -m benchmarks.run_suite --sizes 1000 10000 --compare old_bench.json --output new_bench.json
+
+Cases: parse_excel, parse_pdf, parse_word, clean_column_values, find_duplicates. Every
+(case, size) runs in a fresh subprocess, so its peak RSS is measured on its own; cases
+that exceed --timeout are recorded with status "timeout" instead of stopping the suite.
+Input files are generated once per (size, seed) into --data-dir and reused across runs.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+CASES = ("parse_excel", "parse_pdf", "parse_word", "clean_column_values", "find_duplicates")
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KiB on Linux
+
+def _data_path(data_dir, rows, seed, kind):
+    return os.path.join(data_dir, f"scholarship_{rows}_{seed}.{kind}")
+
+def prepare_inputs(case, rows, seed, data_dir):
+    """
+    Generates the input file(s) a case needs unless they already exist in data_dir.
+    """
+    from benchmarks import synthetic
+    if case == "find_duplicates":
+        paths = [_data_path(data_dir, rows, seed, "client.xlsx")] + [_data_path(data_dir, rows, seed, f"db{i}.xlsx") for i in range(2)]
+        if not all(os.path.exists(path) for path in paths):
+            client, db_data = synthetic.make_client_and_db(rows, seed=seed, db_files=2)
+            synthetic.write_xlsx(paths[0], {"Sheet1": client})
+            for path, sheets in zip(paths[1:], db_data.values()):
+                synthetic.write_xlsx(path, sheets)
+        return
+    kind = {"parse_excel": "xlsx", "parse_pdf": "pdf", "parse_word": "docx", "clean_column_values": "xlsx"}[case]
+    path = _data_path(data_dir, rows, seed, kind)
+    if not os.path.exists(path):
+        students = synthetic.generate_students(rows, seed=seed)
+        if kind == "xlsx":
+            synthetic.write_xlsx(path, {"Sheet1": students})
+        elif kind == "pdf":
+            synthetic.write_pdf(path, students)
+        else:
+            synthetic.write_docx(path, students)
+
+def run_case(case, rows, seed, data_dir, blocking=None):
+    """
+    Runs one case in this process and returns its measurements. Input loading is not timed.
+    """
+    import logging
+    logging.disable(logging.INFO) # Per-sheet INFO logging would dominate small cases
+    from src import parsers
+    from src.column_utils import clean_column_values
+    from src.matcher import find_duplicates
+    from src.blocking import BlockingConfig
+
+    extra = {}
+    if case in ("parse_excel", "parse_pdf", "parse_word"):
+        kind = {"parse_excel": "xlsx", "parse_pdf": "pdf", "parse_word": "docx"}[case]
+        path = _data_path(data_dir, rows, seed, kind)
+        with open(path, "rb") as f:
+            upload = io.BytesIO(f.read())
+        extra["file_mb"] = round(os.path.getsize(path) / 2**20, 2)
+        parse_func = getattr(parsers, case)
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        parsed = parse_func(upload, os.path.basename(path))
+        seconds = time.perf_counter() - start
+        tables = parsed.values() if isinstance(parsed, dict) else parsed
+        extra["rows_out"] = sum(len(df) for df in tables)
+    elif case == "clean_column_values":
+        with open(_data_path(data_dir, rows, seed, "xlsx"), "rb") as f:
+            series = parsers.parse_excel(io.BytesIO(f.read()), "students.xlsx")["Sheet1"]["Student Name"] # Dtype as parsed
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        clean_column_values(series)
+        seconds = time.perf_counter() - start
+    else:
+        def load(kind):
+            with open(_data_path(data_dir, rows, seed, kind), "rb") as f:
+                return parsers.parse_excel(io.BytesIO(f.read()), kind)
+        client = load("client.xlsx")
+        db_data = {f"db{i}.xlsx": load(f"db{i}.xlsx") for i in range(2)}
+        blocking_config = BlockingConfig(strategy=blocking) if blocking else None
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        results = find_duplicates(client, ["Applicant Name"], db_data, ["Student Name"], fuzzy_threshold=85, blocking=blocking_config)
+        seconds = time.perf_counter() - start
+        extra["duplicates_found"] = int((results["status"] == "Duplicate Found").sum())
+        extra["blocking"] = blocking
+        extra["stage_timings"] = results.attrs.get("match_stats", {}).get("timings")
+
+    return {"case": case, "rows": rows, "status": "ok", "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds) if seconds else None,
+            "peak_rss_mb": round(_peak_rss_mb(), 1), "case_rss_mb": round(_peak_rss_mb() - rss_before, 1), **extra}
+
+def environment_info():
+    """
+    Versions and machine details recorded with every result file.
+    """
+    import numpy
+    import pandas
+    import rapidfuzz
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    from src import parsers
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "rapidfuzz": rapidfuzz.__version__,
+        "calamine": parsers.CALAMINE_AVAILABLE,
+    }
+
+def compare(results, baseline_path):
+    """
+    Prints seconds and peak RSS against a previous result file, matched on (case, rows).
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["case"], r["rows"]): r for r in json.load(f)["results"]}
+    print(f"\n{'case':<20} {'rows':>9} {'seconds':>10} {'baseline':>10} {'ratio':>7} {'RSS MB':>8} {'baseline':>9}")
+    for result in results:
+        old = baseline.get((result["case"], result["rows"]))
+        if result["status"] != "ok" or old is None or old["status"] != "ok":
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        print(f"{result['case']:<20} {result['rows']:>9} {result['seconds']:>10.3f} {old['seconds']:>10.3f} {ratio:>7.2f} "
+              f"{result['case_rss_mb']:>8.1f} {old['case_rss_mb']:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "scholarship_bench_data"))
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds allowed per case (default: 1800)")
+    parser.add_argument("--blocking", choices=("trigram", "prefix", "digits"), help="Blocking strategy for find_duplicates")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(args.child[0], int(args.child[1]), args.seed, args.data_dir, args.blocking)))
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = []
+    print(f"{'case':<20} {'rows':>9} {'seconds':>10} {'case RSS MB':>12} {'peak RSS MB':>12}")
+    for rows in args.sizes:
+        for case in args.cases:
+            start = time.perf_counter()
+            prepare_inputs(case, rows, args.seed, args.data_dir)
+            generate_seconds = time.perf_counter() - start
+            if generate_seconds > 1:
+                print(f"  (generated {case} input for {rows} rows in {generate_seconds:.1f}s)", file=sys.stderr)
+
+            command = [sys.executable, "-m", "benchmarks.run_suite", "--child", case, str(rows),
+                       "--seed", str(args.seed), "--data-dir", args.data_dir] + (["--blocking", args.blocking] if args.blocking else [])
+            try:
+                completed = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+                if completed.returncode == 0:
+                    result = json.loads(completed.stdout.strip().splitlines()[-1])
+                else:
+                    result = {"case": case, "rows": rows, "status": "error", "error": completed.stderr.strip().splitlines()[-1:]}
+            except subprocess.TimeoutExpired:
+                result = {"case": case, "rows": rows, "status": "timeout", "timeout_seconds": args.timeout}
+            results.append(result)
+
+            if result["status"] == "ok":
+                print(f"{case:<20} {rows:>9} {result['seconds']:>10.3f} {result['case_rss_mb']:>12.1f} {result['peak_rss_mb']:>12.1f}")
+            else:
+                print(f"{case:<20} {rows:>9} {result['status']:>10}")
+
+            # Written after every case, so a long run that is interrupted still leaves its results
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"environment": environment_info(), "results": results}, f, indent=2)
+
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Synthetic scholarship data for benchmarks: Indian student and father's names, roll
+numbers, mobile numbers and realistic data-entry typos, written as xlsx, PDF or docx.
+
+Generation is seeded, so the same (rows, seed) always gives the same files.
+"""
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+MALE_FIRST_NAMES = [
+    "Aarav", "Abhishek", "Aditya", "Ajay", "Akash", "Amit", "Anil", "Ankit", "Arjun", "Arun", "Ashok", "Deepak",
+    "Dinesh", "Gaurav", "Harsh", "Hemant", "Karan", "Kunal", "Manish", "Manoj", "Mohit", "Mukesh", "Naveen",
+    "Nikhil", "Pankaj", "Pradeep", "Prakash", "Rahul", "Rajesh", "Rakesh", "Ramesh", "Ravi", "Rohit", "Sachin",
+    "Sandeep", "Sanjay", "Saurabh", "Shubham", "Siddharth", "Sunil", "Suresh", "Tarun", "Varun", "Vijay",
+    "Vikas", "Vikram", "Vinod", "Vishal", "Yash", "Mohammed", "Imran", "Harpreet", "Gurpreet", "Venkatesh",
+    "Srinivas", "Subramanian", "Karthik", "Arvind", "Debashish", "Sourav",
+]
+FEMALE_FIRST_NAMES = [
+    "Aishwarya", "Ananya", "Anjali", "Ankita", "Anusha", "Aarti", "Deepika", "Divya", "Isha", "Jyoti", "Kavita",
+    "Khushi", "Komal", "Lakshmi", "Meera", "Megha", "Neha", "Nisha", "Pooja", "Priya", "Priyanka", "Radhika",
+    "Rani", "Riya", "Sakshi", "Shalini", "Shreya", "Simran", "Sneha", "Sonal", "Sunita", "Swati", "Tanvi",
+    "Usha", "Vandana", "Fatima", "Ayesha", "Manpreet", "Revathi", "Sangeetha", "Moumita",
+]
+SURNAMES = [
+    "Sharma", "Verma", "Gupta", "Kumar", "Singh", "Yadav", "Mishra", "Pandey", "Tiwari", "Chauhan", "Jain",
+    "Agarwal", "Bansal", "Mehta", "Shah", "Patel", "Desai", "Joshi", "Kulkarni", "Deshpande", "Patil", "Reddy",
+    "Rao", "Naidu", "Iyer", "Iyengar", "Nair", "Menon", "Pillai", "Das", "Banerjee", "Chatterjee", "Mukherjee",
+    "Ghosh", "Bose", "Sen", "Khan", "Ansari", "Qureshi", "Sheikh", "Gill", "Sandhu", "Dhillon", "Thakur",
+    "Rathore", "Chaudhary", "Saxena", "Srivastava", "Kapoor", "Malhotra",
+]
+MIDDLE_NAMES = ["Kumar", "Prasad", "Chand", "Lal", "Nath", "Prakash", "Kumari", "Devi"]
+BRANCH_CODES = ["CS", "EC", "EE", "ME", "IT", "CE", "BT", "IC", "MA"]
+CATEGORIES = ["GEN", "OBC", "SC", "ST", "EWS"]
+
+# Transliteration variants commonly seen in Indian names, applied in both directions
+SPELLING_VARIANTS = [("sh", "s"), ("ee", "i"), ("oo", "u"), ("v", "w"), ("aa", "a"), ("th", "t"), ("ksh", "x"), ("ph", "f")]
+
+COLUMNS = ["Student Name", "Father's Name", "Roll No", "Mobile No", "Category", "Amount"]
+CLIENT_COLUMN_NAMES = {"Student Name": "Applicant Name", "Father's Name": "Father Name", "Roll No": "Application No",
+                       "Mobile No": "Phone Number"}
+
+def generate_students(rows, seed=0, first_year=2020):
+    """
+    Returns a DataFrame of `rows` distinct synthetic students with COLUMNS.
+    """
+    rng = random.Random(seed)
+    data = {column: [] for column in COLUMNS}
+    for i in range(rows):
+        surname = rng.choice(SURNAMES)
+        if rng.random() < 0.5:
+            first_name = rng.choice(MALE_FIRST_NAMES)
+            middle = rng.choice(MIDDLE_NAMES[:6]) + " " if rng.random() < 0.2 else ""
+        else:
+            first_name = rng.choice(FEMALE_FIRST_NAMES)
+            middle = rng.choice(MIDDLE_NAMES[6:]) + " " if rng.random() < 0.15 else ""
+        father_middle = rng.choice(MIDDLE_NAMES[:6]) + " " if rng.random() < 0.3 else ""
+        year = first_year + rng.randrange(5)
+        data["Student Name"].append(f"{first_name} {middle}{surname}")
+        data["Father's Name"].append(f"{rng.choice(MALE_FIRST_NAMES)} {father_middle}{surname}")
+        # The sequence number makes every roll number unique
+        data["Roll No"].append(f"{year}U{rng.choice(BRANCH_CODES)}{i:07d}")
+        data["Mobile No"].append(f"{rng.choice('6789')}{rng.randrange(10**9):09d}")
+        data["Category"].append(rng.choice(CATEGORIES))
+        data["Amount"].append(rng.randrange(5000, 50001, 500))
+    return pd.DataFrame(data)
+
+def add_typo(text, rng):
+    """
+    Applies one data-entry error: a transliteration variant, a swapped, dropped, doubled or
+    mistyped letter, or case/spacing noise.
+    """
+    kind = rng.randrange(6)
+    if kind == 0:
+        variants = [(a, b) for a, b in SPELLING_VARIANTS if a in text.lower()] + [(b, a) for a, b in SPELLING_VARIANTS if b in text.lower()]
+        if variants:
+            source, target = rng.choice(variants)
+            position = text.lower().find(source)
+            return text[:position] + target + text[position + len(source):]
+    if kind == 5:
+        return rng.choice([text.upper(), text.lower(), "  " + text.replace(" ", "  ") + " "])
+    letters = [i for i, ch in enumerate(text) if ch.isalpha()]
+    if len(letters) < 2:
+        return text
+    i = rng.choice(letters[:-1])
+    if kind == 1:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    if kind == 2:
+        return text[:i] + text[i + 1:]
+    if kind == 3:
+        return text[:i] + text[i] + text[i:]
+    return text[:i] + rng.choice("aeiourstnm") + text[i + 1:]
+
+def make_client_and_db(rows, seed=0, db_files=2, overlap=0.3, typo_ratio=0.5):
+    """
+    Builds a matching scenario of `rows` DB students split over `db_files` workbooks and a
+    client list of `rows` applicants. `overlap` of the applicants are DB students (half of
+    them with a typo in each field when typo_ratio=0.5); the rest are new students.
+    Client columns use different headers (CLIENT_COLUMN_NAMES) to exercise standardization.
+    Returns (client_df, {file_name: {sheet_name: DataFrame}}).
+    """
+    rng = random.Random(seed)
+    db = generate_students(rows, seed=seed)
+    db_data = {}
+    per_file = -(-rows // db_files)
+    for file_number in range(db_files):
+        db_data[f"db_{2020 + file_number}.xlsx"] = {"Sheet1": db.iloc[file_number * per_file:(file_number + 1) * per_file].reset_index(drop=True)}
+
+    overlap_rows = int(rows * overlap)
+    repeated = db.sample(n=overlap_rows, random_state=seed).reset_index(drop=True)
+    for column in ("Student Name", "Father's Name"):
+        repeated[column] = [add_typo(value, rng) if rng.random() < typo_ratio else value for value in repeated[column]]
+    fresh = generate_students(rows - overlap_rows, seed=seed + 1, first_year=2025)
+    # Fresh students get roll numbers outside the DB's sequence range
+    fresh["Roll No"] = [roll[:-7] + f"{rows + i:07d}" for i, roll in enumerate(fresh["Roll No"])]
+    client = pd.concat([repeated, fresh], ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+    return client.rename(columns=CLIENT_COLUMN_NAMES), db_data
+
+def write_xlsx(path, sheets):
+    """
+    Writes {sheet_name: DataFrame} with openpyxl's write-only mode (constant memory).
+    """
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            sheet.append(list(row))
+    workbook.save(path)
+
+def _pdf_text(value):
+    return str(value).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace").decode("latin-1")
+
+def write_pdf(path, df, rows_per_page=35):
+    """
+    Writes df as a ruled table, header repeated on every page, in a minimal PDF that
+    pdfplumber extracts with its default (lines) table settings. Pages are streamed to disk.
+    """
+    columns = list(df.columns)
+    col_width = 540 // len(columns)
+    row_height, top = 20, 760
+    page_count = -(-len(df) // rows_per_page) if len(df) else 1
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a (contents, page) pair per page
+    page_numbers = [5 + 2 * page for page in range(page_count)]
+    offsets = {}
+    with open(path, "wb") as out:
+        def write_object(number, body):
+            offsets[number] = out.tell()
+            out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        out.write(b"%PDF-1.4\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        values = df.astype(str).to_numpy()
+        for page in range(page_count):
+            table = [columns] + values[page * rows_per_page:(page + 1) * rows_per_page].tolist()
+            right, bottom = 36 + len(columns) * col_width, top - len(table) * row_height
+            ops = [f"36 {top - r * row_height} m {right} {top - r * row_height} l S" for r in range(len(table) + 1)]
+            ops += [f"{36 + c * col_width} {top} m {36 + c * col_width} {bottom} l S" for c in range(len(columns) + 1)]
+            for r, row in enumerate(table):
+                for c, text in enumerate(row):
+                    ops.append(f"BT /F1 7 Tf {39 + c * col_width} {top - (r + 1) * row_height + 7} Td ({_pdf_text(text)}) Tj ET")
+            stream = "\n".join(ops).encode("latin-1")
+            write_object(page_numbers[page] - 1, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            write_object(page_numbers[page], b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_numbers[page] - 1))
+        kids = " ".join(f"{number} 0 R" for number in page_numbers)
+        write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode())
+
+        xref = out.tell()
+        object_count = max(offsets) + 1
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % object_count)
+        for number in range(1, object_count):
+            out.write(b"%010d 00000 n \n" % offsets[number])
+        out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (object_count, xref))
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>')
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>')
+
+def write_docx(path, df):
+    """
+    Writes df as one Word table. The document XML is streamed into the zip, since building
+    a large table through python-docx takes far longer than parsing it.
+    """
+    def row_xml(values):
+        cells = "".join(f"<w:tc><w:p><w:r><w:t xml:space=\"preserve\">{escape(str(value))}</w:t></w:r></w:p></w:tc>" for value in values)
+        return f"<w:tr>{cells}</w:tr>"
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _DOCX_RELS)
+        with archive.open("word/document.xml", "w", force_zip64=True) as document:
+            document.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                           b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body><w:tbl>')
+            document.write(row_xml(df.columns).encode("utf-8"))
+            for row in df.itertuples(index=False):
+                document.write(row_xml(row).encode("utf-8"))
+            document.write(b"</w:tbl><w:p/></w:body></w:document>")
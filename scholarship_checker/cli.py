@@ -0,0 +1,238 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+from src import parsers
+from src.blocking import BlockingConfig, BLOCKING_STRATEGIES
+from src.exporters import EXPORT_FORMATS, open_result_writer
+from src.instrumentation import MatchStats
+from src.match_store import MatchStore
+from src.matcher import MATCH_PLANS, build_db_match_indexes, db_columns_to_load, find_duplicates, match_worker_pool
+from src.parse_cache import ParseCache, DEFAULT_CACHE_DIR
+
+DB_FILE_EXTENSIONS = ('.xlsx', '.xls')
+
+def list_db_files(db_dir):
+    """
+    Returns the Excel workbooks directly inside db_dir, sorted by name. This order decides
+    which file is reported when a client row appears in several, as upload order does in the app.
+    """
+    return sorted(os.path.join(db_dir, name) for name in os.listdir(db_dir)
+                  if name.lower().endswith(DB_FILE_EXTENSIONS) and not name.startswith('~$'))
+
+def iter_client_tables(client_path, parse_cache=None):
+    """
+    Yields (table_label, DataFrame) for each table of the client file. PDF tables are
+    streamed page by page; Excel sheets and Word tables are parsed up front.
+    """
+    file_name = os.path.basename(client_path)
+    lower_name = file_name.lower()
+    with open(client_path, 'rb') as f:
+        file_bytes = f.read()
+
+    def parse(parse_func):
+        if parse_cache is not None:
+            return parse_cache.cached_parse(parse_func, file_bytes, file_name)
+        return parse_func(file_bytes, file_name)
+
+    if lower_name.endswith(('.xlsx', '.xls')):
+        yield from parse(parsers.parse_excel).items()
+    elif lower_name.endswith('.pdf'):
+        for df in parsers.iter_pdf_tables(file_bytes, file_name):
+            yield df.attrs.get('source', file_name), df
+    elif lower_name.endswith(('.docx', '.doc')):
+        for df in parse(parsers.parse_word):
+            yield df.attrs.get('source', file_name), df
+    else:
+        raise ValueError(f"Unsupported client file type: {file_name}. Expected .xlsx, .xls, .pdf, .doc or .docx.")
+
+def load_db_match_indexes(db_paths, client_columns, db_columns, parse_cache=None, max_workers=None, progress=None, stats=None,
+                          match_plan="combined"):
+    """
+    Parses the DB workbooks concurrently and builds their match indexes one file at a time,
+    so only the cleaned keys are kept in memory, not the parsed sheets.
+    Time spent waiting for parsed files is recorded in stats as the "parse" stage.
+    """
+    if stats is None:
+        stats = MatchStats()
+    files = []
+    for db_path in db_paths:
+        with open(db_path, 'rb') as f:
+            files.append((os.path.basename(db_path), f.read()))
+
+    if parse_cache is not None:
+        parsed_files = parse_cache.cached_parse_many(parsers.parse_excel, files, max_workers=max_workers)
+    else:
+        parsed_files = ((position, file_name, parsed, False)
+                        for position, file_name, parsed in parsers.parse_files_concurrently(parsers.parse_excel, files, max_workers=max_workers))
+
+    indexes_per_file = [[] for _ in files]
+    parsed_files = iter(parsed_files)
+    for done_count in range(1, len(files) + 1):
+        with stats.timer("parse"):
+            position, file_name, parsed_sheets, from_cache = next(parsed_files)
+        if parsed_sheets:
+            indexes_per_file[position] = build_db_match_indexes({file_name: parsed_sheets}, client_columns, db_columns, stats=stats,
+                                                                match_plan=match_plan)
+        if progress is not None:
+            progress(f"DB file {done_count}/{len(files)}: {file_name}{' (from cache)' if from_cache else ''} - "
+                     f"{len(indexes_per_file[position])} usable sheet(s)")
+
+    return [db_index for file_indexes in indexes_per_file for db_index in file_indexes]
+
+def load_store_match_indexes(store, db_paths, client_columns, db_columns, parse_cache=None, progress=None, stats=None,
+                             match_plan="combined"):
+    """
+    Ingests the DB workbooks that are new or changed into the match store, then builds the
+    match indexes of every stored file (in file-name order) from its stored columns.
+    Ingestion is recorded in stats as the "ingest" stage, loading the keys as "parse".
+    """
+    if stats is None:
+        stats = MatchStats()
+    for done_count, db_path in enumerate(db_paths, start=1):
+        file_name = os.path.basename(db_path)
+        with stats.timer("ingest"):
+            with open(db_path, 'rb') as f:
+                ingested = store.ingest_file(file_name, f.read(), parse_cache=parse_cache, columns=db_columns)
+        if progress is not None:
+            progress(f"DB file {done_count}/{len(db_paths)}: {file_name} - {'stored' if ingested else 'already in the store'}")
+
+    with stats.timer("parse"):
+        db_data = store.load(db_columns_to_load(store.headers(), client_columns, db_columns))
+    return build_db_match_indexes(db_data, client_columns, db_columns, stats=stats, match_plan=match_plan)
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Match a client file against a directory of DB workbooks without the Streamlit UI.")
+    parser.add_argument("client_file", help="Client file (.xlsx, .xls, .pdf, .doc, .docx)")
+    parser.add_argument("db_dir", nargs="?", help="Directory of DB workbooks (.xlsx, .xls); optional with --store")
+    parser.add_argument("--store", help="Match store (SQLite) file: DB workbooks from db_dir are added to it if new or changed, "
+                                        "and matching runs against every stored file")
+    parser.add_argument("-c", "--client-columns", nargs="+", required=True, help="1 or 2 client columns to match on")
+    parser.add_argument("-d", "--db-columns", nargs="+", required=True, help="1 or 2 DB columns to match on")
+    parser.add_argument("-o", "--output", required=True, help="Results file (.csv, .parquet or .xlsx)")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), help="Output format; defaults to the output file extension")
+    parser.add_argument("-t", "--threshold", type=int, default=85, help="Fuzzy match threshold 0-100 (default: 85)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for matching (default: 1)")
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="Client rows matched and written per chunk (default: 50000)")
+    parser.add_argument("--best", action="store_true", help="Report the best candidates with score and DB row instead of the first match")
+    parser.add_argument("--top-k", type=int, default=1, help="Candidates reported per client row with --best (default: 1)")
+    parser.add_argument("--plan", choices=MATCH_PLANS, default="combined",
+                        help="'fields' joins roll/mobile numbers and emails exactly and fuzzy scores only the other columns (default: combined)")
+    parser.add_argument("--blocking", choices=BLOCKING_STRATEGIES, help="Restrict fuzzy scoring to blocked candidates")
+    parser.add_argument("--min-overlap", type=float, default=0.3, help="Trigram overlap for --blocking trigram (default: 0.3)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Parse cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the parse cache")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the final summary")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the matcher's log messages")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    for option, columns in (("--client-columns", args.client_columns), ("--db-columns", args.db_columns)):
+        if len(columns) > 2:
+            print(f"error: {option} takes 1 or 2 columns", file=sys.stderr)
+            return 2
+    if not 0 <= args.threshold <= 100:
+        print("error: --threshold must be between 0 and 100", file=sys.stderr)
+        return 2
+    if args.chunk_rows < 1:
+        print("error: --chunk-rows must be at least 1", file=sys.stderr)
+        return 2
+    if args.top_k < 1:
+        print("error: --top-k must be at least 1", file=sys.stderr)
+        return 2
+    if args.plan == "fields" and args.best:
+        print("error: --plan fields cannot be combined with --best", file=sys.stderr)
+        return 2
+    if args.db_dir is None and args.store is None:
+        print("error: give a DB directory, --store, or both", file=sys.stderr)
+        return 2
+
+    # The src modules log every step at INFO, which is too chatty for long batch runs
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    def progress(message):
+        if not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    blocking = BlockingConfig(strategy=args.blocking, min_overlap=args.min_overlap) if args.blocking else None
+    parse_cache = None if args.no_cache else ParseCache(args.cache_dir)
+    stats = MatchStats()
+    run_start = time.perf_counter()
+
+    db_paths = list_db_files(args.db_dir) if args.db_dir else []
+    if not db_paths and not args.store:
+        print(f"error: no .xlsx/.xls files found in {args.db_dir}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    if args.store:
+        store = MatchStore(args.store)
+        try:
+            db_match_indexes = load_store_match_indexes(store, db_paths, args.client_columns, args.db_columns, parse_cache=parse_cache,
+                                                        progress=progress, stats=stats, match_plan=args.plan)
+        finally:
+            store.close()
+        db_source = f"the match store {args.store}"
+    else:
+        db_match_indexes = load_db_match_indexes(db_paths, args.client_columns, args.db_columns, parse_cache=parse_cache, progress=progress,
+                                                 stats=stats, match_plan=args.plan)
+        db_source = f"the {len(db_paths)} DB file(s)"
+    if not db_match_indexes:
+        print(f"error: none of {db_source} has columns matching {args.db_columns}", file=sys.stderr)
+        return 1
+    progress(f"Indexed {sum(len(db_index) for db_index in db_match_indexes):,} DB rows from {len(db_match_indexes)} sheet(s) in {time.perf_counter() - start:.2f}s")
+
+    writer = open_result_writer(args.output, args.format)
+    # One pool holding the DB indexes serves every chunk (best mode always matches in this process)
+    pool = match_worker_pool(db_match_indexes, args.workers) if args.workers > 1 and not args.best else None
+    status_counts = {}
+    rows_done = 0
+    try:
+        client_tables = iter_client_tables(args.client_file, parse_cache)
+        while True:
+            with stats.timer("parse"):
+                table_label, client_df = next(client_tables, (None, None))
+            if client_df is None:
+                break
+            if client_df.empty:
+                continue
+            missing_columns = [col for col in args.client_columns if col not in client_df.columns]
+            if missing_columns:
+                progress(f"Skipped {table_label}: missing client column(s) {', '.join(map(str, missing_columns))}")
+                continue
+
+            for chunk_start in range(0, len(client_df), args.chunk_rows):
+                chunk = client_df.iloc[chunk_start:chunk_start + args.chunk_rows]
+                results_df = find_duplicates([chunk], args.client_columns, {}, args.db_columns,
+                                             fuzzy_threshold=args.threshold, db_match_indexes=db_match_indexes,
+                                             blocking=blocking, workers=args.workers, pool=pool, stats=stats,
+                                             match_mode="best" if args.best else "first", top_k=args.top_k, match_plan=args.plan)
+                with stats.timer("write"):
+                    writer.write(results_df)
+
+                rows_done += len(results_df)
+                for status, count in results_df['status'].value_counts().items():
+                    status_counts[status] = status_counts.get(status, 0) + int(count)
+                progress(f"{table_label}: {rows_done:,} client rows matched, "
+                         f"{status_counts.get('Duplicate Found', 0):,} duplicates ({time.perf_counter() - run_start:.1f}s)")
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    summary = ", ".join(f"{status}: {count:,}" for status, count in sorted(status_counts.items()))
+    print(f"Wrote {rows_done:,} rows to {args.output} ({summary or 'no client rows matched'})", file=sys.stderr)
+    print(f"Timings: {stats.report()}, total {time.perf_counter() - run_start:.2f}s", file=sys.stderr)
+    if args.verbose:
+        print(f"Counters: {', '.join(f'{counter} {value:,}' for counter, value in stats.counters.items())}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import math
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+BLOCKING_STRATEGIES = ("trigram", "prefix", "digits")
+
+_NON_DIGIT_RE = re.compile(r'\D+')
+
+@dataclass(frozen=True)
+class BlockingConfig:
+    """
+    Settings for the candidate blocking stage that runs before fuzzy scoring.
+
+    strategy:
+        "trigram" - candidates share at least min_overlap of the client key's character trigrams.
+        "prefix"  - candidates start with the same prefix_length characters (name or roll-number prefix).
+        "digits"  - candidates end with the same digits_length digits (e.g. mobile numbers).
+    min_overlap is the recall/speed knob for "trigram": higher values compare fewer
+    pairs but may miss heavily misspelt matches.
+    """
+    strategy: str = "trigram"
+    min_overlap: float = 0.3
+    prefix_length: int = 3
+    digits_length: int = 4
+
+    def __post_init__(self):
+        if self.strategy not in BLOCKING_STRATEGIES:
+            raise ValueError(f"Unknown blocking strategy '{self.strategy}'. Expected one of: {', '.join(BLOCKING_STRATEGIES)}")
+        if not 0 < self.min_overlap <= 1:
+            raise ValueError("min_overlap must be in (0, 1].")
+
+class BlockingReport:
+    """
+    Counts how many client/DB comparisons blocking avoided.
+    """
+    def __init__(self):
+        self.comparisons_total = 0
+        self.comparisons_performed = 0
+
+    @property
+    def comparisons_skipped(self):
+        return self.comparisons_total - self.comparisons_performed
+
+    @property
+    def skipped_ratio(self):
+        return self.comparisons_skipped / self.comparisons_total if self.comparisons_total else 0.0
+
+    def add(self, total, performed):
+        self.comparisons_total += total
+        self.comparisons_performed += performed
+
+    def as_dict(self):
+        return {
+            "comparisons_total": self.comparisons_total,
+            "comparisons_performed": self.comparisons_performed,
+            "comparisons_skipped": self.comparisons_skipped,
+            "skipped_ratio": round(self.skipped_ratio, 4),
+        }
+
+def _trigrams(key):
+    if len(key) < 3:
+        return {key}
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+class CandidateBlocker:
+    """
+    Inverted index over a list of DB keys that returns likely fuzzy candidates for a client key.
+    """
+    def __init__(self, choices, config):
+        self.config = config
+        self.choice_count = len(choices)
+        buckets = {}
+        for position, choice in enumerate(choices):
+            for block_key in self._block_keys(choice):
+                buckets.setdefault(block_key, []).append(position)
+        self.buckets = {block_key: np.array(positions, dtype=np.int64) for block_key, positions in buckets.items()}
+
+    def _block_keys(self, key):
+        strategy = self.config.strategy
+        if strategy == "trigram":
+            return _trigrams(key)
+        if strategy == "prefix":
+            compact = key.replace(" ", "")
+            return {compact[:self.config.prefix_length]} if compact else set()
+        # digits
+        digits = _NON_DIGIT_RE.sub('', key)
+        return {digits[-self.config.digits_length:]} if len(digits) >= self.config.digits_length else set()
+
+    def candidates(self, query):
+        """
+        Returns the positions of the candidate choices for query, or None when query
+        has no block key and must be compared against every choice.
+        """
+        block_keys = self._block_keys(query)
+        if not block_keys:
+            return None
+
+        if self.config.strategy != "trigram":
+            (block_key,) = block_keys
+            return self.buckets.get(block_key, np.empty(0, dtype=np.int64))
+
+        hits = [self.buckets[block_key] for block_key in block_keys if block_key in self.buckets]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        shared_counts = np.bincount(np.concatenate(hits), minlength=self.choice_count)
+        required = max(1, math.ceil(self.config.min_overlap * len(block_keys)))
+        return np.flatnonzero(shared_counts >= required)
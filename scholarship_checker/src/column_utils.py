@@ -1,5 +1,16 @@
+import numpy as np
 import pandas as pd
 import re
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError: # Values are normalized with plain Python string methods instead
+    PYARROW_AVAILABLE = False
 
 DEFAULT_MAPPING_RULES = {
     "name": ["name", "student name", "applicant name", "name / father's name", "name of student", "candidate name", "student_name", "applicant_name"],
@@ -30,33 +41,115 @@ def extract_column_names(data_object):
         
     return sorted(list(all_columns))
 
-def get_standardized_column_name(column_name, mapping_rules=DEFAULT_MAPPING_RULES):
+_SEPARATOR_RE = re.compile(r'[\s_-]+')
+
+# Upper bound on memoized names per mapper; the memo is cleared once it is reached
+MAX_MEMOIZED_NAMES = 10_000
+
+class ColumnMapper:
     """
-    Standardizes a column name based on mapping rules.
+    Compiled form of a set of mapping rules: an inverted {variation: standard_name} dict
+    built once, plus a memo of every column name already standardized.
     """
-    if not isinstance(column_name, str): # Handle non-string inputs gracefully
-        return str(column_name) # Or raise an error, or return as is
+    def __init__(self, mapping_rules):
+        self.variation_to_standard = {}
+        for standard_name, variations in mapping_rules.items():
+            for variation in variations:
+                # First rule listing a variation wins, as with the linear scan over the rules
+                self.variation_to_standard.setdefault(variation, standard_name)
+        self._memo = {}
+
+    def standardize(self, column_name):
+        """
+        Returns the standard name for column_name, or column_name itself if no rule maps it.
+        """
+        if not isinstance(column_name, str): # Handle non-string inputs gracefully
+            return str(column_name)
+
+        standard_name = self._memo.get(column_name)
+        if standard_name is None:
+            cleaned_name = _SEPARATOR_RE.sub(' ', column_name.lower().strip()) # Replace common separators with space and collapse multiple spaces
+            standard_name = self.variation_to_standard.get(cleaned_name, column_name)
+            if len(self._memo) >= MAX_MEMOIZED_NAMES:
+                self._memo.clear()
+            self._memo[column_name] = standard_name
+        return standard_name
+
+    def standardize_columns(self, column_names):
+        """
+        Returns {original_name: standard_name} for every name in column_names.
+        """
+        return {column_name: self.standardize(column_name) for column_name in column_names}
 
-    cleaned_name = str(column_name).lower().strip()
-    cleaned_name = re.sub(r'[\s_-]+', ' ', cleaned_name) # Replace common separators with space and collapse multiple spaces
+@lru_cache(maxsize=32)
+def _compile_mapping_rules(frozen_rules):
+    return ColumnMapper(dict(frozen_rules))
 
-    for standard_name, variations in mapping_rules.items():
-        if cleaned_name in variations:
-            return standard_name
-    return column_name # Return original if no mapping found (or its cleaned version, depending on preference)
+def get_column_mapper(mapping_rules=DEFAULT_MAPPING_RULES):
+    """
+    Returns the shared ColumnMapper for mapping_rules. Mappers are cached by rule content,
+    so custom rule sets get their own mapper and editing a rule set yields a fresh one.
+    """
+    frozen_rules = tuple((standard_name, tuple(variations)) for standard_name, variations in mapping_rules.items())
+    return _compile_mapping_rules(frozen_rules)
+
+def get_standardized_column_name(column_name, mapping_rules=DEFAULT_MAPPING_RULES):
+    """
+    Standardizes a column name based on mapping rules.
+    """
+    return get_column_mapper(mapping_rules).standardize(column_name)
 
 def generate_standardized_column_map(data_frames):
     """
     Generates a map from original column names to their standardized versions
     for all columns in the provided data_frames (list or dict of DataFrames).
     """
-    original_to_standardized_map = {}
-    all_original_columns = extract_column_names(data_frames)
-    
-    for original_col in all_original_columns:
-        original_to_standardized_map[original_col] = get_standardized_column_name(original_col)
-        
-    return original_to_standardized_map
+    return get_column_mapper().standardize_columns(extract_column_names(data_frames))
+
+# Rows sampled to decide whether collapsing whitespace on a subset is worth it
+_COLLAPSE_SAMPLE_ROWS = 10_000
+_COLLAPSE_SUBSET_MAX_RATIO = 0.2
+
+def _normalize_arrow(values):
+    """
+    lower/strip/collapse on an Arrow-backed string array. These are the same Arrow kernels
+    pandas uses for .str.lower().str.strip().str.replace(r'\\s+', ' ') on this dtype, so
+    the output is identical. Arrow's regex whitespace class is ASCII only and excludes \\v.
+    """
+    trimmed = pc.utf8_trim_whitespace(pc.utf8_lower(values))
+
+    # The regex rewrite dominates the cost; most rows have nothing to collapse, so it only runs on those that do
+    needs_collapse_pattern = r'\s\s|[\t\n\f\r]'
+    sample = trimmed.slice(0, _COLLAPSE_SAMPLE_ROWS)
+    sample_ratio = (pc.sum(pc.match_substring_regex(sample, needs_collapse_pattern)).as_py() or 0) / max(len(sample), 1)
+    if sample_ratio > _COLLAPSE_SUBSET_MAX_RATIO:
+        return pc.replace_substring_regex(trimmed, r'\s+', ' ')
+
+    needs_collapse = pc.match_substring_regex(trimmed, needs_collapse_pattern)
+    if not pc.any(needs_collapse).as_py():
+        return trimmed
+    collapsed = pc.replace_substring_regex(pc.filter(trimmed, needs_collapse), r'\s+', ' ')
+    return pc.replace_with_mask(trimmed.combine_chunks(), needs_collapse.combine_chunks(), collapsed.combine_chunks())
+
+def _normalize_python(values):
+    """
+    The same operation in one pass per value; str.split() splits on exactly the characters
+    that re's whitespace class matches, so this equals the regex chain. Missing values are left as they are.
+    """
+    return [' '.join(value.lower().split()) if isinstance(value, str) else value for value in values]
+
+def normalize_values(series):
+    """
+    Lowercases, strips and collapses whitespace in series.astype(str), giving the same
+    result as clean_column_values(series.astype(str)) without the intermediate Series.
+    """
+    string_series = series.astype(str)
+    arrow_values = getattr(string_series.array, "__arrow_array__", None)
+    if PYARROW_AVAILABLE and arrow_values is not None:
+        normalized = _normalize_arrow(arrow_values())
+    else:
+        normalized = _normalize_python(string_series.to_numpy(dtype=object))
+    return pd.Series(normalized, index=series.index, name=series.name, dtype=string_series.dtype)
 
 def clean_column_values(series):
     """
@@ -71,11 +164,123 @@ def clean_column_values(series):
     # Check for object dtype or string dtype explicitly
     if series.dtype == 'object' or pd.api.types.is_string_dtype(series):
         # Convert to string to handle potential mixed types (e.g., numbers read as objects)
-        cleaned_series = series.astype(str).str.lower().str.strip()
-        cleaned_series = cleaned_series.str.replace(r'\s+', ' ', regex=True)
-        return cleaned_series
+        return normalize_values(series)
     return series # Return original series if not object/string type
 
+# Mobile numbers are compared on their last digits, which drops country codes and trunk prefixes
+MOBILE_NUMBER_DIGITS = 10
+
+def normalize_identifiers(series):
+    """
+    Reduces identifiers (roll, application, registration numbers) to lowercase letters and
+    digits, so "2021/CS-042" and "2021 cs 042" compare equal. Numbers read as floats lose
+    their ".0". Missing values and values left empty become missing.
+    """
+    # Masked before astype(str), which turns NaN/None into "nan"/"None" on pandas < 3
+    present = series.notna()
+    normalized = series.astype(str).str.replace(r'\.0+$', '', regex=True).str.replace(r'[^0-9A-Za-z]+', '', regex=True).str.lower()
+    return normalized.where(present & (normalized != ""), None)
+
+def normalize_mobile_numbers(series):
+    """
+    Reduces mobile numbers to their last MOBILE_NUMBER_DIGITS digits, so "+91 98765-43210"
+    and "9876543210" compare equal. Missing values and values without digits become missing.
+    """
+    present = series.notna()
+    digits = series.astype(str).str.replace(r'\.0+$', '', regex=True).str.replace(r'\D+', '', regex=True).str[-MOBILE_NUMBER_DIGITS:]
+    return digits.where(present & (digits != ""), None)
+
+NORMALIZATION_PROFILES = {
+    "default": normalize_values,
+    "identifier": normalize_identifiers,
+    "mobile": normalize_mobile_numbers,
+}
+
+def _values_token(series):
+    """
+    Identifies the array behind series. NumPy-backed columns get a new view on every
+    access, so their buffer address is used; it cannot be reused while the Series is held.
+    """
+    values = series._values
+    values = getattr(values, "_ndarray", values) # Datetime-like arrays wrap an ndarray
+    if isinstance(values, np.ndarray):
+        return values.__array_interface__['data'][0]
+    return id(values)
+
+class NormalizationCache:
+    """
+    LRU memo of normalized column values keyed by (DataFrame identity, column, profile).
+    Frames are held by weak reference, so entries go away with their DataFrame. Each entry
+    also keeps the column it was computed from and a token of its values (the identity of its
+    array, or of its buffer for NumPy-backed columns). Under copy-on-write, replacing the
+    column (df[col] = ...) or writing into it (df.loc[...] = ...) while that Series is held
+    gives the frame a new array, so the token changes and the entry is recomputed instead of
+    returning stale values. invalidate(df) drops a frame's entries early.
+    """
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # (id(df), column, profile) -> (weakref to df, source Series, values token, normalized Series)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, df, column, profile="default"):
+        """
+        Returns the normalized values of df[column]. The cached Series is shared, do not modify it.
+        """
+        key = (id(df), column, profile)
+        source = df[column]
+        token = _values_token(source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is df and entry[2] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[3]
+
+        normalized = NORMALIZATION_PROFILES[profile](source)
+
+        def _drop_dead_entry(ref, key=key):
+            with self._lock:
+                if key in self._entries and self._entries[key][0] is ref:
+                    del self._entries[key]
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (weakref.ref(df, _drop_dead_entry), source, token, normalized)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return normalized
+
+    def invalidate(self, df=None):
+        """
+        Drops the entries of df, or every entry when df is None.
+        """
+        with self._lock:
+            if df is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == id(df)]:
+                del self._entries[key]
+
+_normalization_cache = NormalizationCache()
+
+def get_normalization_cache():
+    """
+    Returns the process-wide NormalizationCache used by normalized_column.
+    """
+    return _normalization_cache
+
+def normalized_column(df, column, profile="default"):
+    """
+    Returns the normalized values of df[column], memoized across calls and app reruns.
+    """
+    return _normalization_cache.get(df, column, profile)
+
 # Example Usage (can be removed or kept for testing)
 if __name__ == '__main__':
     # Test extract_column_names
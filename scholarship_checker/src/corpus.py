@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.column_utils import DEFAULT_MAPPING_RULES
+from src.instrumentation import MatchStats
+from src.matcher import build_db_match_indexes
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_MAX_BYTES = int(os.environ.get("SCHOLARSHIP_CORPUS_MAX_MB", "2048")) * 1024 * 1024
+# A session's hold on its entries lapses this long after it last renewed it (e.g. a closed browser tab)
+DEFAULT_HOLD_TTL_SECONDS = int(os.environ.get("SCHOLARSHIP_CORPUS_TTL_MINUTES", "60")) * 60
+
+# Rough per-row cost of a DbMatchIndex beyond its key strings: list slot, hash entry and position lists
+_INDEX_BYTES_PER_ROW = 120
+
+def estimate_bytes(value):
+    """
+    Approximate memory held by a registry value: a dict of sheet DataFrames or a list of DbMatchIndex.
+    """
+    if isinstance(value, dict):
+        return int(sum(df.memory_usage(deep=True).sum() for df in value.values() if isinstance(df, pd.DataFrame)))
+    return int(sum(sum(len(key) for key in db_index.keys if isinstance(key, str)) + _INDEX_BYTES_PER_ROW * len(db_index)
+                   for db_index in value))
+
+class CorpusRegistry:
+    """
+    Process-wide, read-only registry of parsed DB files and their match indexes, shared by every
+    Streamlit session of the server. Parsed files are keyed by (kind, content hash), so sessions
+    uploading the same workbook share one copy; match indexes hang off the file they were built
+    from and are built once per column selection.
+
+    Sessions hold the files they use with hold(), renewed on every run. Entries no session holds
+    are evicted least recently used first once max_bytes is exceeded, and a session's hold lapses
+    hold_ttl_seconds after its last renewal. Values are shared: callers must not modify them.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, hold_ttl_seconds=DEFAULT_HOLD_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.hold_ttl_seconds = hold_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # key -> (value, nbytes, parent key or None), least recently used first
+        self._keys_by_id = {} # id(value) -> key, for the file entries
+        self._holds = {} # session_id -> (set of file keys, time of last renewal)
+        self._lock = threading.Lock()
+        self._build_locks = {} # key -> Lock, so concurrent sessions build a missing entry once
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(nbytes for _, nbytes, _ in self._entries.values())
+
+    def get(self, key):
+        """
+        Returns the registered value for key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, parent=None):
+        """
+        Registers value under key and returns the registered value: the one already there if
+        another session registered key meanwhile, so every caller ends up sharing one object.
+        parent ties an entry (e.g. match indexes) to the file entry it was built from.
+        """
+        nbytes = estimate_bytes(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+            self._entries[key] = (value, nbytes, parent)
+            if parent is None:
+                self._keys_by_id[id(value)] = key
+            self._evict()
+        return value
+
+    def get_or_build(self, key, build, parent=None):
+        """
+        Returns the value for key, calling build() to create and register it on a miss.
+        Sessions asking for the same missing key wait for a single build.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            value = self.get(key)
+            if value is None:
+                value = self.put(key, build(), parent=parent)
+        with self._lock:
+            self._build_locks.pop(key, None)
+        return value
+
+    def key_of(self, value):
+        """
+        The key a file value (e.g. a parsed sheets dict) is registered under, or None.
+        """
+        with self._lock:
+            key = self._keys_by_id.get(id(value))
+            return key if key is not None and self._entries.get(key, (None,))[0] is value else None
+
+    def hold(self, session_id, keys):
+        """
+        Marks the file entries in keys (and the entries built from them) as in use by session_id,
+        replacing the session's previous hold, and evicts what is no longer needed.
+        """
+        with self._lock:
+            self._holds[session_id] = ({key for key in keys if key is not None}, time.monotonic())
+            self._evict()
+
+    def release(self, session_id):
+        with self._lock:
+            self._holds.pop(session_id, None)
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held. Lapsed holds go first, then unheld entries in LRU order while over budget.
+        now = time.monotonic()
+        for session_id in [session_id for session_id, (_, renewed) in self._holds.items() if now - renewed > self.hold_ttl_seconds]:
+            del self._holds[session_id]
+        held = set().union(*(keys for keys, _ in self._holds.values())) if self._holds else set()
+
+        total_bytes = sum(nbytes for _, nbytes, _ in self._entries.values())
+        for key in list(self._entries):
+            if total_bytes <= self.max_bytes:
+                break
+            value, nbytes, parent = self._entries[key]
+            if key in held or parent in held:
+                continue
+            del self._entries[key]
+            if self._keys_by_id.get(id(value)) == key:
+                del self._keys_by_id[id(value)]
+            total_bytes -= nbytes
+            logging.info(f"Evicted {key[0]} entry from the shared corpus ({nbytes / 2**20:.1f} MB).")
+        if total_bytes > self.max_bytes:
+            logging.warning(f"Shared corpus uses {total_bytes / 2**20:.0f} MB, above its {self.max_bytes / 2**20:.0f} MB ceiling; "
+                            f"the rest is held by active sessions.")
+
+    def match_indexes(self, db_data_parsed, selected_client_columns_original, selected_db_columns_original, mapping_rules=DEFAULT_MAPPING_RULES,
+                      stats=None, match_plan="combined"):
+        """
+        Drop-in for build_db_match_indexes that reuses the indexes of registered files: each file's
+        indexes are built once per column selection, mapping rules and match plan, and shared.
+        Files that are not registered are indexed as usual.
+        """
+        if stats is None:
+            stats = MatchStats()
+        frozen_rules = tuple((standard_name, tuple(variations)) for standard_name, variations in mapping_rules.items())
+        db_match_indexes = []
+        for file_name, sheets_dict in db_data_parsed.items():
+            def build(file_name=file_name, sheets_dict=sheets_dict):
+                return build_db_match_indexes({file_name: sheets_dict}, selected_client_columns_original, selected_db_columns_original,
+                                              mapping_rules, stats=stats, match_plan=match_plan)
+            file_key = self.key_of(sheets_dict)
+            if file_key is None:
+                db_match_indexes.extend(build())
+                continue
+            index_key = ("match_indexes", file_key, file_name, tuple(selected_client_columns_original), tuple(selected_db_columns_original),
+                         frozen_rules, match_plan)
+            db_match_indexes.extend(self.get_or_build(index_key, build, parent=file_key))
+        return db_match_indexes
+
+    def summary(self):
+        """
+        Entry counts, memory and hit counts, for display.
+        """
+        with self._lock:
+            files = sum(1 for _, _, parent in self._entries.values() if parent is None)
+            total_bytes = sum(nbytes for _, nbytes, _ in self._entries.values())
+            return {"files": files, "indexes": len(self._entries) - files, "mb": round(total_bytes / 2**20, 1),
+                    "max_mb": round(self.max_bytes / 2**20), "sessions": len(self._holds), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,263 @@
+import itertools
+import logging
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from src.blocking import BlockingConfig, BlockingReport, CandidateBlocker
+from src.column_utils import get_column_mapper, DEFAULT_MAPPING_RULES
+from src.instrumentation import MatchStats
+from src.matcher import MatchPlan, build_match_series, resolve_db_match_columns
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# "sorted_neighbourhood": compare each key with its neighbours in a few sort orders (linear in rows);
+# "blocked": compare each key with the candidates of a CandidateBlocker (as blocking in find_duplicates)
+DEDUP_METHODS = ("sorted_neighbourhood", "blocked")
+# Keys compared with each key in every sort order of the sorted-neighbourhood method
+DEFAULT_WINDOW = 10
+# Key pairs scored per cpdist call
+PAIR_BATCH_SIZE = 200_000
+
+def _sort_orders(unique_keys):
+    """
+    Sort keys for the sorted-neighbourhood passes: the key itself, its tokens in sorted order
+    (catches swapped first/last names) and the reversed key (catches typos in the first letters).
+    """
+    return [unique_keys,
+            [" ".join(sorted(key.split())) for key in unique_keys],
+            [key[::-1] for key in unique_keys]]
+
+def _neighbourhood_pairs(unique_keys, window):
+    """
+    (left, right) arrays of unique-key positions that are within window of each other in any sort order.
+    """
+    pairs = []
+    for sort_keys in _sort_orders(unique_keys):
+        order = np.argsort(np.array(sort_keys, dtype=object), kind="stable")
+        for offset in range(1, min(window, len(order))):
+            pairs.append(np.stack([order[:-offset], order[offset:]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1) # (smaller, larger), so each pair is scored once
+    return np.unique(pairs, axis=0)
+
+def _blocked_pairs(unique_keys, blocking, blocking_report):
+    """
+    (left, right) arrays of unique-key positions where right is a blocking candidate of left.
+    Keys without a block key are compared with every other key.
+    """
+    blocker = CandidateBlocker(unique_keys, blocking)
+    everyone = np.arange(len(unique_keys), dtype=np.int64)
+    lefts, rights = [], []
+    for position, key in enumerate(unique_keys):
+        candidates = blocker.candidates(key)
+        if candidates is None:
+            candidates = everyone
+        candidates = candidates[candidates > position]
+        lefts.append(np.full(len(candidates), position, dtype=np.int64))
+        rights.append(candidates)
+    pairs = np.stack([np.concatenate(lefts), np.concatenate(rights)], axis=1) if lefts else np.empty((0, 2), dtype=np.int64)
+    if blocking_report is not None:
+        blocking_report.add(len(unique_keys) * (len(unique_keys) - 1) // 2, len(pairs))
+    return pairs
+
+def _score_pairs(unique_keys, pairs, fuzzy_threshold, workers=-1):
+    """
+    Returns the pairs whose WRatio reaches fuzzy_threshold, scored element-wise in batches.
+    """
+    keys = np.array(unique_keys, dtype=object)
+    matched = []
+    for start in range(0, len(pairs), PAIR_BATCH_SIZE):
+        batch = pairs[start:start + PAIR_BATCH_SIZE]
+        scores = process.cpdist(keys[batch[:, 0]].tolist(), keys[batch[:, 1]].tolist(), scorer=fuzz.WRatio,
+                                score_cutoff=fuzzy_threshold, dtype=np.float32, workers=workers)
+        matched.append(batch[scores >= fuzzy_threshold])
+    return np.concatenate(matched) if matched else np.empty((0, 2), dtype=np.int64)
+
+def _identifier_pairs(item_identifiers):
+    """
+    (left, right) arrays of item positions that share an identifier: every pair within each identifier.
+    """
+    groups = pd.Series(np.arange(len(item_identifiers)), dtype=np.int64).groupby(pd.Series(item_identifiers, dtype=object), sort=False).indices
+    pairs = [np.array(list(itertools.combinations(positions, 2)), dtype=np.int64) for positions in groups.values() if len(positions) > 1]
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+def _star_clusters(size, pairs, weights):
+    """
+    Greedy star clustering of size items joined by matched pairs. Items are taken by weight (row
+    count), then by number of matches; each item not yet in a cluster becomes the centre of a new
+    one and takes in every matched item that is not in a cluster yet. Every member matches its
+    centre directly, so chains of near matches (a~b, b~c) cannot join unrelated items (a, c)
+    as transitive closure would. Returns each item's centre.
+    """
+    centres = np.full(size, -1, dtype=np.int64)
+    sources = np.concatenate([pairs[:, 0], pairs[:, 1]]).astype(np.int64)
+    targets = np.concatenate([pairs[:, 1], pairs[:, 0]]).astype(np.int64)
+    order = np.argsort(sources, kind="stable")
+    sources, targets = sources[order], targets[order]
+    starts = np.searchsorted(sources, np.arange(size + 1))
+    degrees = np.diff(starts)
+    for item in np.lexsort((np.arange(size), -degrees, -np.asarray(weights))):
+        if centres[item] != -1:
+            continue
+        centres[item] = item
+        neighbours = targets[starts[item]:starts[item + 1]]
+        centres[neighbours[centres[neighbours] == -1]] = item
+    return centres
+
+def _iter_tables(data_parsed):
+    """
+    Yields (file_name, sheet_name, DataFrame) for client data (a dict of sheets or a list of
+    PDF/Word tables, file_name None) and for DB collections ({file_name: {sheet_name: DataFrame}}).
+    """
+    if isinstance(data_parsed, dict):
+        for name, value in data_parsed.items():
+            if isinstance(value, dict):
+                for sheet_name, df in value.items():
+                    yield name, sheet_name, df
+            else:
+                yield None, name, value
+    else:
+        for position, df in enumerate(data_parsed or []):
+            if isinstance(df, pd.DataFrame):
+                yield None, df.attrs.get('source', f"Table {position + 1}"), df
+
+def find_duplicate_groups(data_parsed, selected_columns_original, fuzzy_threshold=85, method="sorted_neighbourhood",
+                          window=DEFAULT_WINDOW, blocking=None, fuzzy_workers=-1, mapping_rules=DEFAULT_MAPPING_RULES, stats=None):
+    """
+    Finds groups of rows that refer to the same person within one data set: a client file
+    (dict of sheets or list of tables) or a collection of DB workbooks ({file_name: {sheet_name:
+    DataFrame}}, e.g. repeat beneficiaries across years). Rows are keyed on 1 or 2 columns as
+    in find_duplicates; for DB collections each sheet's columns are resolved through the
+    standardized names, so differently named headers line up.
+
+    Identifier columns (roll, mobile number, email; see MatchPlan) must be equal after
+    normalization, as in the "fields" match plan, and the other columns form the fuzzy key.
+    Identical keys are grouped directly. Distinct keys are fuzzy compared (WRatio >= fuzzy_threshold)
+    only in candidate pairs, which avoids the quadratic self-join: keys sharing an identifier,
+    or without identifiers, "sorted_neighbourhood" pairs each key with its window nearest keys
+    in three sort orders and "blocked" with its candidates under blocking (a BlockingConfig,
+    trigram by default). Groups are stars around a centre key (see _star_clusters): every key
+    in a group matches the group's centre, so chains of near matches do not merge different people.
+
+    Returns one row per grouped row, ordered by group: cluster_id (1, 2, ... in order of
+    first appearance), cluster_size, source_file, source_sheet, source_row, match_key, then
+    the row's columns. Rows in no group are left out. Stats go to attrs['match_stats'].
+    """
+    if method not in DEDUP_METHODS:
+        raise ValueError(f"Unknown dedup method '{method}'. Expected one of: {', '.join(DEDUP_METHODS)}")
+    if window < 2:
+        raise ValueError("window must be at least 2.")
+    if stats is None:
+        stats = MatchStats()
+    if not selected_columns_original:
+        logging.warning("No columns selected. Aborting duplicate detection.")
+        return pd.DataFrame()
+
+    column_mapper = get_column_mapper(mapping_rules)
+    std_selected_cols = [column_mapper.standardize(col) for col in selected_columns_original]
+    plan = MatchPlan(std_selected_cols, "fields")
+
+    tables, table_keys, table_fuzzy_keys, table_identifier_keys, table_present = [], [], [], [], []
+    for file_name, sheet_name, df in _iter_tables(data_parsed):
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            continue
+        with stats.timer("column_resolution"):
+            match_columns = resolve_db_match_columns(df, std_selected_cols, selected_columns_original, mapping_rules)
+        if len(match_columns) != len(std_selected_cols):
+            logging.warning(f"{file_name or ''} {sheet_name} has no columns matching {selected_columns_original}. Skipping it.")
+            continue
+        with stats.timer("normalization"):
+            keys = build_match_series(df, match_columns).to_numpy(dtype=object)
+            fuzzy_keys = np.array(plan.fuzzy_keys(df, match_columns), dtype=object)
+            identifier_keys = plan.identifier_keys(df, match_columns)
+        # A row takes part only with a non-empty fuzzy key and every identifier present
+        present = np.array([isinstance(key, str) and bool(key.strip()) for key in fuzzy_keys], dtype=bool) \
+                  if plan.fuzzy_columns else np.ones(len(df), dtype=bool)
+        if identifier_keys is None:
+            identifier_keys = np.full(len(df), "", dtype=object)
+        else:
+            present &= np.array([key is not None for key in identifier_keys], dtype=bool)
+        tables.append((file_name, sheet_name, df))
+        table_keys.append(keys)
+        table_fuzzy_keys.append(fuzzy_keys)
+        table_identifier_keys.append(identifier_keys)
+        table_present.append(present)
+        stats.count("rows", len(df))
+    if not tables:
+        return pd.DataFrame()
+
+    # Every row of every table in one array; rows without a complete key take part in no group
+    keys = np.concatenate(table_keys)
+    present = np.concatenate(table_present)
+    fuzzy_keys = np.concatenate(table_fuzzy_keys)[present]
+    identifier_keys = np.concatenate(table_identifier_keys)[present]
+    table_of_row = np.repeat(np.arange(len(tables)), [len(k) for k in table_keys])
+    row_in_table = np.concatenate([np.arange(len(k)) for k in table_keys])
+
+    with stats.timer("exact_lookup"):
+        # An item is a distinct (identifier, fuzzy key), or a distinct fuzzy key without identifiers
+        items = [f"{identifier_key}\x1f{fuzzy_key}" for identifier_key, fuzzy_key in zip(identifier_keys, fuzzy_keys)]
+        key_ids, unique_items = pd.factorize(pd.Series(items, dtype=object))
+        _, first_rows = np.unique(key_ids, return_index=True) # Ids follow first appearance, so this is the first row of each item
+        unique_keys, item_identifiers = fuzzy_keys[first_rows].tolist(), identifier_keys[first_rows].tolist()
+        item_weights = np.bincount(key_ids, minlength=len(unique_items))
+    stats.count("unique_keys", len(unique_items))
+
+    blocking_report = BlockingReport()
+    with stats.timer("fuzzy_scoring"):
+        if plan.identifier_columns:
+            # Without fuzzy columns items are identifiers alone, so equal ones are already one item
+            pairs = _identifier_pairs(item_identifiers) if plan.fuzzy_columns else np.empty((0, 2), dtype=np.int64)
+            blocking_report.add(len(unique_keys) * (len(unique_keys) - 1) // 2, len(pairs))
+        elif method == "sorted_neighbourhood":
+            pairs = _neighbourhood_pairs(unique_keys, window)
+            blocking_report.add(len(unique_keys) * (len(unique_keys) - 1) // 2, len(pairs))
+        else:
+            pairs = _blocked_pairs(unique_keys, blocking or BlockingConfig(), blocking_report)
+        matched_pairs = _score_pairs(unique_keys, pairs, fuzzy_threshold, workers=fuzzy_workers)
+    stats.count("fuzzy_comparisons", blocking_report.comparisons_performed)
+    stats.count("fuzzy_comparisons_skipped", blocking_report.comparisons_skipped)
+    stats.count("fuzzy_links", len(matched_pairs))
+
+    with stats.timer("result_assembly"):
+        key_roots = _star_clusters(len(unique_keys), matched_pairs, item_weights)
+        roots = np.full(len(keys), -1, dtype=np.int64)
+        roots[present] = key_roots[key_ids]
+        root_sizes = np.bincount(roots[present], minlength=len(unique_keys))
+        grouped = np.flatnonzero(present & (root_sizes[np.maximum(roots, 0)] >= 2))
+
+        # Cluster ids follow the first row of each group in table/row order
+        group_roots, first_seen = np.unique(roots[grouped], return_index=True)
+        cluster_of_root = dict(zip(group_roots[np.argsort(first_seen)], range(1, len(group_roots) + 1)))
+        cluster_ids = np.array([cluster_of_root[root] for root in roots[grouped]], dtype=np.int64)
+        order = np.argsort(cluster_ids, kind="stable")
+        grouped, cluster_ids = grouped[order], cluster_ids[order]
+
+        frames = []
+        for table_pos, (file_name, sheet_name, df) in enumerate(tables):
+            in_table = table_of_row[grouped] == table_pos
+            if not in_table.any():
+                continue
+            rows = df.iloc[row_in_table[grouped[in_table]]].reset_index(drop=True)
+            rows.insert(0, 'match_key', keys[grouped[in_table]])
+            rows.insert(0, 'source_row', row_in_table[grouped[in_table]])
+            rows.insert(0, 'source_sheet', sheet_name)
+            rows.insert(0, 'source_file', file_name)
+            rows.insert(0, 'cluster_id', cluster_ids[in_table])
+            rows.index = np.flatnonzero(in_table) # Position in the cluster ordering
+            frames.append(rows)
+        if not frames:
+            groups_df = pd.DataFrame(columns=['cluster_id', 'cluster_size', 'source_file', 'source_sheet', 'source_row', 'match_key'])
+        else:
+            groups_df = pd.concat(frames).sort_index().reset_index(drop=True)
+            groups_df.insert(1, 'cluster_size', groups_df.groupby('cluster_id')['cluster_id'].transform('size'))
+
+    stats.count("duplicate_groups", len(group_roots))
+    stats.count("grouped_rows", len(grouped))
+    logging.info(f"Found {len(group_roots)} duplicate group(s) covering {len(grouped)} of {len(keys)} rows.")
+    groups_df.attrs['blocking_report'] = blocking_report.as_dict()
+    groups_df.attrs['match_stats'] = stats.as_dict()
+    return groups_df
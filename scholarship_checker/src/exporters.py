@@ -0,0 +1,347 @@
+import csv
+import datetime
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Result rows converted and written per step, so only one slice is materialized at a time
+EXPORT_CHUNK_ROWS = 10_000
+# Data rows per xlsx worksheet; Excel allows 1,048,576 rows including the header
+XLSX_MAX_ROWS_PER_SHEET = 1_048_575
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+def _python_values(df):
+    """
+    df's values as Python objects with missing values as None.
+    """
+    values = df.astype(object)
+    return values.where(values.notna(), None)
+
+def _aligned_chunk(writer, df):
+    """
+    df with the writer's columns. The first chunk sets them; a chunk with columns the writer has
+    not seen yet (e.g. a PDF table with other headers) adds them at the end, so no values are
+    left out. Rows written before are widened to the final columns when the writer is closed.
+    """
+    if writer.columns is None:
+        writer.columns = list(df.columns)
+    new_columns = [col for col in df.columns if col not in writer.columns]
+    if new_columns:
+        logging.info(f"Column(s) {', '.join(map(str, new_columns))} are added to {writer.path} after {writer.rows_written} row(s).")
+        writer._widen(writer.columns + new_columns)
+    return df.reindex(columns=writer.columns)
+
+def _part_path(path, part):
+    # Keeps the extension, which readers such as openpyxl go by
+    base, extension = os.path.splitext(path)
+    return f"{base}.part{part}{extension}"
+
+class CsvResultWriter:
+    """
+    Appends result chunks to one CSV file; the header is written with the first chunk.
+    If later chunks add columns, close() rewrites the file once, streaming, with the full header.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+        self.rows_written = 0
+        self._header_columns = None # Columns of the header in the file, when fewer than self.columns
+
+    def _widen(self, columns):
+        if self._header_columns is None:
+            self._header_columns = self.columns
+        self.columns = columns
+
+    def write(self, df):
+        header = self.columns is None
+        _aligned_chunk(self, df).to_csv(self.path, mode='w' if header else 'a', header=header, index=False)
+        self.rows_written += len(df)
+
+    def close(self):
+        if self.columns is None: # Nothing matched; still leave an (empty) file behind
+            open(self.path, 'w').close()
+            return
+        if self._header_columns is None:
+            return
+        # New columns were only ever appended, so padding the short rows at the end lines them up
+        os.replace(self.path, _part_path(self.path, 0))
+        with open(_part_path(self.path, 0), newline='') as source, open(self.path, 'w', newline='') as target:
+            rows = csv.reader(source)
+            output = csv.writer(target, lineterminator=os.linesep)
+            next(rows)
+            output.writerow(self.columns)
+            for row in rows:
+                output.writerow(row + [''] * (len(self.columns) - len(row)))
+        os.remove(_part_path(self.path, 0))
+
+class ParquetResultWriter:
+    """
+    Appends result chunks to one Parquet file as row groups. Values are stored as strings
+    so that client tables whose columns were inferred with different types append cleanly.
+    If later chunks add columns, the rows so far are closed as a part file and close()
+    merges the parts, row group by row group, with the missing columns left null.
+    """
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.columns = None
+        self.rows_written = 0
+        self._writer = None
+        self._parts = [] # Part files finished before the columns last widened
+
+    def _widen(self, columns):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._parts.append(_part_path(self.path, len(self._parts)))
+            os.replace(self.path, self._parts[-1])
+        self.columns = columns
+
+    def _string_table(self, columns):
+        return self._pa.Table.from_pydict({str(col): self._pa.array(values, type=self._pa.string()) for col, values in columns.items()})
+
+    def write(self, df):
+        chunk = _python_values(_aligned_chunk(self, df))
+        table = self._string_table({col: [None if v is None else str(v) for v in chunk[col]] for col in self.columns})
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self.rows_written += len(df)
+
+    def close(self):
+        if self._writer is None and not self._parts:
+            self._pq.write_table(self._pa.table({}), self.path)
+            return
+        if self._writer is not None:
+            self._writer.close()
+        if not self._parts:
+            return
+        if self._writer is not None:
+            self._parts.append(_part_path(self.path, len(self._parts)))
+            os.replace(self.path, self._parts[-1])
+        schema = self._string_table({col: [] for col in self.columns}).schema
+        with self._pq.ParquetWriter(self.path, schema) as writer:
+            for part in self._parts:
+                part_file = self._pq.ParquetFile(part)
+                for row_group in range(part_file.num_row_groups):
+                    table = part_file.read_row_group(row_group)
+                    writer.write_table(self._pa.table([table.column(name) if name in table.column_names else self._pa.nulls(len(table), self._pa.string())
+                                                       for name in schema.names], schema=schema))
+        for part in self._parts:
+            os.remove(part)
+
+class XlsxResultWriter:
+    """
+    Appends result chunks to one xlsx workbook with xlsxwriter in constant_memory mode:
+    each row is flushed to disk as soon as it is written, so memory stays flat however
+    many rows are exported. Rows beyond XLSX_MAX_ROWS_PER_SHEET continue on a new sheet.
+    If later chunks add columns, the rows so far are closed as a part workbook and close()
+    copies the parts, row by row, into the final workbook under the full header.
+    """
+    def __init__(self, path, sheet_name="Results"):
+        self.path = path
+        self.sheet_name = sheet_name
+        self.columns = None
+        self.rows_written = 0
+        self._parts = [] # Part workbooks finished before the columns last widened
+        self._open_workbook()
+
+    def _open_workbook(self):
+        import xlsxwriter
+        self._workbook = xlsxwriter.Workbook(self.path, {"constant_memory": True, "strings_to_numbers": False,
+                                                         "strings_to_formulas": False, "strings_to_urls": False,
+                                                         "nan_inf_to_errors": True})
+        self._date_format = self._workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        self._worksheet = None
+        self._sheet_count = 0
+        self._row = 0
+
+    def _widen(self, columns):
+        if self._worksheet is not None:
+            self._workbook.close()
+            self._parts.append(_part_path(self.path, len(self._parts)))
+            os.replace(self.path, self._parts[-1])
+            self._open_workbook()
+        self.columns = columns
+
+    def _new_sheet(self):
+        self._sheet_count += 1
+        name = self.sheet_name if self._sheet_count == 1 else f"{self.sheet_name}_{self._sheet_count}"
+        self._worksheet = self._workbook.add_worksheet(name)
+        self._worksheet.write_row(0, 0, [str(col) for col in self.columns])
+        self._row = 1
+
+    def _write_value(self, col, value):
+        if value is None:
+            return # Left blank
+        if isinstance(value, bool):
+            self._worksheet.write_boolean(self._row, col, value)
+        elif isinstance(value, (int, float)):
+            self._worksheet.write_number(self._row, col, value)
+        elif isinstance(value, datetime.datetime):
+            self._worksheet.write_datetime(self._row, col, value.replace(tzinfo=None), self._date_format)
+        else:
+            self._worksheet.write_string(self._row, col, str(value))
+
+    def _write_rows(self, rows):
+        if self._worksheet is None:
+            self._new_sheet()
+        for row_values in rows:
+            if self._row > XLSX_MAX_ROWS_PER_SHEET:
+                self._new_sheet()
+            for col, value in enumerate(row_values):
+                self._write_value(col, value)
+            self._row += 1
+
+    def write(self, df):
+        chunk = _aligned_chunk(self, df)
+        self._write_rows(_python_values(chunk).itertuples(index=False, name=None))
+        self.rows_written += len(df)
+
+    def close(self):
+        if self.columns is None: # Nothing matched; still write a valid (empty) workbook
+            self._workbook.add_worksheet(self.sheet_name)
+        if not self._parts:
+            self._workbook.close()
+            return
+        import openpyxl
+        # The rows written since the last widening are the last part; all parts are copied into a new workbook
+        self._workbook.close()
+        self._parts.append(_part_path(self.path, len(self._parts)))
+        os.replace(self.path, self._parts[-1])
+        self._open_workbook()
+        for part in self._parts:
+            part_workbook = openpyxl.load_workbook(part, read_only=True)
+            for worksheet in part_workbook.worksheets:
+                self._write_rows(row for row in worksheet.iter_rows(min_row=2, values_only=True))
+            part_workbook.close()
+        self._workbook.close()
+        for part in self._parts:
+            os.remove(part)
+
+def open_result_writer(path, output_format=None):
+    """
+    Returns a result writer for path; the format defaults to the file extension (csv otherwise).
+    """
+    if output_format is None:
+        extension = os.path.splitext(path)[1].lower().lstrip(".")
+        output_format = extension if extension in EXPORT_FORMATS else "csv"
+    if output_format == "parquet":
+        return ParquetResultWriter(path)
+    if output_format == "xlsx":
+        return XlsxResultWriter(path)
+    return CsvResultWriter(path)
+
+def export_results(results_df, path, output_format=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Writes results_df to path in chunks of chunk_rows rows and returns path.
+    """
+    writer = open_result_writer(path, output_format)
+    try:
+        for start in range(0, len(results_df), chunk_rows):
+            writer.write(results_df.iloc[start:start + chunk_rows])
+    finally:
+        writer.close()
+    return path
+
+class ExportCache:
+    """
+    Exported result files in a temporary directory, one per (results DataFrame, format),
+    so a result set is exported once however often it is downloaded. Like the
+    NormalizationCache, DataFrames are held by weak reference: a file is deleted when its
+    DataFrame goes away, and the least recently used files beyond max_entries are deleted too.
+    """
+    def __init__(self, max_entries=16, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory or tempfile.mkdtemp(prefix="scholarship_exports_")
+        os.makedirs(self.directory, exist_ok=True)
+        self._entries = OrderedDict() # (id(df), output_format) -> (weakref to df, file path)
+        self._lock = threading.Lock()
+        self._export_locks = {} # key -> [Lock, waiting requests], so two requests for one export write it once while other exports proceed
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, results_df, output_format):
+        """
+        Returns the path of results_df exported as output_format, exporting it on first use.
+        """
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{output_format}'. Expected one of: {', '.join(EXPORT_FORMATS)}")
+        key = (id(results_df), output_format)
+        with self._lock:
+            export_lock = self._export_locks.setdefault(key, [threading.Lock(), 0])
+            export_lock[1] += 1
+        try:
+            with export_lock[0]:
+                return self._get_or_export(key, results_df, output_format)
+        finally:
+            with self._lock:
+                export_lock[1] -= 1
+                if not export_lock[1]:
+                    del self._export_locks[key]
+
+    def _get_or_export(self, key, results_df, output_format):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is results_df and os.path.exists(entry[1]):
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        extension = EXPORT_FORMATS[output_format][0]
+        file_descriptor, path = tempfile.mkstemp(prefix="results_", suffix=f".{extension}", dir=self.directory)
+        os.close(file_descriptor)
+        try:
+            export_results(results_df, path, output_format)
+        except Exception:
+            os.remove(path)
+            raise
+        logging.info(f"Exported {len(results_df)} result rows as {output_format} ({os.path.getsize(path)} bytes).")
+
+        def _drop_dead_entry(ref, key=key):
+            with self._lock:
+                if key in self._entries and self._entries[key][0] is ref:
+                    _remove_file(self._entries.pop(key)[1])
+
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None: # Left by a DataFrame that had the same id
+                _remove_file(old_entry[1])
+            self._entries[key] = (weakref.ref(results_df, _drop_dead_entry), path)
+            while len(self._entries) > self.max_entries:
+                _remove_file(self._entries.popitem(last=False)[1][1])
+        return path
+
+    def clear(self):
+        """
+        Deletes every exported file.
+        """
+        with self._lock:
+            for _, path in self._entries.values():
+                _remove_file(path)
+            self._entries.clear()
+
+    def close(self):
+        self.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,205 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.blocking import BlockingReport
+from src.column_utils import DEFAULT_MAPPING_RULES
+from src.instrumentation import MatchStats
+from src.matcher import build_db_match_indexes, prepare_client_frames, assemble_results, record_result_counters
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Score recorded for an exact key match; it passes every threshold
+EXACT_MATCH_SCORE = np.inf
+# Score recorded when no DB row can be compared (empty sheet or no blocked candidates); it passes none
+NO_CANDIDATE_SCORE = -1.0
+
+class IncrementalMatcher:
+    """
+    find_duplicates for one client file and column selection that keeps, across runs,
+    the best score of every (client row, DB sheet) pair it has computed.
+
+    A row matches a sheet at threshold t when its best score there is >= t, so results
+    for any threshold and any set of DB files are derived from the cached scores, and
+    only pairs that were never needed before are scored:
+      * adding a DB file scores only the rows that are still unmatched against it;
+      * removing a DB file re-evaluates only the rows that had matched it;
+      * changing the threshold reuses every cached score.
+    Results are identical to a fresh find_duplicates run with the same arguments.
+    index_builder builds the DB match indexes, as in MatchJob. content_key(file_name, sheets_dict)
+    returns what identifies a DB file's content (e.g. the hash of its bytes) or None; cached scores
+    follow (content key, sheet, match columns), so a file reloaded as new frames (e.g. with other
+    display columns) keeps them. Without a content key, scores follow the sheets dict's identity.
+    """
+    def __init__(self, client_data_parsed, selected_client_columns_original, selected_db_columns_original,
+                 fuzzy_workers=-1, blocking=None, mapping_rules=DEFAULT_MAPPING_RULES, index_builder=build_db_match_indexes,
+                 content_key=None):
+        self.client_data_parsed = client_data_parsed
+        self.selected_client_columns_original = list(selected_client_columns_original)
+        self.selected_db_columns_original = list(selected_db_columns_original)
+        self.fuzzy_workers = fuzzy_workers
+        self.blocking = blocking
+        self.mapping_rules = mapping_rules
+        self.index_builder = index_builder
+        self.content_key = content_key
+
+        self.prepared_clients = prepare_client_frames(client_data_parsed, self.selected_client_columns_original)
+        # Client rows of all frames are flattened into one key list; frame_offsets maps them back
+        self.client_keys = [key for _, client_keys, _, _ in self.prepared_clients for key in client_keys]
+        self.frame_offsets = np.cumsum([0] + [len(client_keys) for _, client_keys, _, _ in self.prepared_clients])
+        self.matchable_rows = np.array([offset + pos for (_, _, _, unresolved), offset in zip(self.prepared_clients, self.frame_offsets)
+                                        for pos in unresolved], dtype=np.int64)
+
+        self._db_files = {} # file_name -> (sheets dict, [DbMatchIndex], content key or None), in DB file order
+        self._scores = {} # (file_name, sheet_name) -> float32 best score per client row, NaN until scored
+        self.pairs_scored = 0 # Client row x DB sheet pairs scored so far, for reporting
+
+    def is_for(self, client_data_parsed, selected_client_columns_original, selected_db_columns_original, blocking=None):
+        """
+        Whether this matcher's cached scores apply to the given client data, column selection and blocking.
+        """
+        return (client_data_parsed is self.client_data_parsed
+                and list(selected_client_columns_original) == self.selected_client_columns_original
+                and list(selected_db_columns_original) == self.selected_db_columns_original
+                and blocking == self.blocking)
+
+    @property
+    def db_file_names(self):
+        return list(self._db_files)
+
+    def add_db_file(self, file_name, sheets_dict):
+        """
+        Adds (or replaces) a DB file after the current ones. Its sheets are indexed now and scored lazily.
+        A replaced file with the same content key keeps the scores of the sheets whose match columns are unchanged.
+        """
+        content_key = self.content_key(file_name, sheets_dict) if self.content_key is not None else None
+        _, previous_indexes, previous_content_key = self._db_files.get(file_name, (None, [], None))
+        kept_scores = {}
+        if content_key is not None and content_key == previous_content_key:
+            kept_scores = {(db_index.sheet_name, tuple(db_index.match_columns)): self._scores[(file_name, db_index.sheet_name)]
+                           for db_index in previous_indexes}
+        self.remove_db_file(file_name)
+        db_indexes = self.index_builder({file_name: sheets_dict}, self.selected_client_columns_original,
+                                        self.selected_db_columns_original, self.mapping_rules)
+        self._db_files[file_name] = (sheets_dict, db_indexes, content_key)
+        for db_index in db_indexes:
+            scores = kept_scores.get((db_index.sheet_name, tuple(db_index.match_columns)))
+            self._scores[(file_name, db_index.sheet_name)] = scores if scores is not None else np.full(len(self.client_keys), np.nan, dtype=np.float32)
+
+    def remove_db_file(self, file_name):
+        """
+        Drops a DB file and its cached scores. Unknown file names are ignored.
+        """
+        _, db_indexes, _ = self._db_files.pop(file_name, (None, [], None))
+        for db_index in db_indexes:
+            self._scores.pop((file_name, db_index.sheet_name), None)
+
+    def sync_db_files(self, db_data_parsed):
+        """
+        Brings the DB files in line with db_data_parsed ({file_name: sheets dict}, in priority order):
+        files that are gone are dropped, new ones and those whose sheets dict was replaced are
+        (re)added, and the order is taken from db_data_parsed. Unchanged files keep their cached
+        scores, and so do reloaded ones whose content key is unchanged (see add_db_file).
+        """
+        for file_name in list(self._db_files):
+            if file_name not in db_data_parsed:
+                self.remove_db_file(file_name)
+        for file_name, sheets_dict in db_data_parsed.items():
+            if file_name not in self._db_files or sheets_dict is not self._db_files[file_name][0]:
+                self.add_db_file(file_name, sheets_dict)
+        self._db_files = {file_name: self._db_files[file_name] for file_name in db_data_parsed}
+
+    def _score_rows(self, db_index, rows, blocking_report, stats):
+        """
+        Best score of each client row in rows against one DB sheet: EXACT_MATCH_SCORE for an exact
+        key, otherwise the best WRatio (NO_CANDIDATE_SCORE when there is nothing to compare).
+        """
+        scores = np.full(len(rows), NO_CANDIDATE_SCORE, dtype=np.float32)
+        fuzzy_rows = []
+        with stats.timer("exact_lookup"):
+            for row_pos, row in enumerate(rows):
+                if db_index.first_exact(self.client_keys[row]) is None:
+                    fuzzy_rows.append(row_pos)
+                else:
+                    scores[row_pos] = EXACT_MATCH_SCORE
+        stats.count("exact_lookups", len(rows))
+        stats.count("exact_hits", len(rows) - len(fuzzy_rows))
+
+        if fuzzy_rows:
+            # A cutoff of 0 keeps the true best score, so it can be compared with any later threshold
+            with stats.timer("fuzzy_scoring"):
+                positions, fuzzy_scores = db_index.best_fuzzy([self.client_keys[rows[row_pos]] for row_pos in fuzzy_rows], 0,
+                                                              workers=self.fuzzy_workers, blocking=self.blocking,
+                                                              blocking_report=blocking_report)
+            stats.count("fuzzy_queries", len(fuzzy_rows))
+            scores[fuzzy_rows] = np.where(positions >= 0, fuzzy_scores, NO_CANDIDATE_SCORE)
+        self.pairs_scored += len(rows)
+        return scores
+
+    def _match_rows(self, rows, matched_index, db_match_indexes, fuzzy_threshold, blocking_report, stats):
+        """
+        Sets matched_index for rows (flattened client row positions) to the first DB sheet whose
+        score reaches fuzzy_threshold, scoring the pairs not cached yet.
+        """
+        unresolved = rows
+        # Sheets are visited in file/sheet order, so the earliest matching file and sheet win as in find_duplicates
+        for index_pos, db_index in enumerate(db_match_indexes):
+            if not len(unresolved):
+                break
+            scores = self._scores[(db_index.file_name, db_index.sheet_name)]
+            unscored = unresolved[np.isnan(scores[unresolved])]
+            if len(unscored):
+                scores[unscored] = self._score_rows(db_index, unscored, blocking_report, stats)
+            hit = scores[unresolved] >= fuzzy_threshold
+            matched_index[unresolved[hit]] = index_pos
+            unresolved = unresolved[~hit]
+
+    def results(self, fuzzy_threshold, stats=None, chunk_rows=None, progress=None, cancel_event=None):
+        """
+        Returns the results DataFrame for fuzzy_threshold over the current DB files, scoring only
+        the (row, sheet) pairs not already cached. results_df.attrs['pairs_scored'] holds the number
+        of pairs this call had to score and results_df.attrs['match_stats'] the timings and counters
+        of this call, as in find_duplicates.
+        Rows are matched chunk_rows at a time (all at once by default); progress(rows_done) is called
+        after each chunk, and once cancel_event (a threading.Event) is set the remaining rows are left
+        out of the results, which then cover the client rows before them.
+        """
+        if not self.selected_client_columns_original or not self.selected_db_columns_original:
+            logging.warning("Client or DB columns not selected. Aborting matching.")
+            return pd.DataFrame()
+
+        blocking_report = BlockingReport()
+        if stats is None:
+            stats = MatchStats()
+        pairs_scored_before = self.pairs_scored
+        db_match_indexes = [db_index for _, db_indexes, _ in self._db_files.values() for db_index in db_indexes]
+
+        matched_index = np.full(len(self.client_keys), -1, dtype=np.int64)
+        chunk_rows = chunk_rows or max(len(self.matchable_rows), 1)
+        rows_done = len(self.client_keys)
+        for start in range(0, len(self.matchable_rows), chunk_rows):
+            if cancel_event is not None and cancel_event.is_set():
+                rows_done = int(self.matchable_rows[start]) # Every client row before the first unmatched chunk
+                break
+            self._match_rows(self.matchable_rows[start:start + chunk_rows], matched_index, db_match_indexes, fuzzy_threshold, blocking_report, stats)
+            if progress is not None:
+                end = start + chunk_rows
+                progress(int(self.matchable_rows[end]) if end < len(self.matchable_rows) else len(self.client_keys))
+
+        pairs_scored = self.pairs_scored - pairs_scored_before
+        logging.info(f"Incremental matching scored {pairs_scored} new client row x DB sheet pair(s).")
+
+        matched_indexes = [matched_index[start:end] for start, end in zip(self.frame_offsets[:-1], self.frame_offsets[1:])]
+        with stats.timer("result_assembly"):
+            results_df = assemble_results(self.prepared_clients, matched_indexes, db_match_indexes)
+            if rows_done < len(results_df):
+                results_df = results_df.iloc[:rows_done].copy()
+        if results_df.empty:
+            return results_df
+        stats.count("pairs_scored", pairs_scored)
+        record_result_counters(stats, results_df, blocking_report)
+        results_df.attrs['blocking_report'] = blocking_report.as_dict()
+        results_df.attrs['match_stats'] = stats.as_dict()
+        results_df.attrs['pairs_scored'] = pairs_scored
+        return results_df
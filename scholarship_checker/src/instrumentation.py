@@ -0,0 +1,71 @@
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Pipeline stages in the order they run; other stage names are reported after these
+STAGES = ("parse", "column_resolution", "normalization", "exact_lookup", "fuzzy_scoring", "result_assembly")
+
+class MatchStats:
+    """
+    Wall-clock timers per pipeline stage and named counters for one matching run.
+    Timers and counters accumulate, so one MatchStats can cover several calls.
+    """
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_time(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + int(amount)
+
+    def merge(self, other):
+        """
+        Adds the timings and counters of another MatchStats (or of its as_dict()) to this one.
+        """
+        if isinstance(other, dict):
+            timings, counters = other.get("timings", {}), other.get("counters", {})
+        else:
+            timings, counters = other.timings, other.counters
+        for stage, seconds in timings.items():
+            self.add_time(stage, seconds)
+        for counter, amount in counters.items():
+            self.count(counter, amount)
+        return self
+
+    def ordered_timings(self):
+        ordered = {stage: self.timings[stage] for stage in STAGES if stage in self.timings}
+        ordered.update({stage: seconds for stage, seconds in self.timings.items() if stage not in ordered})
+        return ordered
+
+    def as_dict(self):
+        return {"timings": {stage: round(seconds, 6) for stage, seconds in self.ordered_timings().items()},
+                "counters": dict(self.counters)}
+
+    def timings_frame(self):
+        """
+        One row per stage with its seconds and share of the total, for display.
+        """
+        timings = self.ordered_timings()
+        total = sum(timings.values())
+        return pd.DataFrame({"stage": list(timings), "seconds": [round(s, 4) for s in timings.values()],
+                             "share": [f"{s / total:.0%}" if total else "-" for s in timings.values()]})
+
+    def counters_frame(self):
+        return pd.DataFrame({"counter": list(self.counters), "value": list(self.counters.values())})
+
+    def report(self):
+        """
+        One-line summary of the stage timings, e.g. for command-line output.
+        """
+        return ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in self.ordered_timings().items())
@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+
+import pandas as pd
+
+from src.blocking import BlockingReport
+from src.column_utils import DEFAULT_MAPPING_RULES
+from src.instrumentation import MatchStats
+from src.matcher import build_db_match_indexes, find_duplicates, match_worker_pool
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Client rows matched per step; cancellation and progress updates happen between steps
+JOB_CHUNK_ROWS = 5000
+# Job states: pending -> running -> done / cancelled / failed
+FINISHED_STATES = ("done", "cancelled", "failed")
+
+def iter_client_chunks(client_data_parsed, selected_client_columns_original, chunk_rows=JOB_CHUNK_ROWS):
+    """
+    Yields the non-empty client DataFrames that have the selected columns in slices of at
+    most chunk_rows rows, in sheet/table order. Slices are views, not copies.
+    """
+    if isinstance(client_data_parsed, dict): # Excel
+        client_dfs = client_data_parsed.values()
+    else: # PDF/Word
+        client_dfs = client_data_parsed or []
+    for client_df in client_dfs:
+        if not isinstance(client_df, pd.DataFrame) or client_df.empty:
+            continue
+        if any(col not in client_df.columns for col in selected_client_columns_original):
+            logging.warning(f"Client table {client_df.attrs.get('source', '')} is missing selected columns. Skipping it.")
+            continue
+        for start in range(0, len(client_df), chunk_rows):
+            yield client_df.iloc[start:start + chunk_rows]
+
+class MatchJob:
+    """
+    Runs find_duplicates in a background thread, one client chunk at a time, so a caller
+    (e.g. a Streamlit session) stays responsive. The DB match indexes are built once; every
+    chunk is then matched against them and its results are kept, so progress and partial
+    results can be read while the job runs and the job can be cancelled between chunks.
+    match_kwargs are passed on to find_duplicates (fuzzy_threshold, blocking, match_mode, ...).
+    index_builder builds the DB match indexes; it takes the arguments of build_db_match_indexes
+    (e.g. CorpusRegistry.match_indexes, to reuse indexes shared between sessions).
+    """
+    def __init__(self, client_data_parsed, selected_client_columns_original, db_data_parsed, selected_db_columns_original,
+                 chunk_rows=JOB_CHUNK_ROWS, stats=None, index_builder=build_db_match_indexes, **match_kwargs):
+        self.client_data_parsed = client_data_parsed
+        self.selected_client_columns_original = list(selected_client_columns_original)
+        self.db_data_parsed = db_data_parsed
+        self.selected_db_columns_original = list(selected_db_columns_original)
+        self.chunk_rows = chunk_rows
+        self.stats = stats if stats is not None else MatchStats()
+        self.index_builder = index_builder
+        self.match_kwargs = match_kwargs
+
+        self._chunks = list(iter_client_chunks(client_data_parsed, self.selected_client_columns_original, chunk_rows))
+        self.rows_total = sum(len(chunk) for chunk in self._chunks)
+        self.rows_done = 0
+        self.state = "pending"
+        self.error = None
+        self.started_at = None
+        self.matching_started_at = None # After the DB indexes are built; throughput is measured from here
+        self.finished_at = None
+
+        self._result_chunks = []
+        self._blocking_report = BlockingReport()
+        self._stats_snapshot = self.stats.as_dict() # Copy taken by the worker after each chunk, safe to read meanwhile
+        self._lock = threading.Lock()
+        self._cancel_requested = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.state = "running"
+        self._thread = threading.Thread(target=self._run, name="match-job", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """
+        Asks the job to stop; it does so after the chunk being matched. Results so far are kept.
+        """
+        self._cancel_requested.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    def _run(self):
+        try:
+            db_match_indexes = self.index_builder(self.db_data_parsed, self.selected_client_columns_original, self.selected_db_columns_original,
+                                                  self.match_kwargs.get("mapping_rules", DEFAULT_MAPPING_RULES), stats=self.stats,
+                                                  match_plan=self.match_kwargs.get("match_plan", "combined"))
+            self.matching_started_at = time.perf_counter()
+            # With worker processes, one pool holding the indexes serves every chunk
+            workers = self.match_kwargs.get("workers")
+            pool = match_worker_pool(db_match_indexes, workers) \
+                   if workers is not None and workers > 1 and self.match_kwargs.get("match_mode", "first") == "first" and db_match_indexes else None
+            try:
+                for chunk in self._chunks:
+                    if self._cancel_requested.is_set():
+                        break
+                    chunk_results = find_duplicates([chunk], self.selected_client_columns_original, self.db_data_parsed, self.selected_db_columns_original,
+                                                    db_match_indexes=db_match_indexes, stats=self.stats, pool=pool, **self.match_kwargs)
+                    with self._lock:
+                        self._result_chunks.append(chunk_results)
+                        self.rows_done += len(chunk)
+                        report = chunk_results.attrs.get('blocking_report', {})
+                        self._blocking_report.add(report.get('comparisons_total', 0), report.get('comparisons_performed', 0))
+                        self._stats_snapshot = self.stats.as_dict()
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+            self.state = "cancelled" if self._cancel_requested.is_set() and self.rows_done < self.rows_total else "done"
+        except Exception as e:
+            logging.exception(f"Matching job failed: {e}")
+            self.error = str(e)
+            self.state = "failed"
+        finally:
+            self.finished_at = time.perf_counter()
+            logging.info(f"Matching job {self.state} after {self.rows_done} of {self.rows_total} client rows.")
+
+    def progress(self):
+        """
+        Snapshot of the job: state, rows_done, rows_total, fraction, elapsed_seconds,
+        rows_per_second and eta_seconds (None until the throughput is known), and error.
+        """
+        now = self.finished_at or time.perf_counter()
+        rows_done = self.rows_done
+        elapsed = now - self.started_at if self.started_at else 0.0
+        matching_elapsed = now - self.matching_started_at if self.matching_started_at else 0.0
+        rows_per_second = rows_done / matching_elapsed if rows_done and matching_elapsed > 0 else None
+        eta = (self.rows_total - rows_done) / rows_per_second if rows_per_second and not self.finished else None
+        return {
+            "state": self.state,
+            "rows_done": rows_done,
+            "rows_total": self.rows_total,
+            "fraction": rows_done / self.rows_total if self.rows_total else 1.0,
+            "elapsed_seconds": elapsed,
+            "rows_per_second": rows_per_second,
+            "eta_seconds": eta,
+            "error": self.error,
+        }
+
+    def results(self):
+        """
+        The results of the chunks matched so far, in client row order (the full results
+        once the job is done), with the job's stats in attrs['match_stats'].
+        """
+        with self._lock:
+            result_chunks = list(self._result_chunks)
+            blocking_report = self._blocking_report.as_dict()
+            stats_snapshot = self._stats_snapshot
+        result_chunks = [chunk for chunk in result_chunks if not chunk.empty]
+        if not result_chunks:
+            return pd.DataFrame()
+        results_df = pd.concat(result_chunks, ignore_index=True)
+        results_df.attrs = {'blocking_report': blocking_report, 'match_stats': stats_snapshot}
+        return results_df
+
+class IncrementalMatchJob(MatchJob):
+    """
+    MatchJob for an IncrementalMatcher: brings its DB files in line with db_data_parsed
+    (indexing new files) and computes its results for fuzzy_threshold in the background,
+    chunk_rows client rows at a time, with the same progress, cancel and results interface.
+    Only pairs missing from the matcher's cache are scored. Results appear when the job ends;
+    a cancelled job keeps the results of the client rows before the cancel.
+    The matcher must not be used elsewhere while the job runs.
+    """
+    def __init__(self, matcher, db_data_parsed, fuzzy_threshold, chunk_rows=JOB_CHUNK_ROWS, stats=None):
+        super().__init__(matcher.client_data_parsed, matcher.selected_client_columns_original, db_data_parsed,
+                         matcher.selected_db_columns_original, chunk_rows=chunk_rows, stats=stats)
+        self.matcher = matcher
+        self.fuzzy_threshold = fuzzy_threshold
+        self.rows_total = len(matcher.client_keys)
+
+    def _record_progress(self, rows_done):
+        with self._lock:
+            self.rows_done = rows_done
+            self._stats_snapshot = self.stats.as_dict()
+
+    def _run(self):
+        try:
+            self.matcher.sync_db_files(self.db_data_parsed)
+            self.matching_started_at = time.perf_counter()
+            results_df = self.matcher.results(self.fuzzy_threshold, stats=self.stats, chunk_rows=self.chunk_rows,
+                                              progress=self._record_progress, cancel_event=self._cancel_requested)
+            with self._lock:
+                self._result_chunks.append(results_df)
+                self.rows_done = len(results_df) if not results_df.empty else self.rows_done
+                report = results_df.attrs.get('blocking_report', {})
+                self._blocking_report.add(report.get('comparisons_total', 0), report.get('comparisons_performed', 0))
+                self._stats_snapshot = self.stats.as_dict()
+            self.state = "cancelled" if self._cancel_requested.is_set() and self.rows_done < self.rows_total else "done"
+        except Exception as e:
+            logging.exception(f"Matching job failed: {e}")
+            self.error = str(e)
+            self.state = "failed"
+        finally:
+            self.finished_at = time.perf_counter()
+            logging.info(f"Matching job {self.state} after {self.rows_done} of {self.rows_total} client rows.")
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.column_utils import get_column_mapper, DEFAULT_MAPPING_RULES
+from src.parse_cache import content_hash
+from src.parsers import parse_excel
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_STORE_PATH = os.environ.get("SCHOLARSHIP_MATCH_STORE",
+                                    os.path.join(os.path.expanduser("~"), ".local", "share", "scholarship_checker", "match_store.sqlite"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sheets (
+    sheet_id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    sheet_name TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sheet_columns (
+    sheet_id INTEGER NOT NULL REFERENCES sheets(sheet_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    column_name TEXT NOT NULL,
+    PRIMARY KEY (sheet_id, column_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sheet_values (
+    sheet_id INTEGER NOT NULL REFERENCES sheets(sheet_id) ON DELETE CASCADE,
+    column_name TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (sheet_id, column_name, row)
+) WITHOUT ROWID;
+"""
+
+def mapped_columns(columns, mapping_rules=DEFAULT_MAPPING_RULES):
+    """
+    Returns the columns whose name maps to one of the standard names of mapping_rules
+    (name, roll_number, mobile_number, ...), i.e. the columns a match can be made on.
+    """
+    column_mapper = get_column_mapper(mapping_rules)
+    return [col for col in columns if column_mapper.standardize(col) in mapping_rules]
+
+def _kept_columns(df, columns=None, mapping_rules=DEFAULT_MAPPING_RULES):
+    """
+    The columns of df the store keeps: the mapped ones, then those of columns that df has.
+    """
+    return [col for col in dict.fromkeys(mapped_columns(df.columns, mapping_rules) + list(columns or []))
+            if isinstance(col, str) and col in df.columns]
+
+class MatchStore:
+    """
+    Persistent SQLite store of the match columns (and chosen display columns) of DB workbooks,
+    so a historical database is ingested once and every later run loads only the stored columns
+    instead of re-uploading and re-parsing the workbooks. Each value is kept as text, as the
+    matcher reads it, with its source file, sheet and row.
+
+    It is a cache of parsed columns, not a key index: normalized keys are not stored, because
+    reading them back from SQLite is slower than normalizing the loaded columns (one Arrow
+    pass). Match indexes are built from the loaded frames as for uploads; within a process the
+    frames are reused, so their normalized columns stay memoized (see NormalizationCache).
+
+    Files are identified by name: ingesting a file again is a no-op while its bytes are
+    unchanged and its stored columns cover the requested ones, and replaces the stored copy
+    otherwise, so yearly files can be added one at a time. load() returns the stored sheets
+    in the same {file_name: {sheet_name: DataFrame}} form as parsed uploads, so they go through
+    find_duplicates, IncrementalMatcher and MatchJob unchanged, which normalize them as usual.
+    """
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared by the Streamlit session threads, serialized by the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._loaded = {} # file_name -> (content_hash, columns, sheets dict) returned by load()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def file_hash(self, file_name):
+        """
+        Returns the content hash the stored copy of file_name was ingested from, or None.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT content_hash FROM files WHERE file_name = ?", (file_name,)).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, file_name, sheets_dict, digest, columns=None, mapping_rules=DEFAULT_MAPPING_RULES):
+        """
+        Stores the columns of a parsed workbook ({sheet_name: DataFrame}) under
+        file_name, replacing any earlier copy. columns lists extra columns to keep besides
+        the ones mapping_rules maps to a standard name. Returns the number of stored sheets.
+        """
+        stored_sheets = 0
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM files WHERE file_name = ?", (file_name,))
+            file_id = self._connection.execute("INSERT INTO files (file_name, content_hash, ingested_at) VALUES (?, ?, ?)",
+                                               (file_name, digest, datetime.now(timezone.utc).isoformat(timespec="seconds"))).lastrowid
+            for position, (sheet_name, df) in enumerate(sheets_dict.items()):
+                keep = _kept_columns(df, columns, mapping_rules)
+                if df.empty or not keep:
+                    continue
+                sheet_id = self._connection.execute("INSERT INTO sheets (file_id, position, sheet_name, row_count) VALUES (?, ?, ?, ?)",
+                                                    (file_id, position, str(sheet_name), len(df))).lastrowid
+                self._connection.executemany("INSERT INTO sheet_columns (sheet_id, position, column_name) VALUES (?, ?, ?)",
+                                             [(sheet_id, col_pos, col) for col_pos, col in enumerate(keep)])
+                for col in keep:
+                    # The text the matcher's astype(str) gives (dates without a time, ...); missing values are not stored
+                    values = df[col].astype(str).to_numpy(dtype=object)
+                    present = np.flatnonzero(df[col].notna().to_numpy())
+                    self._connection.executemany("INSERT INTO sheet_values (sheet_id, column_name, row, value) VALUES (?, ?, ?, ?)",
+                                                 ((sheet_id, col, int(row), values[row]) for row in present))
+                stored_sheets += 1
+            self._loaded.pop(file_name, None)
+        logging.info(f"Stored {stored_sheets} sheet(s) of {file_name} in the match store.")
+        return stored_sheets
+
+    def ingest_file(self, file_name, file_content, parse_cache=None, columns=None, mapping_rules=DEFAULT_MAPPING_RULES):
+        """
+        Parses a DB workbook with parsers.parse_excel (through parse_cache when given) and stores
+        it, unless a copy with the same bytes and all the requested columns it has is already
+        stored. Returns True if it was (re)ingested.
+        """
+        digest = content_hash(file_content)
+        stored_columns = self.stored_columns(file_name) if self.file_hash(file_name) == digest else None
+        if stored_columns is not None and set(columns or []) <= stored_columns:
+            logging.info(f"{file_name} is already in the match store. Skipping it.")
+            return False
+        if parse_cache is not None:
+            sheets_dict = parse_cache.cached_parse(parse_excel, file_content, file_name)
+        else:
+            sheets_dict = parse_excel(file_content, file_name)
+        if not sheets_dict:
+            logging.warning(f"Could not parse {file_name}; the match store is unchanged.")
+            return False
+        if stored_columns is not None and all(set(_kept_columns(df, columns, mapping_rules)) <= stored_columns
+                                              for df in sheets_dict.values() if not df.empty):
+            # The requested columns that are not stored are not in the workbook either
+            logging.info(f"{file_name} is already in the match store. Skipping it.")
+            return False
+        self.ingest(file_name, sheets_dict, digest, columns=columns, mapping_rules=mapping_rules)
+        return True
+
+    def stored_columns(self, file_name):
+        """
+        The set of columns stored for any sheet of file_name (empty if it is not stored).
+        """
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT DISTINCT c.column_name FROM files f JOIN sheets s ON s.file_id = f.file_id JOIN sheet_columns c ON c.sheet_id = s.sheet_id
+                WHERE f.file_name = ?""", (file_name,)).fetchall()
+        return {row[0] for row in rows}
+
+    def remove_file(self, file_name):
+        """
+        Drops a stored file. Unknown file names are ignored.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM files WHERE file_name = ?", (file_name,))
+            self._loaded.pop(file_name, None)
+
+    def files(self):
+        """
+        One row per stored file, in file-name order: file_name, sheets, rows and ingested_at.
+        """
+        with self._lock:
+            return pd.read_sql_query("""
+                SELECT f.file_name, COUNT(s.sheet_id) AS sheets, COALESCE(SUM(s.row_count), 0) AS rows, f.ingested_at
+                FROM files f LEFT JOIN sheets s ON s.file_id = f.file_id
+                GROUP BY f.file_id ORDER BY f.file_name""", self._connection)
+
+    def headers(self):
+        """
+        {file_name: {sheet_name: empty DataFrame}} with the stored columns of every sheet, in
+        file-name order, in the form of parsers.parse_excel_headers (e.g. for db_columns_to_load).
+        """
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT f.file_name, s.sheet_name, c.column_name
+                FROM files f JOIN sheets s ON s.file_id = f.file_id JOIN sheet_columns c ON c.sheet_id = s.sheet_id
+                ORDER BY f.file_name, s.position, c.position""").fetchall()
+        headers = {}
+        for file_name, sheet_name, column_name in rows:
+            headers.setdefault(file_name, {}).setdefault(sheet_name, []).append(column_name)
+        return {file_name: {sheet_name: pd.DataFrame(columns=columns) for sheet_name, columns in sheets.items()}
+                for file_name, sheets in headers.items()}
+
+    def load(self, columns, file_names=None):
+        """
+        Returns {file_name: {sheet_name: DataFrame}} with the stored values of columns (where a
+        sheet has them), in file-name order, optionally only for file_names. Sheets without any
+        of the columns are left out. The dict of a file is reused across calls until the file is
+        re-ingested, so callers that cache by identity (IncrementalMatcher) keep their scores.
+        """
+        columns = tuple(columns)
+        with self._lock:
+            stored = self._connection.execute("SELECT file_name, content_hash FROM files ORDER BY file_name").fetchall()
+            db_data = {}
+            for file_name, digest in stored:
+                if file_names is not None and file_name not in file_names:
+                    continue
+                loaded = self._loaded.get(file_name)
+                if loaded is None or loaded[0] != digest or loaded[1] != columns:
+                    loaded = (digest, columns, self._load_file(file_name, columns))
+                    self._loaded[file_name] = loaded
+                if loaded[2]:
+                    db_data[file_name] = loaded[2]
+        return db_data
+
+    def key_of(self, sheets_dict):
+        """
+        (file_name, content hash) of a sheets dict load() returned, or None (like CorpusRegistry.key_of).
+        """
+        with self._lock:
+            for file_name, (digest, _, loaded_sheets) in self._loaded.items():
+                if loaded_sheets is sheets_dict:
+                    return file_name, digest
+        return None
+
+    def _load_file(self, file_name, columns):
+        sheets_dict = {}
+        sheets = self._connection.execute("""
+            SELECT s.sheet_id, s.sheet_name, s.row_count FROM sheets s JOIN files f ON f.file_id = s.file_id
+            WHERE f.file_name = ? ORDER BY s.position""", (file_name,)).fetchall()
+        for sheet_id, sheet_name, row_count in sheets:
+            stored_columns = [row[0] for row in self._connection.execute(
+                "SELECT column_name FROM sheet_columns WHERE sheet_id = ? ORDER BY position", (sheet_id,))]
+            sheet_columns = [col for col in columns if col in stored_columns]
+            if not sheet_columns:
+                continue
+            # One query per sheet; each column comes back as two JSON arrays, which decode far faster than row tuples
+            data = {col: np.full(row_count, None, dtype=object) for col in sheet_columns}
+            for col, positions, values in self._connection.execute(f"""
+                    SELECT column_name, json_group_array(row), json_group_array(value) FROM sheet_values
+                    WHERE sheet_id = ? AND column_name IN ({', '.join('?' * len(sheet_columns))}) GROUP BY column_name""", (sheet_id, *sheet_columns)):
+                data[col][np.array(json.loads(positions), dtype=np.int64)] = np.array(json.loads(values), dtype=object)
+            # Missing values were not stored, so the rows they leave out stay missing
+            df = pd.DataFrame({col: pd.Series(values, dtype="str") for col, values in data.items()})
+            df.attrs['source'] = f"{file_name} - {sheet_name} (match store)"
+            sheets_dict[sheet_name] = df
+        return sheets_dict
@@ -1,31 +1,560 @@
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from rapidfuzz import fuzz, process
-from src.column_utils import clean_column_values, get_standardized_column_name, DEFAULT_MAPPING_RULES
+from src.column_utils import normalized_column, get_column_mapper, DEFAULT_MAPPING_RULES
+from src.blocking import BlockingReport, CandidateBlocker
+from src.instrumentation import MatchStats
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def find_duplicates(client_data_parsed, selected_client_columns_original, 
-                    db_data_parsed, selected_db_columns_original, 
-                    fuzzy_threshold=85):
+# Upper bound on client x DB cells scored by one cdist call (float32, ~20 MB)
+MAX_SCORE_MATRIX_CELLS = 5_000_000
+# Client rows per work unit in parallel mode (each unit is one client chunk x one DB sheet)
+PARALLEL_CHUNK_ROWS = 2000
+# "first": stop at the first file/sheet with a hit (fast path); "best": top-k candidates over all sheets
+MATCH_MODES = ("first", "best")
+# "combined": the selected columns form one key, matched exactly and then fuzzily;
+# "fields": identifier columns are hash-joined on their own and only the other columns are fuzzy scored
+MATCH_PLANS = ("combined", "fields")
+# Standardized column names the "fields" plan matches exactly, with the normalization profile of each
+IDENTIFIER_FIELD_PROFILES = {"roll_number": "identifier", "mobile_number": "mobile", "email": "default"}
+
+def score_fuzzy_batch(queries, choices, fuzzy_threshold, workers=-1):
     """
-    Finds duplicates between client data and database data using selected columns.
+    Scores every query against every choice with WRatio in batched cdist calls.
+    Returns (best_choice, best_score) arrays; best_choice is -1 where no choice
+    reaches fuzzy_threshold, matching process.extractOne(score_cutoff=fuzzy_threshold).
     """
-    results_list = []
-    
-    if not selected_client_columns_original or not selected_db_columns_original:
-        logging.warning("Client or DB columns not selected. Aborting matching.")
-        return pd.DataFrame()
+    best_choice = np.full(len(queries), -1, dtype=np.int64)
+    best_score = np.zeros(len(queries), dtype=np.float32)
+    if not queries or not choices:
+        return best_choice, best_score
 
-    std_selected_client_cols = [get_standardized_column_name(col, DEFAULT_MAPPING_RULES) for col in selected_client_columns_original]
-    logging.info(f"Standardized selected client columns: {std_selected_client_cols}")
+    # Chunk the queries so the score matrix stays within MAX_SCORE_MATRIX_CELLS
+    chunk_size = max(1, MAX_SCORE_MATRIX_CELLS // len(choices))
+    for start in range(0, len(queries), chunk_size):
+        scores = process.cdist(queries[start:start + chunk_size], choices, scorer=fuzz.WRatio,
+                               score_cutoff=fuzzy_threshold, dtype=np.float32, workers=workers)
+        chunk_best = scores.argmax(axis=1) # First best choice, as extractOne picks
+        chunk_score = scores[np.arange(len(chunk_best)), chunk_best]
+        hit = chunk_score >= fuzzy_threshold
+        best_choice[start:start + chunk_size] = np.where(hit, chunk_best, -1)
+        best_score[start:start + chunk_size] = np.where(hit, chunk_score, 0)
+    return best_choice, best_score
+
+def score_fuzzy_blocked(queries, choices, blocker, fuzzy_threshold, workers=-1, blocking_report=None):
+    """
+    Like score_fuzzy_batch, but each query is only scored against the candidates
+    its blocker returns. Queries without a block key are scored against all choices.
+    """
+    best_choice = np.full(len(queries), -1, dtype=np.int64)
+    best_score = np.zeros(len(queries), dtype=np.float32)
+    unblocked = []
+    comparisons = 0
+
+    for query_pos, query in enumerate(queries):
+        candidates = blocker.candidates(query)
+        if candidates is None:
+            unblocked.append(query_pos)
+            continue
+        comparisons += len(candidates)
+        if not len(candidates):
+            continue
+        result = process.extractOne(query, [choices[c] for c in candidates], scorer=fuzz.WRatio, score_cutoff=fuzzy_threshold)
+        if result:
+            best_choice[query_pos] = candidates[result[2]]
+            best_score[query_pos] = result[1]
+
+    if unblocked:
+        unblocked_choice, unblocked_score = score_fuzzy_batch([queries[q] for q in unblocked], choices, fuzzy_threshold, workers=workers)
+        best_choice[unblocked] = unblocked_choice
+        best_score[unblocked] = unblocked_score
+        comparisons += len(unblocked) * len(choices)
+
+    if blocking_report is not None:
+        blocking_report.add(len(queries) * len(choices), comparisons)
+    return best_choice, best_score
+
+def score_fuzzy_top_k(queries, choices, k, fuzzy_threshold, workers=-1):
+    """
+    Batched top-k version of score_fuzzy_batch. Returns (top_choice, top_score) arrays of
+    shape (len(queries), k), best first; equal scores keep the lower choice index first and
+    slots without a choice reaching fuzzy_threshold hold -1. Column 0 equals score_fuzzy_batch.
+    """
+    top_choice = np.full((len(queries), k), -1, dtype=np.int64)
+    top_score = np.zeros((len(queries), k), dtype=np.float32)
+    if not queries or not choices:
+        return top_choice, top_score
+
+    chunk_size = max(1, MAX_SCORE_MATRIX_CELLS // len(choices))
+    for start in range(0, len(queries), chunk_size):
+        scores = process.cdist(queries[start:start + chunk_size], choices, scorer=fuzz.WRatio,
+                               score_cutoff=fuzzy_threshold, dtype=np.float32, workers=workers)
+        rows = np.arange(len(scores))
+        # k argmax passes are cheaper than sorting whole rows for the small k used here
+        for rank in range(min(k, len(choices))):
+            chunk_best = scores.argmax(axis=1)
+            chunk_score = scores[rows, chunk_best]
+            hit = chunk_score >= fuzzy_threshold
+            top_choice[start:start + chunk_size, rank] = np.where(hit, chunk_best, -1)
+            top_score[start:start + chunk_size, rank] = np.where(hit, chunk_score, 0)
+            scores[rows, chunk_best] = -1 # Below any threshold, so a choice is picked once
+    return top_choice, top_score
+
+def score_fuzzy_blocked_top_k(queries, choices, blocker, k, fuzzy_threshold, workers=-1, blocking_report=None):
+    """
+    Like score_fuzzy_top_k, but each query is only scored against the candidates its
+    blocker returns. Queries without a block key are scored against all choices.
+    """
+    top_choice = np.full((len(queries), k), -1, dtype=np.int64)
+    top_score = np.zeros((len(queries), k), dtype=np.float32)
+    unblocked = []
+    comparisons = 0
+
+    for query_pos, query in enumerate(queries):
+        candidates = blocker.candidates(query)
+        if candidates is None:
+            unblocked.append(query_pos)
+            continue
+        comparisons += len(candidates)
+        if not len(candidates):
+            continue
+        results = process.extract(query, [choices[c] for c in candidates], scorer=fuzz.WRatio, score_cutoff=fuzzy_threshold, limit=k)
+        for rank, (_, score, candidate_pos) in enumerate(results):
+            top_choice[query_pos, rank] = candidates[candidate_pos]
+            top_score[query_pos, rank] = score
+
+    if unblocked:
+        unblocked_choice, unblocked_score = score_fuzzy_top_k([queries[q] for q in unblocked], choices, k, fuzzy_threshold, workers=workers)
+        top_choice[unblocked] = unblocked_choice
+        top_score[unblocked] = unblocked_score
+        comparisons += len(unblocked) * len(choices)
+
+    if blocking_report is not None:
+        blocking_report.add(len(queries) * len(choices), comparisons)
+    return top_choice, top_score
+
+def build_match_series(df, match_columns):
+    """
+    Builds the cleaned match string for every row of df from 1 or 2 columns.
+    Two columns are joined with a single space.
+    """
+    # Normalized columns are memoized per DataFrame, so reruns on unchanged data skip the cleaning
+    if len(match_columns) == 1:
+        return normalized_column(df, match_columns[0])
+    # len == 2
+    col1_cleaned = normalized_column(df, match_columns[0])
+    col2_cleaned = normalized_column(df, match_columns[1])
+    return col1_cleaned + " " + col2_cleaned
+
+class MatchPlan:
+    """
+    How the selected columns are matched, compiled once per run from their standardized names.
+    identifier_columns are positions in the selection whose values are joined exactly (normalized
+    with identifier_profiles); fuzzy_columns are the positions combined into the fuzzy key.
+    """
+    def __init__(self, std_selected_cols, match_plan="combined"):
+        if match_plan not in MATCH_PLANS:
+            raise ValueError(f"Unknown match plan '{match_plan}'. Expected one of: {', '.join(MATCH_PLANS)}")
+        self.name = match_plan
+        self.identifier_columns = [pos for pos, std_col in enumerate(std_selected_cols)
+                                   if match_plan == "fields" and std_col in IDENTIFIER_FIELD_PROFILES]
+        self.identifier_profiles = [IDENTIFIER_FIELD_PROFILES[std_selected_cols[pos]] for pos in self.identifier_columns]
+        self.fuzzy_columns = [pos for pos in range(len(std_selected_cols)) if pos not in self.identifier_columns]
+
+    def fuzzy_keys(self, df, match_columns):
+        """
+        The cleaned fuzzy key of every row of df (None for all rows when every column is an identifier).
+        """
+        if not self.fuzzy_columns:
+            return [None] * len(df)
+        return build_match_series(df, [match_columns[pos] for pos in self.fuzzy_columns]).tolist()
+
+    def identifier_keys(self, df, match_columns):
+        """
+        The normalized identifier of every row of df as an object array, None where a value is
+        missing (two identifier columns are joined with "|"), or None if the plan has no identifiers.
+        """
+        if not self.identifier_columns:
+            return None
+        parts = [normalized_column(df, match_columns[pos], profile).to_numpy(dtype=object)
+                 for pos, profile in zip(self.identifier_columns, self.identifier_profiles)]
+        missing = np.logical_or.reduce([pd.isna(part) for part in parts])
+        keys = parts[0] if len(parts) == 1 else np.array(["|".join(map(str, values)) for values in zip(*parts)], dtype=object)
+        return np.where(missing, None, keys)
+
+def resolve_db_match_columns(db_df, std_selected_client_cols, selected_db_columns_original, mapping_rules=DEFAULT_MAPPING_RULES):
+    """
+    Identifies the columns of db_df that correspond to the selected client columns.
+    Standardized names are tried first; the user's explicit DB column selection is the fallback.
+    """
+    actual_db_match_cols = []
+
+    # Try to map using standardized names first; each DB column is standardized once
+    std_db_cols = get_column_mapper(mapping_rules).standardize_columns(db_df.columns)
+    for std_client_col_target in std_selected_client_cols:
+        for db_col_original, std_db_col in std_db_cols.items():
+            if std_db_col == std_client_col_target:
+                actual_db_match_cols.append(db_col_original)
+                break
+
+    # If the number of found standardized columns doesn't match, try using selected_db_columns_original
+    # This logic prioritizes standardized mapping but falls back to direct user selection for DB columns.
+    if len(actual_db_match_cols) != len(std_selected_client_cols):
+        actual_db_match_cols = [s_db_col for s_db_col in selected_db_columns_original if s_db_col in db_df.columns]
+
+    return actual_db_match_cols
+
+def db_columns_to_load(db_headers, selected_client_columns_original, selected_db_columns_original, extra_columns=(),
+                       mapping_rules=DEFAULT_MAPPING_RULES):
+    """
+    Returns the DB columns a column-projected load needs, given only the sheet headers
+    ({file_name: {sheet_name: DataFrame}}, e.g. from parsers.parse_excel_headers): the match
+    columns every sheet resolves to, then extra_columns, without duplicates.
+    """
+    column_mapper = get_column_mapper(mapping_rules)
+    std_selected_client_cols = [column_mapper.standardize(col) for col in selected_client_columns_original]
+    columns = []
+    for sheets_dict in db_headers.values():
+        for header_df in sheets_dict.values():
+            columns.extend(resolve_db_match_columns(header_df, std_selected_client_cols, selected_db_columns_original, mapping_rules))
+    columns.extend(extra_columns)
+    return list(dict.fromkeys(columns))
+
+class DbMatchIndex:
+    """
+    Cleaned match keys of a single DB sheet for a given column selection.
+    Built once per matching run and shared by every client row and client DataFrame.
+    """
+    def __init__(self, file_name, sheet_name, match_columns, keys, identifier_keys=None):
+        self.file_name = file_name
+        self.sheet_name = sheet_name
+        self.match_columns = match_columns
+        self.keys = keys
+
+        # Identifier join ("fields" plan): each distinct identifier and the first row holding it
+        self.identifier_index = None
+        if identifier_keys is not None:
+            identifiers = pd.Series(identifier_keys, dtype=object)
+            first = (identifiers.notna() & ~identifiers.duplicated()).to_numpy()
+            self.identifier_index = pd.Index(identifiers[first].to_numpy(), dtype=object)
+            self.identifier_positions = np.flatnonzero(first)
+
+        # Hash index from cleaned key to every row position holding it, in row order
+        self.key_positions = {}
+        for position, key in enumerate(keys):
+            self.key_positions.setdefault(key, []).append(position)
+
+        # Fuzzy choices skip missing keys, as extractOne does; fuzzy_positions maps them back to rows
+        self.fuzzy_positions = np.array([position for position, key in enumerate(keys) if isinstance(key, str)], dtype=np.int64)
+        self.fuzzy_choices = [keys[position] for position in self.fuzzy_positions]
+        self._blockers = {} # BlockingConfig -> CandidateBlocker, built on first use
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup_exact(self, key):
+        """
+        Returns the positions of all DB rows whose key equals key (empty list if none).
+        """
+        return self.key_positions.get(key, [])
+
+    def first_exact(self, key):
+        """
+        Returns the position of the first DB row whose key equals key, or None.
+        """
+        positions = self.key_positions.get(key)
+        return positions[0] if positions else None
+
+    def first_identifiers(self, identifiers):
+        """
+        Vectorized identifier join: the position of the first DB row holding each identifier
+        (an array of normalized identifiers), -1 where none does or the sheet has no identifiers.
+        """
+        if self.identifier_index is None or not len(identifiers):
+            return np.full(len(identifiers), -1, dtype=np.int64)
+        found = self.identifier_index.get_indexer(identifiers)
+        return np.where(found >= 0, self.identifier_positions[found], -1)
+
+    def blocker(self, blocking):
+        """
+        Returns the CandidateBlocker for the given BlockingConfig, building it once.
+        """
+        if blocking not in self._blockers:
+            self._blockers[blocking] = CandidateBlocker(self.fuzzy_choices, blocking)
+        return self._blockers[blocking]
+
+    def best_fuzzy(self, queries, fuzzy_threshold, workers=-1, blocking=None, blocking_report=None):
+        """
+        Batch fuzzy lookup for a list of client keys.
+        Returns (positions, scores) arrays; positions is -1 where nothing reaches the threshold.
+        With a BlockingConfig, only blocked candidates are scored and blocking_report is updated.
+        """
+        if blocking is None:
+            best_choice, best_score = score_fuzzy_batch(queries, self.fuzzy_choices, fuzzy_threshold, workers=workers)
+            if blocking_report is not None:
+                all_pairs = len(queries) * len(self.fuzzy_choices)
+                blocking_report.add(all_pairs, all_pairs)
+        else:
+            best_choice, best_score = score_fuzzy_blocked(queries, self.fuzzy_choices, self.blocker(blocking), fuzzy_threshold,
+                                                          workers=workers, blocking_report=blocking_report)
+        positions = np.full(len(best_choice), -1, dtype=np.int64)
+        hit = best_choice >= 0
+        positions[hit] = self.fuzzy_positions[best_choice[hit]]
+        return positions, best_score
+
+    def top_fuzzy(self, queries, k, fuzzy_threshold, workers=-1, blocking=None, blocking_report=None):
+        """
+        Top-k version of best_fuzzy: (positions, scores) arrays of shape (len(queries), k),
+        best first, with -1 positions where fewer than k rows reach the threshold.
+        """
+        if blocking is None:
+            top_choice, top_score = score_fuzzy_top_k(queries, self.fuzzy_choices, k, fuzzy_threshold, workers=workers)
+            if blocking_report is not None:
+                all_pairs = len(queries) * len(self.fuzzy_choices)
+                blocking_report.add(all_pairs, all_pairs)
+        else:
+            top_choice, top_score = score_fuzzy_blocked_top_k(queries, self.fuzzy_choices, self.blocker(blocking), k, fuzzy_threshold,
+                                                              workers=workers, blocking_report=blocking_report)
+        positions = np.full(top_choice.shape, -1, dtype=np.int64)
+        hit = top_choice >= 0
+        positions[hit] = self.fuzzy_positions[top_choice[hit]]
+        return positions, top_score
+
+    @classmethod
+    def build(cls, file_name, sheet_name, db_df, std_selected_client_cols, selected_db_columns_original, mapping_rules=DEFAULT_MAPPING_RULES,
+              stats=None, plan=None):
+        """
+        Resolves the match columns of db_df and cleans them into a key list (and, for a
+        "fields" MatchPlan, an identifier array). Returns None if the sheet has no suitable
+        columns for the selection.
+        """
+        if stats is None:
+            stats = MatchStats()
+        if plan is None:
+            plan = MatchPlan(std_selected_client_cols)
+        with stats.timer("column_resolution"):
+            actual_db_match_cols = resolve_db_match_columns(db_df, std_selected_client_cols, selected_db_columns_original, mapping_rules)
+
+        # Ensure we have the same number of columns for matching as selected for the client
+        if len(actual_db_match_cols) != len(std_selected_client_cols):
+            logging.debug(f"Could not find suitable matching columns in DB sheet: {file_name} -> {sheet_name} based on client's {len(std_selected_client_cols)} selected columns. Found: {actual_db_match_cols}")
+            return None
+
+        logging.debug(f"Using DB columns {actual_db_match_cols} for matching in sheet {file_name} -> {sheet_name}")
+
+        # Create combined DB match series
+        try:
+            with stats.timer("normalization"):
+                db_keys = plan.fuzzy_keys(db_df, actual_db_match_cols)
+                db_identifiers = plan.identifier_keys(db_df, actual_db_match_cols)
+        except KeyError as e:
+            logging.error(f"KeyError creating db_match_series for {file_name}/{sheet_name}: {e}. Skipping this sheet.")
+            return None
+
+        with stats.timer("index_build"):
+            return cls(file_name, sheet_name, actual_db_match_cols, db_keys, identifier_keys=db_identifiers)
+
+def build_db_match_indexes(db_data_parsed, selected_client_columns_original, selected_db_columns_original, mapping_rules=DEFAULT_MAPPING_RULES,
+                           stats=None, match_plan="combined"):
+    """
+    Builds a DbMatchIndex for every usable DB sheet, in file/sheet order.
+    The returned list can be passed to find_duplicates (with the same match_plan) to reuse it across calls.
+    """
+    if stats is None:
+        stats = MatchStats()
+    column_mapper = get_column_mapper(mapping_rules)
+    std_selected_client_cols = [column_mapper.standardize(col) for col in selected_client_columns_original]
+    plan = MatchPlan(std_selected_client_cols, match_plan)
+
+    db_match_indexes = []
+    for db_file_name, sheets_dict in db_data_parsed.items():
+        for db_sheet_name, db_df in sheets_dict.items():
+            db_index = DbMatchIndex.build(db_file_name, db_sheet_name, db_df, std_selected_client_cols, selected_db_columns_original, mapping_rules,
+                                          stats=stats, plan=plan)
+            if db_index is not None:
+                db_match_indexes.append(db_index)
+                stats.count("db_sheets_indexed")
+                stats.count("db_rows_indexed", len(db_index))
+    return db_match_indexes
+
+def match_keys_against_index(db_index, keys, fuzzy_threshold, fuzzy_workers=-1, blocking=None, blocking_report=None, stats=None):
+    """
+    Looks up client keys in one DB sheet: exact hash lookup first, then one fuzzy batch
+    for the keys without an exact match.
+    Returns an array with the matched DB row position per key (-1 where not matched).
+    """
+    if stats is None:
+        stats = MatchStats()
+    positions = np.full(len(keys), -1, dtype=np.int64)
 
+    # Exact Match (hash lookup)
+    fuzzy_candidates = []
+    with stats.timer("exact_lookup"):
+        for key_pos, key in enumerate(keys):
+            match_index = db_index.first_exact(key)
+            if match_index is None:
+                fuzzy_candidates.append(key_pos)
+            else:
+                positions[key_pos] = match_index
+    stats.count("exact_lookups", len(keys))
+    stats.count("exact_hits", len(keys) - len(fuzzy_candidates))
+
+    # Fuzzy Match (if no exact match), all remaining keys in one batch
+    if fuzzy_candidates:
+        with stats.timer("fuzzy_scoring"):
+            fuzzy_positions, _ = db_index.best_fuzzy([keys[key_pos] for key_pos in fuzzy_candidates], fuzzy_threshold, workers=fuzzy_workers,
+                                                     blocking=blocking, blocking_report=blocking_report)
+        positions[fuzzy_candidates] = fuzzy_positions
+        stats.count("fuzzy_queries", len(fuzzy_candidates))
+        stats.count("fuzzy_hits", int((fuzzy_positions >= 0).sum()))
+    return positions
+
+def _resolve_sequential(client_keys, unresolved, db_match_indexes, fuzzy_threshold, fuzzy_workers, blocking, blocking_report, stats):
+    """
+    Returns, per client row, the position in db_match_indexes of the first sheet that matches it (-1 if none).
+    """
+    matched_index = np.full(len(client_keys), -1, dtype=np.int64)
+
+    # Indexes are in file/sheet order, so resolving rows sheet by sheet keeps the earliest file and sheet
+    for index_pos, db_index in enumerate(db_match_indexes):
+        if not unresolved:
+            break
+        positions = match_keys_against_index(db_index, [client_keys[pos] for pos in unresolved], fuzzy_threshold,
+                                             fuzzy_workers=fuzzy_workers, blocking=blocking, blocking_report=blocking_report, stats=stats)
+        still_unresolved = []
+        for pos, match_index in zip(unresolved, positions):
+            if match_index < 0:
+                still_unresolved.append(pos)
+            else:
+                matched_index[pos] = index_pos
+        logging.info(f"{len(unresolved) - len(still_unresolved)} client row(s) matched in {db_index.file_name}/{db_index.sheet_name}.")
+        unresolved = still_unresolved
+    return matched_index
+
+def _resolve_identifiers(client_identifiers, unresolved, db_match_indexes, stats):
+    """
+    Hash-joins the client identifiers against every DB sheet in file/sheet order. Returns the
+    position in db_match_indexes of the first sheet holding each row's identifier (-1 if none).
+    """
+    matched_index = np.full(len(client_identifiers), -1, dtype=np.int64)
+    rows = np.asarray([pos for pos in unresolved if client_identifiers[pos] is not None], dtype=np.int64)
+    stats.count("identifier_lookups", len(rows))
+    for index_pos, db_index in enumerate(db_match_indexes):
+        if not len(rows):
+            break
+        hit = db_index.first_identifiers(client_identifiers[rows]) >= 0
+        matched_index[rows[hit]] = index_pos
+        rows = rows[~hit]
+    stats.count("identifier_hits", int((matched_index >= 0).sum()))
+    return matched_index
+
+def _resolve_best(client_keys, unresolved, db_match_indexes, fuzzy_threshold, top_k, fuzzy_workers, blocking, blocking_report, stats):
+    """
+    Scores the client rows against every DB sheet once and keeps the top_k candidates over
+    all sheets. Returns (top_index, top_row, top_score) arrays of shape (len(client_keys), top_k):
+    position in db_match_indexes, row position in that sheet and score, best first
+    (-1 index and row where there is no candidate). Equal scores keep the earlier file/sheet/row.
+    """
+    top_index = np.full((len(client_keys), top_k), -1, dtype=np.int64)
+    top_row = np.full((len(client_keys), top_k), -1, dtype=np.int64)
+    top_score = np.full((len(client_keys), top_k), -1, dtype=np.float32)
+    if not unresolved:
+        return top_index, top_row, top_score
+
+    rows = np.asarray(unresolved, dtype=np.int64)
+    queries = [client_keys[pos] for pos in unresolved]
+    for index_pos, db_index in enumerate(db_match_indexes):
+        # Every key is fuzzy scored: an identical key scores 100, so exact hits need no separate lookup
+        with stats.timer("fuzzy_scoring"):
+            positions, scores = db_index.top_fuzzy(queries, top_k, fuzzy_threshold, workers=fuzzy_workers,
+                                                   blocking=blocking, blocking_report=blocking_report)
+        stats.count("fuzzy_queries", len(queries))
+
+        # Merge with the candidates of earlier sheets; the stable sort keeps earlier sheets first on ties
+        merged_score = np.concatenate([top_score[rows], np.where(positions >= 0, scores, -1)], axis=1)
+        merged_index = np.concatenate([top_index[rows], np.where(positions >= 0, index_pos, -1)], axis=1)
+        merged_row = np.concatenate([top_row[rows], positions], axis=1)
+        order = np.argsort(-merged_score, axis=1, kind="stable")[:, :top_k]
+        top_score[rows] = np.take_along_axis(merged_score, order, axis=1)
+        top_index[rows] = np.take_along_axis(merged_index, order, axis=1)
+        top_row[rows] = np.take_along_axis(merged_row, order, axis=1)
+    return top_index, top_row, top_score
+
+# Set in each worker process by the pool initializer, so the indexes are shipped once per worker
+_worker_db_match_indexes = None
+
+def _init_match_worker(db_match_indexes):
+    global _worker_db_match_indexes
+    _worker_db_match_indexes = db_match_indexes
+
+def match_worker_pool(db_match_indexes, workers):
+    """
+    A process pool whose workers hold db_match_indexes, for passing to find_duplicates(pool=...)
+    when the same indexes are matched against many client chunks. The caller shuts it down.
+    Workers are spawned, as in src.parsers, since the pool is also started from the Streamlit server.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_match_worker,
+                               initargs=(db_match_indexes,))
+
+def _match_work_unit(keys, fuzzy_threshold, blocking):
+    """
+    One client chunk against every DB sheet in file/sheet order, run in a worker process.
+    """
+    blocking_report = BlockingReport()
+    stats = MatchStats()
+    # One rapidfuzz thread per process; the pool already occupies the cores
+    matched_index = _resolve_sequential(keys, list(range(len(keys))), _worker_db_match_indexes, fuzzy_threshold, 1, blocking,
+                                        blocking_report, stats)
+    return matched_index, blocking_report.comparisons_total, blocking_report.comparisons_performed, stats.as_dict()
+
+def _resolve_parallel(prepared_clients, db_match_indexes, fuzzy_threshold, blocking, blocking_report, workers, stats, pool=None):
+    """
+    Parallel version of _resolve_sequential for all client DataFrames at once.
+    The client rows are split into chunks and each chunk is resolved sheet by sheet in a
+    process pool, so rows matched in an earlier sheet are not scored against later ones and
+    the first file/sheet still wins. Worker timings and counters are summed into stats.
+    pool, from match_worker_pool for db_match_indexes, is used instead of a new pool.
+    """
+    matched_indexes = [np.full(len(client_keys), -1, dtype=np.int64) for client_keys, _ in prepared_clients]
+
+    with contextlib.nullcontext(pool) if pool is not None else match_worker_pool(db_match_indexes, workers) as pool:
+        futures = {}
+        for client_pos, (client_keys, unresolved) in enumerate(prepared_clients):
+            for chunk_start in range(0, len(unresolved), PARALLEL_CHUNK_ROWS):
+                chunk_keys = [client_keys[pos] for pos in unresolved[chunk_start:chunk_start + PARALLEL_CHUNK_ROWS]]
+                futures[(client_pos, chunk_start)] = pool.submit(_match_work_unit, chunk_keys, fuzzy_threshold, blocking)
+
+        for (client_pos, chunk_start), future in futures.items():
+            chunk_matched_index, comparisons_total, comparisons_performed, unit_stats = future.result()
+            blocking_report.add(comparisons_total, comparisons_performed)
+            stats.merge(unit_stats)
+            chunk_rows = np.asarray(prepared_clients[client_pos][1][chunk_start:chunk_start + PARALLEL_CHUNK_ROWS], dtype=np.int64)
+            matched_indexes[client_pos][chunk_rows] = chunk_matched_index
+
+    return matched_indexes
+
+def prepare_client_frames(client_data_parsed, selected_client_columns_original, stats=None, plan=None):
+    """
+    Returns (client_df, client_keys, skipped, unresolved) for every non-empty client
+    DataFrame that has the selected columns: the cleaned match keys, a per-row flag for
+    empty keys and the positions of the rows that still need matching. With a "fields"
+    MatchPlan the keys cover the fuzzy columns only, and a row is skipped when both its
+    key and its identifier are empty.
+    """
+    if stats is None:
+        stats = MatchStats()
     client_dfs_to_process = []
     if isinstance(client_data_parsed, list): # PDF/Word
         client_dfs_to_process = [df for df in client_data_parsed if isinstance(df, pd.DataFrame) and not df.empty]
     elif isinstance(client_data_parsed, dict): # Excel
         client_dfs_to_process = [df for df in client_data_parsed.values() if isinstance(df, pd.DataFrame) and not df.empty]
 
+    prepared_clients = []
     for client_df_idx, client_df in enumerate(client_dfs_to_process):
         # Ensure selected client columns exist in the current client_df
         missing_client_cols = [col for col in selected_client_columns_original if col not in client_df.columns]
@@ -35,125 +564,230 @@ def find_duplicates(client_data_parsed, selected_client_columns_original,
 
         # Create combined client match series
         try:
-            if len(selected_client_columns_original) == 1:
-                client_match_series = clean_column_values(client_df[selected_client_columns_original[0]].astype(str))
-            else: # len == 2
-                col1_cleaned = clean_column_values(client_df[selected_client_columns_original[0]].astype(str))
-                col2_cleaned = clean_column_values(client_df[selected_client_columns_original[1]].astype(str))
-                client_match_series = col1_cleaned + " " + col2_cleaned
+            with stats.timer("normalization"):
+                if plan is None:
+                    client_keys = build_match_series(client_df, selected_client_columns_original).tolist()
+                    client_identifiers = None
+                else:
+                    client_keys = plan.fuzzy_keys(client_df, selected_client_columns_original)
+                    client_identifiers = plan.identifier_keys(client_df, selected_client_columns_original)
         except KeyError as e:
             logging.error(f"KeyError while creating client_match_series for client_df {client_df_idx}: {e}. Skipping this DataFrame.")
             continue
-            
+
         logging.info(f"Processing Client DataFrame #{client_df_idx+1} with {len(client_df)} rows.")
 
-        for client_row_index, client_row_data in client_df.iterrows():
-            client_match_string = client_match_series.loc[client_row_index]
-            if pd.isna(client_match_string) or not client_match_string.strip():
-                logging.debug(f"Skipping client row {client_row_index} due to empty match string.")
-                # Append a result indicating skipped or not processed, or just skip
-                result_entry = client_row_data.to_dict()
-                result_entry['status'] = "Skipped (Empty Client Data)"
-                result_entry['matched_file'] = None
-                result_entry['matched_sheet'] = None
-                results_list.append(result_entry)
-                continue
-
-            found_flag = False
-            matched_file = None
-            matched_sheet = None
-            # matched_db_row_details = None # Optional
-
-            for db_file_name, sheets_dict in db_data_parsed.items():
-                if found_flag: break # Already found for this client row in a previous DB file
-                for db_sheet_name, db_df in sheets_dict.items():
-                    if found_flag: break # Already found for this client row in a previous sheet
-
-                    # Identify corresponding columns in db_df
-                    actual_db_match_cols = []
-                    temp_std_db_cols_found = [] # Store standardized names of db columns found
-
-                    # Try to map using standardized names first
-                    for std_client_col_target in std_selected_client_cols:
-                        found_std_match_for_client_col = False
-                        for db_col_original in db_df.columns:
-                            std_db_col = get_standardized_column_name(db_col_original, DEFAULT_MAPPING_RULES)
-                            if std_db_col == std_client_col_target:
-                                actual_db_match_cols.append(db_col_original)
-                                temp_std_db_cols_found.append(std_db_col)
-                                found_std_match_for_client_col = True
-                                break 
-                        if not found_std_match_for_client_col:
-                            # If a standardized match wasn't found for this specific std_client_col_target,
-                            # this db_df might not be suitable based on standardized mapping.
-                            # However, we also need to consider the user's explicit DB column selections.
-                            pass
-                    
-                    # If the number of found standardized columns doesn't match, try using selected_db_columns_original
-                    # This logic prioritizes standardized mapping but falls back to direct user selection for DB columns.
-                    if len(actual_db_match_cols) != len(std_selected_client_cols):
-                        actual_db_match_cols = [] # Reset
-                        temp_std_db_cols_found = []
-                        for s_db_col in selected_db_columns_original:
-                            if s_db_col in db_df.columns:
-                                actual_db_match_cols.append(s_db_col)
-                                temp_std_db_cols_found.append(get_standardized_column_name(s_db_col, DEFAULT_MAPPING_RULES))
-                    
-                    # Ensure we have the same number of columns for matching as selected for the client
-                    if len(actual_db_match_cols) != len(selected_client_columns_original):
-                        logging.debug(f"Could not find suitable matching columns in DB sheet: {db_file_name} -> {db_sheet_name} based on client's {len(selected_client_columns_original)} selected columns. Found: {actual_db_match_cols}")
-                        continue # Move to the next DB sheet or file
-                    
-                    logging.debug(f"Using DB columns {actual_db_match_cols} for matching in sheet {db_file_name} -> {db_sheet_name}")
-
-                    # Create combined DB match series
-                    try:
-                        if len(actual_db_match_cols) == 1:
-                            db_match_series = clean_column_values(db_df[actual_db_match_cols[0]].astype(str))
-                        else: # len == 2
-                            db_col1_cleaned = clean_column_values(db_df[actual_db_match_cols[0]].astype(str))
-                            db_col2_cleaned = clean_column_values(db_df[actual_db_match_cols[1]].astype(str))
-                            db_match_series = db_col1_cleaned + " " + db_col2_cleaned
-                    except KeyError as e:
-                        logging.error(f"KeyError creating db_match_series for {db_file_name}/{db_sheet_name}: {e}. Skipping this sheet.")
-                        continue
-                    
-                    # Perform matching
-                    db_match_list = db_match_series.tolist()
-                    
-                    # Exact Match
-                    if client_match_string in db_match_list:
-                        match_index = db_match_list.index(client_match_string)
-                        # matched_db_row_details = db_df.iloc[match_index].to_dict() # Optional
-                        found_flag = True
-                    
-                    # Fuzzy Match (if no exact match)
-                    if not found_flag:
-                        fuzzy_match_result = process.extractOne(client_match_string, db_match_list, 
-                                                                scorer=fuzz.WRatio, score_cutoff=fuzzy_threshold)
-                        if fuzzy_match_result:
-                            # matched_db_row_details = db_df.iloc[fuzzy_match_result[2]].to_dict() # Optional (fuzzy_match_result[2] is the index)
-                            found_flag = True
-                    
-                    if found_flag:
-                        matched_file = db_file_name
-                        matched_sheet = db_sheet_name
-                        logging.info(f"Match found for client row {client_row_index} in {db_file_name}/{db_sheet_name}.")
-                        break # Break from sheets loop
-
-                if found_flag:
-                    break # Break from files loop
-
-            result_entry = client_row_data.to_dict()
-            result_entry['status'] = "Duplicate Found" if found_flag else "Not Found"
-            result_entry['matched_file'] = matched_file
-            result_entry['matched_sheet'] = matched_sheet
-            # result_entry['matched_db_row'] = matched_db_row_details # Optional
-            results_list.append(result_entry)
-
-    if not results_list:
+        skipped = [pd.isna(key) or not key.strip() for key in client_keys]
+        if client_identifiers is not None:
+            skipped = [row_skipped and identifier is None for row_skipped, identifier in zip(skipped, client_identifiers)]
+        unresolved = [pos for pos in range(len(client_keys)) if not skipped[pos]]
+        prepared_clients.append((client_df, client_keys, skipped, unresolved))
+        stats.count("client_frames")
+        stats.count("client_rows", len(client_keys))
+    return prepared_clients
+
+def assemble_results(prepared_clients, matched_indexes, db_match_indexes):
+    """
+    Builds the results DataFrame: every client row with status, matched_file and
+    matched_sheet, where matched_indexes holds one array per client frame of positions
+    in db_match_indexes (-1 for no match).
+    """
+    # Lookup arrays for matched_index -> file/sheet; the trailing None serves unmatched rows (-1)
+    index_file_names = np.array([db_index.file_name for db_index in db_match_indexes] + [None], dtype=object)
+    index_sheet_names = np.array([db_index.sheet_name for db_index in db_match_indexes] + [None], dtype=object)
+
+    result_frames = []
+    for (client_df, _, skipped, _), matched_index in zip(prepared_clients, matched_indexes):
+        skipped = np.asarray(skipped, dtype=bool)
+        if skipped.any():
+            logging.debug(f"Skipping {skipped.sum()} client row(s) due to empty match strings.")
+        status = np.where(skipped, "Skipped (Empty Client Data)",
+                          np.where(matched_index >= 0, "Duplicate Found", "Not Found")).astype(object)
+
+        # Shallow copy: the client columns are shared with client_df, only the result columns are new
+        result_df = client_df.copy(deep=False)
+        result_df.index = pd.RangeIndex(len(result_df))
+        result_df.attrs = {}
+        result_df['status'] = status
+        result_df['matched_file'] = index_file_names[matched_index]
+        result_df['matched_sheet'] = index_sheet_names[matched_index]
+        result_frames.append(result_df)
+
+    if not result_frames:
         logging.warning("No results generated. This might be due to no client data or other issues.")
         return pd.DataFrame() # Return empty DataFrame if nothing was processed
 
-    results_df = pd.DataFrame(results_list)
+    return result_frames[0] if len(result_frames) == 1 else pd.concat(result_frames, ignore_index=True)
+
+def assemble_best_results(prepared_clients, best_matches, db_match_indexes):
+    """
+    assemble_results for best-match mode, where best_matches holds one (top_index, top_row,
+    top_score) tuple per client frame from _resolve_best. matched_file and matched_sheet give
+    the best candidate, with its row position in the sheet (matched_row) and score (match_score);
+    candidate r >= 2 is in match_<r>_file, match_<r>_sheet, match_<r>_row and match_<r>_score.
+    """
+    results_df = assemble_results(prepared_clients, [top_index[:, 0] for top_index, _, _ in best_matches], db_match_indexes)
+    if results_df.empty:
+        return results_df
+
+    top_index = np.concatenate([top_index for top_index, _, _ in best_matches])
+    top_row = np.concatenate([top_row for _, top_row, _ in best_matches])
+    top_score = np.concatenate([top_score for _, _, top_score in best_matches])
+    index_file_names = np.array([db_index.file_name for db_index in db_match_indexes] + [None], dtype=object)
+    index_sheet_names = np.array([db_index.sheet_name for db_index in db_match_indexes] + [None], dtype=object)
+    for rank in range(top_index.shape[1]):
+        found = top_index[:, rank] >= 0
+        if rank == 0:
+            row_column, score_column = 'matched_row', 'match_score'
+        else:
+            results_df[f'match_{rank + 1}_file'] = index_file_names[top_index[:, rank]]
+            results_df[f'match_{rank + 1}_sheet'] = index_sheet_names[top_index[:, rank]]
+            row_column, score_column = f'match_{rank + 1}_row', f'match_{rank + 1}_score'
+        results_df[row_column] = pd.arrays.IntegerArray(np.where(found, top_row[:, rank], 0), ~found)
+        results_df[score_column] = np.where(found, np.round(top_score[:, rank].astype(np.float64), 2), np.nan)
+    return results_df
+
+def join_db_fields(results_df, db_data_parsed, columns, prefix="db_"):
+    """
+    Adds a prefix + column result column for each DB column in columns, holding that field
+    of the best-matched DB row (matched_file, matched_sheet, matched_row). Only the matched
+    rows are taken from each DB sheet; unmatched rows and sheets without the column are left missing.
+    """
+    joined = {column: np.full(len(results_df), None, dtype=object) for column in columns}
+    matched = results_df[results_df['matched_row'].notna()]
+    for (file_name, sheet_name), group in matched.groupby(['matched_file', 'matched_sheet'], sort=False):
+        db_df = db_data_parsed.get(file_name, {}).get(sheet_name)
+        if db_df is None:
+            continue
+        result_positions = results_df.index.get_indexer(group.index)
+        db_rows = group['matched_row'].to_numpy(dtype=np.int64)
+        for column in columns:
+            if column in db_df.columns:
+                joined[column][result_positions] = db_df[column].take(db_rows).to_numpy(dtype=object)
+    for column in columns:
+        results_df[f"{prefix}{column}"] = joined[column]
     return results_df
+
+def find_duplicates(client_data_parsed, selected_client_columns_original,
+                    db_data_parsed, selected_db_columns_original,
+                    fuzzy_threshold=85, db_match_indexes=None, fuzzy_workers=-1, blocking=None, workers=None,
+                    mapping_rules=DEFAULT_MAPPING_RULES, stats=None, log_row_matches=False,
+                    match_mode="first", top_k=1, db_detail_columns=(), match_plan="combined", pool=None):
+    """
+    Finds duplicates between client data and database data using selected columns.
+    db_match_indexes, if given, is a prebuilt list from build_db_match_indexes and is used
+    instead of rebuilding the indexes from db_data_parsed.
+    fuzzy_workers is the number of threads rapidfuzz uses for fuzzy scoring (-1 = all cores).
+    blocking, an optional src.blocking.BlockingConfig, restricts fuzzy scoring to likely
+    candidates; the comparison counts are stored in results_df.attrs['blocking_report'].
+    workers > 1 spreads client chunks over that many processes, each resolved sheet by sheet;
+    results and counters are identical to the sequential run. pool, from match_worker_pool for
+    db_match_indexes, runs that work instead of a pool started (and stopped) by this call, so
+    callers matching many client chunks against the same indexes start the pool once.
+    mapping_rules are the column-name rules used to pair client and DB columns.
+    Stage timings and counters are collected into stats (a new src.instrumentation.MatchStats
+    unless one is passed in to accumulate over several calls) and stored as a dict in
+    results_df.attrs['match_stats']. log_row_matches logs every matched client row; it is
+    off by default because it is costly on large files.
+    match_mode "first" (the fast path) reports the first file/sheet with a hit. "best" scores
+    every DB sheet once and reports the top_k candidates with score and DB row (see
+    assemble_best_results); it always runs in this process. In best mode, db_detail_columns
+    are DB columns whose values from the best-matched row are joined in as db_<column>
+    (taken from db_data_parsed).
+    match_plan "combined" matches the selected columns as one key. "fields" first hash-joins
+    the identifier columns (roll/mobile numbers, emails; see IDENTIFIER_FIELD_PROFILES) over all
+    DB sheets, so a row whose identifier is found is reported for that sheet, and then fuzzy
+    scores only the other columns for the rows still unresolved. It supports match_mode "first";
+    prebuilt db_match_indexes must have been built with the same plan.
+    """
+    if match_mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode '{match_mode}'. Expected one of: {', '.join(MATCH_MODES)}")
+    if top_k < 1:
+        raise ValueError("top_k must be at least 1.")
+    if match_plan == "fields" and match_mode != "first":
+        raise ValueError("The 'fields' match plan supports match mode 'first' only.")
+    blocking_report = BlockingReport()
+    if stats is None:
+        stats = MatchStats()
+
+    if not selected_client_columns_original or not selected_db_columns_original:
+        logging.warning("Client or DB columns not selected. Aborting matching.")
+        return pd.DataFrame()
+
+    with stats.timer("column_resolution"):
+        column_mapper = get_column_mapper(mapping_rules)
+        std_selected_client_cols = [column_mapper.standardize(col) for col in selected_client_columns_original]
+        plan = MatchPlan(std_selected_client_cols, match_plan)
+    logging.info(f"Standardized selected client columns: {std_selected_client_cols}")
+
+    # DB sheets are resolved and cleaned once here rather than once per client row
+    if db_match_indexes is None:
+        db_match_indexes = build_db_match_indexes(db_data_parsed, selected_client_columns_original, selected_db_columns_original, mapping_rules,
+                                                  stats=stats, match_plan=match_plan)
+    logging.info(f"Prepared match indexes for {len(db_match_indexes)} DB sheet(s).")
+
+    prepared_clients = prepare_client_frames(client_data_parsed, selected_client_columns_original, stats=stats, plan=plan)
+
+    identifier_matches = None
+    if plan.identifier_columns:
+        # Identifiers are joined exactly over all sheets first; only the rows left over are fuzzy scored, on the other columns
+        with stats.timer("identifier_join"):
+            identifier_matches = [_resolve_identifiers(plan.identifier_keys(client_df, selected_client_columns_original), unresolved,
+                                                       db_match_indexes, stats)
+                                  for client_df, _, _, unresolved in prepared_clients]
+        prepared_clients = [(client_df, client_keys, skipped, [pos for pos in unresolved
+                                                               if identifier_match[pos] < 0 and isinstance(client_keys[pos], str) and client_keys[pos].strip()])
+                            for (client_df, client_keys, skipped, unresolved), identifier_match in zip(prepared_clients, identifier_matches)]
+
+    if match_mode == "best":
+        best_matches = [_resolve_best(client_keys, unresolved, db_match_indexes, fuzzy_threshold, top_k, fuzzy_workers, blocking, blocking_report,
+                                      stats)
+                        for _, client_keys, _, unresolved in prepared_clients]
+    elif (pool is not None or (workers is not None and workers > 1)) and db_match_indexes and prepared_clients:
+        logging.info(f"Matching in parallel with {workers} worker processes.")
+        matched_indexes = _resolve_parallel([(client_keys, unresolved) for _, client_keys, _, unresolved in prepared_clients],
+                                            db_match_indexes, fuzzy_threshold, blocking, blocking_report, workers, stats, pool=pool)
+    else:
+        matched_indexes = [_resolve_sequential(client_keys, unresolved, db_match_indexes, fuzzy_threshold, fuzzy_workers, blocking, blocking_report,
+                                               stats)
+                           for _, client_keys, _, unresolved in prepared_clients]
+
+    if identifier_matches is not None:
+        matched_indexes = [np.where(identifier_match >= 0, identifier_match, matched_index)
+                           for identifier_match, matched_index in zip(identifier_matches, matched_indexes)]
+
+    with stats.timer("result_assembly"):
+        if match_mode == "best":
+            results_df = assemble_best_results(prepared_clients, best_matches, db_match_indexes)
+            if db_detail_columns and not results_df.empty:
+                join_db_fields(results_df, db_data_parsed, db_detail_columns)
+        else:
+            results_df = assemble_results(prepared_clients, matched_indexes, db_match_indexes)
+    if results_df.empty:
+        return results_df
+
+    if blocking is not None:
+        logging.info(f"Blocking ({blocking.strategy}) skipped {blocking_report.comparisons_skipped} of {blocking_report.comparisons_total} fuzzy comparisons.")
+    if log_row_matches:
+        log_matched_rows(results_df)
+    record_result_counters(stats, results_df, blocking_report)
+    results_df.attrs['blocking_report'] = blocking_report.as_dict()
+    results_df.attrs['match_stats'] = stats.as_dict()
+    return results_df
+
+def record_result_counters(stats, results_df, blocking_report):
+    """
+    Adds the rows per status and the fuzzy comparison counts of one run to stats.
+    """
+    for status, rows in results_df['status'].value_counts(sort=False).items():
+        stats.count(f"rows: {status}", rows)
+    stats.count("fuzzy_comparisons", blocking_report.comparisons_performed)
+    stats.count("fuzzy_comparisons_skipped", blocking_report.comparisons_skipped)
+
+def log_matched_rows(results_df):
+    """
+    Logs one line per matched client row. Runs after matching so the hot loop stays free of logging.
+    """
+    matched = results_df[results_df['status'] == "Duplicate Found"]
+    for row_pos, file_name, sheet_name in zip(matched.index, matched['matched_file'], matched['matched_sheet']):
+        logging.info(f"Match found for client row {row_pos} in {file_name}/{sheet_name}.")
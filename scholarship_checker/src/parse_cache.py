@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from src.parsers import PARSER_VERSION, parse_files_concurrently
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_CACHE_DIR = os.environ.get("SCHOLARSHIP_PARSE_CACHE_DIR",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "scholarship_checker", "parsed"))
+DEFAULT_MAX_BYTES = int(os.environ.get("SCHOLARSHIP_PARSE_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+MANIFEST_NAME = "manifest.json"
+
+def content_hash(file_content):
+    """
+    Returns the SHA-256 hex digest of an uploaded file, a BytesIO buffer or raw bytes.
+    """
+    if isinstance(file_content, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(file_content).hexdigest()
+    if hasattr(file_content, "getbuffer"): # BytesIO / Streamlit UploadedFile: hash without copying
+        with file_content.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    return hashlib.sha256(file_content.getvalue()).hexdigest()
+
+def _write_table(df, path_stem):
+    """
+    Writes df as Feather when possible, otherwise as a pickle (mixed-type or
+    non-string column names, or pyarrow not installed). Returns the file name used.
+    """
+    try:
+        file_path = path_stem + ".feather"
+        df.to_feather(file_path)
+        return os.path.basename(file_path)
+    except Exception as e:
+        logging.debug(f"Feather not usable for cached table {path_stem}: {e}. Falling back to pickle.")
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    file_path = path_stem + ".pkl"
+    df.to_pickle(file_path)
+    return os.path.basename(file_path)
+
+def _read_table(file_path):
+    if file_path.endswith(".feather"):
+        return pd.read_feather(file_path)
+    return pd.read_pickle(file_path)
+
+class ParseCache:
+    """
+    On-disk cache of parsed files keyed by parser name, parsers.PARSER_VERSION and a hash of the file bytes.
+    Each entry is a directory holding one Feather (or pickle) file per sheet/table plus a
+    manifest. The least recently used entries are evicted once max_bytes is exceeded.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_dir(self, kind, digest):
+        return os.path.join(self.cache_dir, f"{kind}-v{PARSER_VERSION}-{digest}")
+
+    def get(self, kind, digest):
+        """
+        Returns the cached parse result (dict of sheets or list of tables), or None on a miss.
+        """
+        entry_dir = self._entry_dir(kind, digest)
+        manifest_path = os.path.join(entry_dir, MANIFEST_NAME)
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            tables = []
+            for table in manifest["tables"]:
+                df = _read_table(os.path.join(entry_dir, table["file"]))
+                df.attrs.update(table["attrs"])
+                tables.append((table["name"], df))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable parse cache entry {entry_dir}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        os.utime(manifest_path) # Mark as recently used for LRU eviction
+        if manifest["container"] == "dict":
+            return {name: df for name, df in tables}
+        return [df for _, df in tables]
+
+    def put(self, kind, digest, parsed):
+        """
+        Stores a parse result (dict of sheets or list of tables) and evicts old entries if needed.
+        """
+        entry_dir = self._entry_dir(kind, digest)
+        items = list(parsed.items()) if isinstance(parsed, dict) else [(None, df) for df in parsed]
+
+        # Written to a temporary directory and renamed, so readers never see a partial entry
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            tables = []
+            for position, (name, df) in enumerate(items):
+                file_name = _write_table(df, os.path.join(tmp_dir, str(position)))
+                tables.append({"name": name, "file": file_name, "attrs": dict(df.attrs)})
+            manifest = {"container": "dict" if isinstance(parsed, dict) else "list", "tables": tables}
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            if os.path.isdir(entry_dir): # Another session stored the same file meanwhile
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, entry_dir)
+        except Exception as e:
+            logging.warning(f"Could not write parse cache entry for {kind}-{digest}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Removes least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total_bytes = 0
+        for entry_name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, entry_name)
+            manifest_path = os.path.join(entry_dir, MANIFEST_NAME)
+            if entry_name.startswith(".tmp-") or not os.path.isfile(manifest_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir))
+            entries.append((os.path.getmtime(manifest_path), size, entry_dir))
+            total_bytes += size
+
+        for _, size, entry_dir in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
+            logging.info(f"Evicted parse cache entry {os.path.basename(entry_dir)} ({size} bytes).")
+
+    def cached_parse(self, parse_func, file_content, file_name, kind=None):
+        """
+        Returns parse_func(file_content, file_name), served from the cache when the same
+        file bytes were parsed before. Empty (failed) results are not cached. kind names the
+        cache namespace and defaults to parse_func's name; parsers bound to options (e.g. a
+        functools.partial) need a kind that includes those options.
+        """
+        kind = kind or parse_func.__name__
+        digest = content_hash(file_content)
+        start = time.perf_counter()
+        parsed = self.get(kind, digest)
+        if parsed is not None:
+            logging.info(f"Loaded {file_name} from parse cache in {time.perf_counter() - start:.3f}s.")
+            return parsed
+
+        parsed = parse_func(file_content, file_name)
+        if parsed:
+            self.put(kind, digest, parsed)
+        return parsed
+
+    def cached_parse_many(self, parse_func, files, max_workers=None, kind=None):
+        """
+        Cached, concurrent version of cached_parse for a list of (file_name, file_content).
+        Cache hits are yielded first, then the remaining files as they finish parsing.
+        Yields (position, file_name, parsed, from_cache); position is the index in files.
+        """
+        kind = kind or parse_func.__name__
+        misses = []
+        for position, (file_name, file_content) in enumerate(files):
+            digest = content_hash(file_content)
+            parsed = self.get(kind, digest)
+            if parsed is not None:
+                yield position, file_name, parsed, True
+            else:
+                misses.append((position, digest))
+
+        miss_files = [files[position] for position, _ in misses]
+        for miss_pos, file_name, parsed in parse_files_concurrently(parse_func, miss_files, max_workers=max_workers):
+            position, digest = misses[miss_pos]
+            if parsed:
+                self.put(kind, digest, parsed)
+            yield position, file_name, parsed, False
@@ -1,64 +1,224 @@
 import pandas as pd
 import pdfplumber
 from docx import Document
+from lxml import etree
 import io
 import logging
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import python_calamine # noqa: F401 - optional, much faster Excel reader
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# Version of the parsers' output, part of every parse cache key. Bump it whenever a parser's output
+# changes (columns, values, dtypes), so entries cached by the earlier parsers are no longer served.
+# 2: the docx table reader; 3: compact dtypes for parsed Excel columns.
+PARSER_VERSION = 3
+
+# PDFs with fewer pages are parsed in-process; sharding only pays off for long merit lists
+PDF_PARALLEL_MIN_PAGES = 20
+
+# Rows per sheet read by parse_excel_headers, enough for the column picker's preview
+EXCEL_PREVIEW_ROWS = 5
+# Text columns whose distinct values are at most this share of the rows are stored as categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Worker processes are spawned, not forked: forking the multithreaded Streamlit server can
+# deadlock on locks held by its other threads
+POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+def _as_buffer(file_content):
+    """
+    Returns a seekable binary buffer for file_content. Uploaded files and other
+    file-like objects are rewound and used as is rather than copied.
+    """
+    if isinstance(file_content, (bytes, bytearray)):
+        return io.BytesIO(file_content)
+    if hasattr(file_content, "read") and hasattr(file_content, "seek"):
+        file_content.seek(0)
+        return file_content
+    return io.BytesIO(file_content.getvalue())
+
+def _excel_engine(file_name):
+    """
+    Picks the fastest available Excel engine: calamine when installed, otherwise
+    openpyxl for .xlsx (pandas opens it read-only, streaming the rows) and the
+    pandas default (xlrd) for .xls.
+    """
+    if CALAMINE_AVAILABLE:
+        return "calamine"
+    if file_name.lower().endswith(".xlsx"):
+        return "openpyxl"
+    return None
+
+def _read_all_sheets(buffer, engine, **parse_kwargs):
+    """
+    Reads every sheet through a single open workbook. Sheets are parsed one at a time
+    (rather than read_excel(sheet_name=None)) so only one sheet's raw cell data is
+    held in memory at once. parse_kwargs (e.g. nrows, usecols) go to ExcelFile.parse.
+    """
+    with pd.ExcelFile(buffer, engine=engine) as xls:
+        return {sheet_name: xls.parse(sheet_name, **parse_kwargs) for sheet_name in xls.sheet_names}
+
+def _read_excel_sheets(file_content, file_name, **parse_kwargs):
+    """
+    _read_all_sheets with the fastest engine, retrying with the default engine if calamine fails.
+    """
+    buffer = _as_buffer(file_content)
+    engine = _excel_engine(file_name)
+    try:
+        return _read_all_sheets(buffer, engine, **parse_kwargs)
+    except Exception as e:
+        if engine != "calamine":
+            raise
+        logging.warning(f"calamine could not read {file_name} ({e}). Retrying with the default engine.")
+        buffer.seek(0)
+        return _read_all_sheets(buffer, None, **parse_kwargs)
+
 def parse_excel(file_content, file_name):
     """
     Parses an Excel file (xls or xlsx) and returns a dictionary of DataFrames,
     where keys are sheet names and values are the corresponding DataFrames.
     """
     try:
-        # Ensure file_content is a BytesIO buffer
-        if not isinstance(file_content, io.BytesIO):
-            file_content = io.BytesIO(file_content.getvalue())
-            file_content.seek(0) # Reset buffer position after reading getvalue()
-
-        xls = pd.ExcelFile(file_content)
-        sheet_names = xls.sheet_names
-        data_frames = {}
-        for sheet_name in sheet_names:
-            data_frames[sheet_name] = pd.read_excel(xls, sheet_name=sheet_name)
-        logging.info(f"Successfully parsed Excel file: {file_name} with sheets: {', '.join(sheet_names)}")
+        data_frames = _read_excel_sheets(file_content, file_name)
+        logging.info(f"Successfully parsed Excel file: {file_name} with sheets: {', '.join(map(str, data_frames))}")
+        return data_frames
+    except Exception as e:
+        logging.error(f"Error parsing Excel file {file_name}: {e}")
+        return {}
+
+def parse_excel_headers(file_content, file_name, preview_rows=EXCEL_PREVIEW_ROWS):
+    """
+    First phase of the two-phase workbook load: the column names and first preview_rows
+    rows of every sheet, so columns can be chosen before the data itself is loaded.
+    """
+    try:
+        data_frames = _read_excel_sheets(file_content, file_name, nrows=preview_rows)
+        logging.info(f"Read headers of Excel file: {file_name} with sheets: {', '.join(map(str, data_frames))}")
+        return data_frames
+    except Exception as e:
+        logging.error(f"Error reading headers of Excel file {file_name}: {e}")
+        return {}
+
+def parse_excel_columns(file_content, file_name, columns):
+    """
+    Second phase of the two-phase workbook load: only the given columns of every sheet
+    (those it has), with compact dtypes. A sheet holding none of them comes back empty.
+    """
+    wanted_columns = set(columns)
+    try:
+        data_frames = _read_excel_sheets(file_content, file_name, usecols=lambda column: column in wanted_columns)
+        data_frames = {sheet_name: compact_dtypes(df) for sheet_name, df in data_frames.items()}
+        logging.info(f"Loaded {len(wanted_columns)} selected column(s) of Excel file: {file_name}")
         return data_frames
     except Exception as e:
         logging.error(f"Error parsing Excel file {file_name}: {e}")
         return {}
 
-def parse_pdf(file_content, file_name):
+def compact_dtypes(df, category_max_unique_ratio=CATEGORY_MAX_UNIQUE_RATIO):
+    """
+    Returns df with lighter dtypes and the same values: text columns become categoricals
+    when their values repeat, otherwise (Arrow-backed where available) strings, and integer
+    columns are downcast. Match keys built from the result equal those of the original.
+    """
+    compact_df = df.copy(deep=False)
+    for position in range(compact_df.shape[1]):
+        series = compact_df.iloc[:, position]
+        if pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            compact_df.isetitem(position, pd.to_numeric(series, downcast="integer"))
+        elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+            continue # Mixed values (numbers and text) are left as they are
+        elif series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+            if series.nunique(dropna=True) <= category_max_unique_ratio * len(series):
+                compact_df.isetitem(position, series.astype("category"))
+            elif series.dtype == object:
+                compact_df.isetitem(position, series.astype("str"))
+    return compact_df
+
+def _extract_page_tables(page, page_index, file_name):
+    """
+    Extracts the tables of one pdfplumber page as DataFrames labelled with df.attrs['source'].
+    """
+    data_frames = []
+    tables = page.extract_tables()
+    if tables:
+        for j, table_data in enumerate(tables):
+            if table_data: # Ensure table_data is not empty
+                df = pd.DataFrame(table_data[1:], columns=table_data[0]) # Use first row as header
+                df.attrs['source'] = f"Page_{page_index+1}_Table_{j+1}"
+                data_frames.append(df)
+    else: # Fallback if extract_tables returns nothing
+        table = page.extract_table()
+        if table:
+            df = pd.DataFrame(table[1:], columns=table[0])
+            df.attrs['source'] = f"Page_{page_index+1}"
+            data_frames.append(df)
+        else:
+            # If neither extract_tables() nor extract_table() finds anything on a page,
+            # log this. More advanced text extraction could be a future enhancement if needed.
+            logging.warning(f"No tables extracted using extract_tables() or extract_table() on page {page_index+1} of {file_name}.")
+    return data_frames
+
+def _iter_page_range(pdf, file_name, start_page=0, end_page=None):
+    for page_index in range(start_page, len(pdf.pages) if end_page is None else end_page):
+        page = pdf.pages[page_index]
+        yield from _extract_page_tables(page, page_index, file_name)
+        page.close() # Frees the page's cached layout objects
+
+# PDF bytes of the file being sharded, set once per worker process by the pool initializer
+_worker_pdf_bytes = None
+
+def _init_pdf_worker(file_bytes):
+    global _worker_pdf_bytes
+    _worker_pdf_bytes = file_bytes
+
+def _parse_pdf_page_range(file_name, start_page, end_page):
+    """
+    Worker for parse_pdf: extracts the tables of pages [start_page, end_page).
+    """
+    with pdfplumber.open(io.BytesIO(_worker_pdf_bytes)) as pdf:
+        return list(_iter_page_range(pdf, file_name, start_page, end_page))
+
+def iter_pdf_tables(file_content, file_name):
+    """
+    Streaming variant of parse_pdf: yields each table's DataFrame as soon as its page
+    is parsed, so callers can start matching before the whole PDF is read.
+    Errors are logged and end the stream.
+    """
+    try:
+        with pdfplumber.open(_as_buffer(file_content)) as pdf:
+            yield from _iter_page_range(pdf, file_name)
+    except Exception as e:
+        logging.error(f"Error parsing PDF file {file_name}: {e}")
+
+def parse_pdf(file_content, file_name, workers=None):
     """
     Parses a PDF file and extracts tables into a list of DataFrames.
+    PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split into page ranges that are
+    parsed in worker processes (workers defaults to the CPU count; 1 disables this).
     """
     data_frames = []
     try:
-        # Ensure file_content is a BytesIO buffer
-        if not isinstance(file_content, io.BytesIO):
-            file_content = io.BytesIO(file_content.getvalue())
-            file_content.seek(0)
-
-        with pdfplumber.open(file_content) as pdf:
-            for i, page in enumerate(pdf.pages):
-                tables = page.extract_tables()
-                if tables:
-                    for j, table_data in enumerate(tables):
-                        if table_data: # Ensure table_data is not empty
-                            df = pd.DataFrame(table_data[1:], columns=table_data[0]) # Use first row as header
-                            df.attrs['source'] = f"Page_{i+1}_Table_{j+1}"
-                            data_frames.append(df)
-                else: # Fallback if extract_tables returns nothing
-                    table = page.extract_table()
-                    if table:
-                        df = pd.DataFrame(table[1:], columns=table[0])
-                        df.attrs['source'] = f"Page_{i+1}"
-                        data_frames.append(df)
-                    else:
-                        # If neither extract_tables() nor extract_table() finds anything on a page,
-                        # log this. More advanced text extraction could be a future enhancement if needed.
-                        logging.warning(f"No tables extracted using extract_tables() or extract_table() on page {i+1} of {file_name}.")
+        buffer = _as_buffer(file_content)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        with pdfplumber.open(buffer) as pdf:
+            page_count = len(pdf.pages)
+            parallel = workers > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+            if not parallel:
+                data_frames = list(_iter_page_range(pdf, file_name))
+        if parallel:
+            buffer.seek(0)
+            data_frames = _parse_pdf_parallel(buffer.read(), file_name, page_count, workers)
 
         if data_frames:
             logging.info(f"Successfully parsed PDF file: {file_name}, found {len(data_frames)} table(s).")
@@ -69,23 +229,151 @@ def parse_pdf(file_content, file_name):
         logging.error(f"Error parsing PDF file {file_name}: {e}")
         return []
 
+def _parse_pdf_parallel(file_bytes, file_name, page_count, workers):
+    """
+    Shards the pages into ranges, parses them in a process pool and concatenates the
+    tables in page order.
+    """
+    # A few shards per worker evens out pages with very different table counts
+    shard_size = max(1, -(-page_count // (workers * 4)))
+    page_ranges = [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+    logging.info(f"Parsing {page_count} pages of {file_name} in {len(page_ranges)} shard(s) on {workers} worker(s).")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT, initializer=_init_pdf_worker, initargs=(file_bytes,)) as pool:
+        shard_results = pool.map(_parse_pdf_page_range, [file_name] * len(page_ranges),
+                                 [start for start, _ in page_ranges], [end for _, end in page_ranges])
+        return [df for shard in shard_results for df in shard]
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_PACKAGE_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+def _docx_run_text(run):
+    # Same run content python-docx maps to text: w:t, tabs, line breaks and no-break hyphens
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _W + "t":
+            parts.append(child.text or "")
+        elif tag in (_W + "tab", _W + "ptab"):
+            parts.append("\t")
+        elif tag == _W + "br":
+            parts.append("\n" if child.get(_W + "type", "textWrapping") == "textWrapping" else "")
+        elif tag == _W + "cr":
+            parts.append("\n")
+        elif tag == _W + "noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+def _docx_cell_text(tc):
+    # Equivalent of python-docx _Cell.text: the cell's own paragraphs joined by newlines
+    paragraphs = []
+    for p in tc.iterchildren(_W + "p"):
+        parts = []
+        for child in p:
+            if child.tag == _W + "r":
+                parts.append(_docx_run_text(child))
+            elif child.tag == _W + "hyperlink":
+                parts.extend(_docx_run_text(run) for run in child.iterchildren(_W + "r"))
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+def _docx_row_cells(tr, cells_above):
+    """
+    Cell texts of one w:tr, resolved like python-docx _Row.cells: a gridSpan cell is
+    repeated once per grid column and a vMerge continuation cell repeats the cells of the
+    cell above it at the same grid offset. Returns (texts, cells_by_offset) where
+    cells_by_offset is needed to resolve the next row.
+    """
+    tr_pr = tr.find(_W + "trPr")
+    grid_before = tr_pr.find(_W + "gridBefore") if tr_pr is not None else None
+    grid_offset = int(grid_before.get(_W + "val", 0)) if grid_before is not None else 0
+
+    texts = []
+    cells_by_offset = {}
+    for tc in tr.iterchildren(_W + "tc"):
+        tc_pr = tc.find(_W + "tcPr")
+        grid_span = tc_pr.find(_W + "gridSpan") if tc_pr is not None else None
+        span = int(grid_span.get(_W + "val")) if grid_span is not None else 1
+        v_merge = tc_pr.find(_W + "vMerge") if tc_pr is not None else None
+
+        if v_merge is not None and v_merge.get(_W + "val", "continue") == "continue":
+            if grid_offset not in cells_above:
+                raise ValueError(f"no `tc` element at grid_offset={grid_offset}")
+            cells = cells_above[grid_offset]
+        else:
+            cells = [_docx_cell_text(tc)] * span
+        texts.extend(cells)
+        cells_by_offset[grid_offset] = cells
+        grid_offset += span
+    return texts, cells_by_offset
+
+def _docx_main_part(archive):
+    # The main document part is normally word/document.xml, but the package relationships are authoritative
+    try:
+        rels = etree.fromstring(archive.read("_rels/.rels"))
+        for rel in rels.iterchildren(_PACKAGE_REL + "Relationship"):
+            if rel.get("Type") == _OFFICE_DOCUMENT_REL:
+                return rel.get("Target").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+def _iter_docx_tables_fast(buffer):
+    """
+    Streams the main document XML out of the docx zip and yields the rows (lists of cell
+    texts) of every body-level table, without building python-docx proxy objects.
+    Rows are cleared from the parse tree as soon as they are read.
+    """
+    with zipfile.ZipFile(buffer) as archive, archive.open(_docx_main_part(archive)) as xml_stream:
+        body = None
+        table = None
+        rows_data = []
+        cells_above = {}
+        # Only body, table and row events are reported; everything else is parsed without callbacks
+        for event, elem in etree.iterparse(xml_stream, events=("start", "end"), tag=(_W + "body", _W + "tbl", _W + "tr")):
+            if event == "start":
+                if elem.tag == _W + "body":
+                    body = elem
+                elif elem.tag == _W + "tbl" and table is None and elem.getparent() is body:
+                    table, rows_data, cells_above = elem, [], {}
+                continue
+
+            if table is not None and elem.tag == _W + "tr" and elem.getparent() is table:
+                row_texts, cells_above = _docx_row_cells(elem, cells_above)
+                rows_data.append(row_texts)
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del table[0]
+            elif elem is table:
+                yield rows_data
+                table = None
+                # Done with this table and the body content before it: free them
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del body[0]
+
+def _iter_docx_tables_python_docx(buffer):
+    doc = Document(buffer)
+    for table in doc.tables:
+        yield [[cell.text for cell in row.cells] for row in table.rows]
+
 def parse_word(file_content, file_name):
     """
     Parses a Word document (.doc, .docx) and extracts tables into a list of DataFrames.
+    Tables are read straight from the document XML; python-docx is the fallback for
+    files the fast reader cannot handle.
     """
     data_frames = []
     try:
-        # Ensure file_content is a BytesIO buffer
-        if not isinstance(file_content, io.BytesIO):
-            file_content = io.BytesIO(file_content.getvalue())
-            file_content.seek(0)
-            
-        doc = Document(file_content)
-        for i, table in enumerate(doc.tables):
-            rows_data = []
-            for row in table.rows:
-                rows_data.append([cell.text for cell in row.cells])
-            
+        buffer = _as_buffer(file_content)
+        try:
+            tables_rows = list(_iter_docx_tables_fast(buffer))
+        except Exception as e:
+            logging.debug(f"Fast table reader failed for {file_name} ({e}). Falling back to python-docx.")
+            buffer.seek(0)
+            tables_rows = list(_iter_docx_tables_python_docx(buffer))
+
+        for i, rows_data in enumerate(tables_rows):
             if rows_data: # Ensure there is data to create a DataFrame
                 df = pd.DataFrame(rows_data[1:], columns=rows_data[0]) # Use first row as header
                 df.attrs['source'] = f"Table_{i+1}"
@@ -100,3 +388,28 @@ def parse_word(file_content, file_name):
         # python-docx might raise PackageNotFoundError for .doc files or other issues
         logging.error(f"Error parsing Word file {file_name}: {e}. This parser primarily supports .docx files.")
         return []
+
+def _parse_from_bytes(parse_func, file_bytes, file_name):
+    return parse_func(io.BytesIO(file_bytes), file_name)
+
+def parse_files_concurrently(parse_func, files, max_workers=None):
+    """
+    Parses several files at once in a process pool with parse_func (e.g. parse_excel).
+    files is a list of (file_name, file_content). Yields (position, file_name, parsed) as
+    each file finishes; position is the file's index in files, so callers can restore order.
+    """
+    if max_workers is None:
+        max_workers = min(len(files), os.cpu_count() or 1)
+    if len(files) <= 1 or max_workers <= 1:
+        for position, (file_name, file_content) in enumerate(files):
+            yield position, file_name, parse_func(file_content, file_name)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=POOL_CONTEXT) as pool:
+        futures = {}
+        for position, (file_name, file_content) in enumerate(files):
+            file_bytes = file_content if isinstance(file_content, bytes) else file_content.getvalue()
+            futures[pool.submit(_parse_from_bytes, parse_func, file_bytes, file_name)] = (position, file_name)
+        for future in as_completed(futures):
+            position, file_name = futures[future]
+            yield position, file_name, future.result()
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+from scholarship_checker.src.blocking import BlockingConfig, BlockingReport, CandidateBlocker
+from scholarship_checker.src.matcher import find_duplicates
+
+CHOICES = ['rahul sharma', 'priya verma', 'rahul verma', 'amit kumar 9876543210', 'neha jain 9123456789']
+
+def test_trigram_blocking_keeps_similar_keys():
+    blocker = CandidateBlocker(CHOICES, BlockingConfig(strategy="trigram", min_overlap=0.5))
+    assert blocker.candidates('rahul sharmaa').tolist() == [0]
+    assert blocker.candidates('zzzz').tolist() == []
+
+def test_min_overlap_trades_recall_for_speed():
+    loose = CandidateBlocker(CHOICES, BlockingConfig(min_overlap=0.1)).candidates('rahul sharma')
+    strict = CandidateBlocker(CHOICES, BlockingConfig(min_overlap=0.9)).candidates('rahul sharma')
+    assert set(strict.tolist()) <= set(loose.tolist())
+    assert len(loose) > len(strict)
+
+def test_prefix_and_digits_blocking():
+    prefix = CandidateBlocker(CHOICES, BlockingConfig(strategy="prefix", prefix_length=5))
+    assert prefix.candidates('rahul s').tolist() == [0, 2]
+    digits = CandidateBlocker(CHOICES, BlockingConfig(strategy="digits", digits_length=4))
+    assert digits.candidates('a kumar +91 98765 43210').tolist() == [3]
+    # No digits in the client key: compare against every choice
+    assert digits.candidates('amit kumar') is None
+
+def test_invalid_config():
+    with pytest.raises(ValueError):
+        BlockingConfig(strategy="soundex")
+    with pytest.raises(ValueError):
+        BlockingConfig(min_overlap=0)
+
+def test_blocking_report_counts():
+    report = BlockingReport()
+    report.add(100, 10)
+    assert report.as_dict() == {"comparisons_total": 100, "comparisons_performed": 10, "comparisons_skipped": 90, "skipped_ratio": 0.9}
+
+def test_find_duplicates_with_blocking_reports_skipped_comparisons():
+    db = {'db.xlsx': {'Sheet1': pd.DataFrame({'Name': CHOICES})}}
+    client = {'Sheet1': pd.DataFrame({'Name': ['Rahul Sharmaa', 'Zoya Akhtar']})}
+    results = find_duplicates(client, ['Name'], db, ['Name'], blocking=BlockingConfig(min_overlap=0.5))
+    assert results['status'].tolist() == ["Duplicate Found", "Not Found"]
+    report = results.attrs['blocking_report']
+    assert report['comparisons_total'] == 2 * len(CHOICES)
+    assert report['comparisons_skipped'] > 0
@@ -0,0 +1,109 @@
+import pandas as pd
+from scholarship_checker.cli import main
+
+def _write_inputs(tmp_path):
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    pd.DataFrame({'Student Name': ['Rahul Sharma', 'Priya Verma']}).to_excel(db_dir / "db_2022.xlsx", index=False)
+    with pd.ExcelWriter(db_dir / "db_2023.xlsx") as writer:
+        pd.DataFrame({'Student Name': ['Amit Kumar', 'Priya Verma']}).to_excel(writer, index=False, sheet_name='Sheet1')
+        pd.DataFrame({'Unrelated': ['x']}).to_excel(writer, index=False, sheet_name='Other')
+    (db_dir / "notes.txt").write_text("not a workbook")
+
+    client_path = tmp_path / "client.xlsx"
+    with pd.ExcelWriter(client_path) as writer:
+        pd.DataFrame({'Name': ['Priya Verma', 'Amit Kumarr', 'Zoya Akhtar'], 'Marks': [91, 78, 66]}).to_excel(writer, index=False, sheet_name='Applicants')
+        pd.DataFrame({'Remarks': ['no name column']}).to_excel(writer, index=False, sheet_name='Notes')
+    return client_path, db_dir
+
+def test_cli_streams_chunks_to_csv(tmp_path, capsys):
+    client_path, db_dir = _write_inputs(tmp_path)
+    output = tmp_path / "results.csv"
+    exit_code = main([str(client_path), str(db_dir), "-c", "Name", "-d", "Student Name", "-o", str(output),
+                      "--chunk-rows", "2", "--no-cache"])
+    assert exit_code == 0
+    results = pd.read_csv(output)
+    assert results['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Not Found"]
+    assert results['matched_file'].iloc[:2].tolist() == ['db_2022.xlsx', 'db_2023.xlsx']
+    assert results['Marks'].tolist() == [91, 78, 66]
+    stderr = capsys.readouterr().err
+    assert "Skipped Notes" in stderr
+    assert "Timings: parse" in stderr and "fuzzy_scoring" in stderr
+
+def test_cli_starts_one_worker_pool_and_keeps_columns_of_later_tables(tmp_path, capsys, monkeypatch):
+    from scholarship_checker import cli
+    client_path, db_dir = _write_inputs(tmp_path)
+    with pd.ExcelWriter(client_path, mode='a', engine='openpyxl') as writer:
+        pd.DataFrame({'Name': ['Rahul Sharma'], 'Category': ['OBC']}).to_excel(writer, index=False, sheet_name='Late')
+    pools, match_worker_pool = [], cli.match_worker_pool
+    def counting_pool(*args):
+        pools.append(match_worker_pool(*args))
+        return pools[-1]
+    monkeypatch.setattr(cli, 'match_worker_pool', counting_pool)
+    output = tmp_path / "results.csv"
+    assert main([str(client_path), str(db_dir), "-c", "Name", "-d", "Student Name", "-o", str(output),
+                 "--chunk-rows", "1", "--workers", "2", "--no-cache"]) == 0
+    assert len(pools) == 1
+    results = pd.read_csv(output)
+    assert results['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Not Found", "Duplicate Found"]
+    # The later table's extra column is written, blank for the rows of the first table
+    assert results['Category'].tolist()[-1] == 'OBC' and results['Category'].iloc[:3].isna().all()
+
+def test_cli_writes_parquet_through_the_parse_cache(tmp_path):
+    client_path, db_dir = _write_inputs(tmp_path)
+    output = tmp_path / "results.parquet"
+    args = [str(client_path), str(db_dir), "-c", "Name", "-d", "Student Name", "-o", str(output),
+            "--cache-dir", str(tmp_path / "cache"), "--blocking", "trigram", "-q"]
+    assert main(args) == 0
+    assert main(args) == 0 # Second run is served from the parse cache
+    results = pd.read_parquet(output)
+    assert results['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Not Found"]
+    assert results['Marks'].tolist() == ['91', '78', '66']
+
+def test_cli_writes_xlsx(tmp_path):
+    client_path, db_dir = _write_inputs(tmp_path)
+    output = tmp_path / "results.xlsx"
+    assert main([str(client_path), str(db_dir), "-c", "Name", "-d", "Student Name", "-o", str(output), "--no-cache", "-q"]) == 0
+    results = pd.read_excel(output)
+    assert results['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Not Found"]
+    assert results['Marks'].tolist() == [91, 78, 66]
+
+def test_cli_matches_against_the_match_store(tmp_path):
+    client_path, db_dir = _write_inputs(tmp_path)
+    store_path = tmp_path / "store.sqlite"
+    output = tmp_path / "results.csv"
+    assert main([str(client_path), str(db_dir), "-c", "Name", "-d", "Student Name", "-o", str(output),
+                 "--store", str(store_path), "--no-cache", "-q"]) == 0
+    # Later runs need no DB directory: the stored files are matched
+    assert main([str(client_path), "-c", "Name", "-d", "Student Name", "-o", str(output), "--store", str(store_path), "--no-cache", "-q"]) == 0
+    results = pd.read_csv(output)
+    assert results['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Not Found"]
+    assert results['matched_file'].iloc[:2].tolist() == ['db_2022.xlsx', 'db_2023.xlsx']
+
+def test_cli_fields_plan_matches_identifiers_exactly(tmp_path):
+    client_path, db_dir = _write_inputs(tmp_path)
+    output = tmp_path / "results.csv"
+    pd.DataFrame({'Roll No': ['2022-UCS-101', '2022-UCS-102']}).to_excel(db_dir / "db_2021.xlsx", index=False)
+    pd.DataFrame({'Roll Number': ['2022ucs102', '2022ucs999']}).to_excel(client_path, index=False)
+    assert main([str(client_path), str(db_dir), "-c", "Roll Number", "-d", "Roll No", "-o", str(output), "--plan", "fields", "--no-cache", "-q"]) == 0
+    results = pd.read_csv(output)
+    assert results['status'].tolist() == ["Duplicate Found", "Not Found"]
+    assert results.loc[0, 'matched_file'] == 'db_2021.xlsx'
+    assert main([str(client_path), str(db_dir), "-c", "Name", "-d", "Student Name", "-o", str(output), "--plan", "fields", "--best"]) == 2
+
+def test_cli_rejects_bad_arguments(tmp_path, capsys):
+    client_path, db_dir = _write_inputs(tmp_path)
+    assert main([str(client_path), str(db_dir), "-c", "A", "B", "C", "-d", "Student Name", "-o", str(tmp_path / "r.csv")]) == 2
+    empty_dir = tmp_path / "empty"
+    empty_dir.mkdir()
+    assert main([str(client_path), str(empty_dir), "-c", "Name", "-d", "Student Name", "-o", str(tmp_path / "r.csv"), "--no-cache"]) == 1
+    assert "no .xlsx/.xls files" in capsys.readouterr().err
+
+def test_cli_best_mode_reports_scores(tmp_path):
+    client_path, db_dir = _write_inputs(tmp_path)
+    output = tmp_path / "results.csv"
+    assert main([str(client_path), str(db_dir), "-c", "Name", "-d", "Student Name", "-o", str(output),
+                 "--best", "--top-k", "2", "--no-cache", "-q"]) == 0
+    results = pd.read_csv(output)
+    assert results['match_score'].iloc[0] == 100
+    assert results['match_2_file'].iloc[0] == 'db_2023.xlsx'
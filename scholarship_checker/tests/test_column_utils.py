@@ -1,6 +1,8 @@
+import pytest
 import pandas as pd
 from pandas.testing import assert_series_equal
-from scholarship_checker.src.column_utils import clean_column_values, get_standardized_column_name, DEFAULT_MAPPING_RULES, extract_column_names
+from scholarship_checker.src.column_utils import clean_column_values, get_standardized_column_name, DEFAULT_MAPPING_RULES, extract_column_names, get_column_mapper
+from scholarship_checker.src import column_utils
 
 # Tests for clean_column_values
 def test_clean_column_simple():
@@ -34,6 +36,74 @@ def test_clean_column_non_string_series():
     cleaned_series = clean_column_values(input_series)
     assert_series_equal(cleaned_series, expected_series)
 
+def _regex_clean(series):
+    # The original pandas chain that normalize_values must reproduce
+    return series.astype(str).str.lower().str.strip().str.replace(r'\s+', ' ', regex=True)
+
+def test_normalize_values_matches_regex_chain():
+    values = ["  Rahul \t\n SHARMA ", "Priya  Verma", "", "   ", None, float('nan'), 42, "A\u00a0\u00a0B", "x\x0by", "\u3000Neha\u3000", "İstanbul"]
+    series = pd.Series(values * 3000, dtype=object) # Large enough to exercise the sampled collapse path
+    assert_series_equal(column_utils.normalize_values(series), _regex_clean(series))
+
+def test_normalize_values_python_path_matches_regex_chain(monkeypatch):
+    monkeypatch.setattr(column_utils, 'PYARROW_AVAILABLE', False)
+    series = pd.Series(["  Rahul \t\n SHARMA ", None, "Priya  Verma", 7], index=[5, 6, 7, 8], name='Name')
+    assert_series_equal(column_utils.normalize_values(series), _regex_clean(series))
+
+def test_identifier_profiles_reduce_to_comparable_keys():
+    roll_numbers = pd.Series(['2021/CS-042', ' 2021 cs 042', 101.0, None, '--'])
+    assert column_utils.normalize_identifiers(roll_numbers).tolist()[:3] == ['2021cs042', '2021cs042', '101']
+    assert column_utils.normalize_identifiers(roll_numbers).iloc[3:].isna().all()
+    mobiles = pd.Series(['+91 98765-43210', 9876543210, 'n/a'])
+    assert column_utils.normalize_mobile_numbers(mobiles).tolist()[:2] == ['9876543210', '9876543210']
+    assert pd.isna(column_utils.normalize_mobile_numbers(mobiles).iloc[2])
+
+@pytest.mark.parametrize("values", [['2021/CS-042', None, float('nan')], [101.0, float('nan'), float('nan')], ['a1', None, pd.NA]])
+def test_identifier_profiles_keep_missing_values_missing(values):
+    # On pandas < 3, astype(str) alone would turn these into the identifiers "none" and "nan"
+    for normalize in (column_utils.normalize_identifiers, column_utils.normalize_mobile_numbers):
+        normalized = normalize(pd.Series(values, dtype=object))
+        assert normalized.iloc[1:].isna().all()
+        assert not normalized.isin(['nan', 'none', 'na']).any()
+
+def test_normalized_column_is_memoized_per_frame():
+    cache = column_utils.NormalizationCache(max_entries=2)
+    df = pd.DataFrame({'Name': ['  AMIT kumar', 'Neha'], 'Roll': ['A1 ', 'b2']})
+    first = cache.get(df, 'Name')
+    assert first.tolist() == ['amit kumar', 'neha']
+    assert cache.get(df, 'Name') is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Equal content in a different frame is a separate entry; the oldest entry is evicted
+    other = df.copy()
+    cache.get(other, 'Name')
+    cache.get(df, 'Roll')
+    assert len(cache) == 2
+    assert cache.get(df, 'Name') is not first
+
+    cache.invalidate(df)
+    assert len(cache) == 0
+    cache.get(other, 'Roll')
+    assert len(cache) == 1
+    del other
+    assert len(cache) == 0 # Entries go away with their DataFrame
+
+@pytest.mark.parametrize("values", [['  AMIT kumar', 'Neha'], [101.0, 102.0], pd.to_datetime(['2021-01-01', '2022-01-01'])])
+def test_normalized_column_misses_after_in_place_changes(values):
+    cache = column_utils.NormalizationCache()
+    df = pd.DataFrame({'Key': values, 'Other': values})
+    first = cache.get(df, 'Key')
+    assert cache.get(df, 'Key') is first
+
+    df.loc[0, 'Key'] = values[1]
+    after_loc = cache.get(df, 'Key')
+    assert after_loc.tolist() == [first.iloc[1], first.iloc[1]]
+
+    df['Key'] = values[::-1]
+    assert cache.get(df, 'Key').tolist() == first.tolist()[::-1]
+    assert cache.get(df, 'Other') is cache.get(df, 'Other') # Unchanged columns keep hitting
+    assert len(cache) == 2
+
 
 # Tests for get_standardized_column_name
 def test_get_standardized_name_exact_match():
@@ -56,6 +126,22 @@ def test_get_standardized_name_with_non_string_input():
     assert get_standardized_column_name(123, DEFAULT_MAPPING_RULES) == "123"
     assert get_standardized_column_name(None, DEFAULT_MAPPING_RULES) == "None"
 
+# Tests for the compiled column mapper
+def test_column_mapper_is_shared_per_rule_set():
+    assert get_column_mapper(DEFAULT_MAPPING_RULES) is get_column_mapper(dict(DEFAULT_MAPPING_RULES))
+    custom_rules = {"category": ["caste", "category"], "name": ["name"]}
+    custom_mapper = get_column_mapper(custom_rules)
+    assert custom_mapper is not get_column_mapper(DEFAULT_MAPPING_RULES)
+    assert custom_mapper.standardize("CASTE") == "category"
+    assert get_standardized_column_name("Caste", custom_rules) == "category"
+    assert get_standardized_column_name("Caste", DEFAULT_MAPPING_RULES) == "Caste" # Default rules are unaffected
+
+def test_column_mapper_first_rule_wins_and_memoizes():
+    mapper = get_column_mapper({"id": ["student id"], "roll_number": ["student id", "roll no"]})
+    assert mapper.standardize("Student-ID") == "id"
+    assert mapper.standardize_columns(["Roll  No", "Remarks"]) == {"Roll  No": "roll_number", "Remarks": "Remarks"}
+    assert mapper._memo["Roll  No"] == "roll_number"
+
 
 # Tests for extract_column_names
 def test_extract_column_names_list_of_dataframes():
@@ -0,0 +1,49 @@
+import pandas as pd
+from scholarship_checker.src.corpus import CorpusRegistry, estimate_bytes
+from scholarship_checker.src.matcher import build_db_match_indexes
+
+def _sheets(names):
+    return {'Sheet1': pd.DataFrame({'Student Name': names})}
+
+def test_put_returns_the_shared_copy():
+    registry = CorpusRegistry()
+    first, second = _sheets(['Rahul Sharma']), _sheets(['Rahul Sharma'])
+    assert registry.put(('cols', 'abc'), first) is first
+    assert registry.put(('cols', 'abc'), second) is first
+    assert registry.get(('cols', 'abc')) is first and registry.get(('cols', 'other')) is None
+    assert registry.key_of(first) == ('cols', 'abc') and registry.key_of(second) is None
+    assert registry.summary()['files'] == 1 and registry.hits == 1 and registry.misses == 1
+
+def test_match_indexes_are_built_once_per_file_and_selection():
+    registry = CorpusRegistry()
+    sheets = registry.put(('cols', 'abc'), _sheets(['Rahul Sharma', 'Priya Verma']))
+    first = registry.match_indexes({'db.xlsx': sheets}, ['Name'], ['Student Name'])
+    assert registry.match_indexes({'db.xlsx': sheets}, ['Name'], ['Student Name']) == first
+    assert [index.keys for index in first] == [index.keys for index in build_db_match_indexes({'db.xlsx': sheets}, ['Name'], ['Student Name'])]
+    assert registry.summary()['indexes'] == 1
+    # Files that are not registered are indexed without being kept
+    registry.match_indexes({'other.xlsx': _sheets(['Amit Kumar'])}, ['Name'], ['Student Name'])
+    assert registry.summary()['indexes'] == 1
+
+def test_eviction_spares_held_entries():
+    held, loose = _sheets(['Rahul Sharma'] * 50), _sheets(['Priya Verma'] * 50)
+    registry = CorpusRegistry(max_bytes=estimate_bytes(held) + estimate_bytes(loose) - 1)
+    registry.put(('cols', 'held'), held)
+    registry.hold('session-1', [('cols', 'held')])
+    registry.match_indexes({'held.xlsx': held}, ['Name'], ['Student Name']) # Held through its file
+    registry.put(('cols', 'loose'), loose)
+    assert registry.get(('cols', 'held')) is held and registry.get(('cols', 'loose')) is None
+    assert registry.summary()['indexes'] == 1
+
+    registry.release('session-1')
+    registry.put(('cols', 'loose'), loose)
+    assert registry.get(('cols', 'held')) is None and registry.get(('cols', 'loose')) is loose
+
+def test_holds_lapse_after_ttl():
+    registry = CorpusRegistry(max_bytes=0)
+    registry.hold('session-1', [('cols', 'abc')])
+    sheets = registry.put(('cols', 'abc'), _sheets(['Rahul Sharma']))
+    assert registry.key_of(sheets) == ('cols', 'abc')
+    registry.hold_ttl_seconds = -1
+    registry.hold('session-2', [])
+    assert len(registry) == 0 and registry.summary()['sessions'] == 0
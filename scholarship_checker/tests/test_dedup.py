@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from rapidfuzz import fuzz, process
+from scholarship_checker.benchmarks.synthetic import add_typo, generate_students
+from scholarship_checker.src.dedup import find_duplicate_groups, _star_clusters
+
+def _client():
+    return {
+        'Applicants': pd.DataFrame({'Name': ['Rahul Sharma', 'Priya Verma', '  rahul  SHARMA', None, 'Amit Kumar'], 'Marks': [1, 2, 3, 4, 5]}),
+        'Late': pd.DataFrame({'Name': ['Sharma Rahul', 'Amit Kumarr', 'Zoya Akhtar'], 'Marks': [6, 7, 8]}),
+    }
+
+def test_star_clusters_do_not_chain():
+    # 0~1~2~3 is a chain; 1 has the most rows, so it takes 0 and 2, and 3 (which only matches 2) stays alone
+    centres = _star_clusters(5, np.array([(0, 1), (1, 2), (2, 3)]), [1, 3, 1, 1, 1])
+    assert centres.tolist() == [1, 1, 1, 3, 4]
+
+@pytest.mark.parametrize("method", ["sorted_neighbourhood", "blocked"])
+def test_groups_exact_and_fuzzy_duplicates_across_sheets(method):
+    groups = find_duplicate_groups(_client(), ['Name'], method=method)
+    assert groups['cluster_id'].tolist() == [1, 1, 1, 2, 2]
+    assert groups['cluster_size'].tolist() == [3, 3, 3, 2, 2]
+    assert list(zip(groups['source_sheet'], groups['source_row'])) == [('Applicants', 0), ('Applicants', 2), ('Late', 0),
+                                                                     ('Applicants', 4), ('Late', 1)]
+    assert groups['Marks'].tolist() == [1, 3, 6, 5, 7]
+    assert groups.attrs['match_stats']['counters']['duplicate_groups'] == 2
+
+def test_finds_repeat_beneficiaries_across_db_files():
+    db_data = {
+        'db_2022.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Rahul Sharma', 'Neha Jain']})},
+        'db_2023.xlsx': {'Sheet1': pd.DataFrame({'Applicant Name': ['Neha Jain', 'Zoya Akhtar']}),
+                         'Other': pd.DataFrame({'Unrelated': ['x']})},
+    }
+    groups = find_duplicate_groups(db_data, ['Student Name'])
+    assert groups[['source_file', 'source_row', 'match_key']].values.tolist() == [['db_2022.xlsx', 1, 'neha jain'],
+                                                                                ['db_2023.xlsx', 0, 'neha jain']]
+
+def test_no_groups_and_bad_arguments():
+    groups = find_duplicate_groups({'Sheet1': pd.DataFrame({'Name': ['Rahul Sharma', 'Zoya Akhtar']})}, ['Name'])
+    assert groups.empty and 'cluster_id' in groups.columns
+    with pytest.raises(ValueError):
+        find_duplicate_groups(_client(), ['Name'], method="pairwise")
+
+def _typo_heavy_students(rows=3000, duplicates=600, seed=7):
+    """
+    Synthetic students (common Indian names, so many near-identical names of different
+    people) plus re-entered copies of some of them with a typo in the name.
+    """
+    rng = random.Random(seed)
+    students = generate_students(rows, seed=seed)
+    copies = students.sample(n=duplicates, random_state=seed).copy()
+    copies["Student Name"] = [add_typo(name, rng) for name in copies["Student Name"]]
+    return pd.concat([students, copies], ignore_index=True)
+
+def test_name_and_roll_groups_only_the_same_student():
+    students = _typo_heavy_students()
+    groups = find_duplicate_groups({'Sheet1': students}, ['Student Name', 'Roll No'])
+    assert groups.groupby('cluster_id')['Roll No'].nunique().max() == 1
+    # Nearly every re-entered student is found despite the typo
+    assert groups['Roll No'].nunique() >= 0.95 * 600
+
+def test_name_clusters_match_their_centre():
+    students = _typo_heavy_students()
+    groups = find_duplicate_groups({'Sheet1': students}, ['Student Name'])
+    assert groups['cluster_size'].max() < 50
+    for _, cluster in groups.groupby('cluster_id'):
+        keys = cluster['match_key'].unique().tolist()
+        scores = process.cdist(keys, keys, scorer=fuzz.WRatio)
+        # Some key of the cluster (its centre) matches every other key
+        assert (scores >= 85).all(axis=1).any()
@@ -0,0 +1,98 @@
+import gc
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from scholarship_checker.src import exporters
+from scholarship_checker.src.exporters import ExportCache, export_results
+
+def _results(rows=5):
+    return pd.DataFrame({
+        'Name': [f'Student {i}' for i in range(rows)],
+        'status': ['Duplicate Found' if i % 2 else 'Not Found' for i in range(rows)],
+        'match_score': [float(i) if i % 2 else np.nan for i in range(rows)],
+        'matched_row': pd.array([i if i % 2 else None for i in range(rows)], dtype='Int64'),
+    })
+
+def test_xlsx_export_round_trips_with_blanks_for_missing_values(tmp_path):
+    results = _results()
+    path = export_results(results, str(tmp_path / "results.xlsx"), chunk_rows=2)
+    exported = pd.read_excel(path, sheet_name=None)
+    assert list(exported) == ['Results']
+    sheet = exported['Results']
+    assert list(sheet.columns) == list(results.columns)
+    assert sheet['Name'].tolist() == results['Name'].tolist()
+    assert sheet['match_score'].isna().tolist() == results['match_score'].isna().tolist()
+    assert sheet['matched_row'].dropna().astype(int).tolist() == [1, 3]
+
+def test_xlsx_export_spills_onto_new_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporters, "XLSX_MAX_ROWS_PER_SHEET", 2)
+    path = export_results(_results(5), str(tmp_path / "results.xlsx"))
+    exported = pd.read_excel(path, sheet_name=None)
+    assert list(exported) == ['Results', 'Results_2', 'Results_3']
+    assert pd.concat(exported.values(), ignore_index=True)['Name'].tolist() == _results(5)['Name'].tolist()
+
+@pytest.mark.parametrize("output_format, reader", [("csv", pd.read_csv), ("parquet", pd.read_parquet)])
+def test_chunked_export_matches_the_frame(tmp_path, output_format, reader):
+    results = _results(7)
+    path = export_results(results, str(tmp_path / f"results.{output_format}"), chunk_rows=3)
+    assert reader(path)['Name'].tolist() == results['Name'].tolist()
+
+@pytest.mark.parametrize("output_format, reader", [("csv", lambda path: pd.read_csv(path, dtype=str)),
+                                                   ("parquet", pd.read_parquet),
+                                                   ("xlsx", lambda path: pd.concat(pd.read_excel(path, sheet_name=None, dtype=str).values(), ignore_index=True))])
+def test_writers_keep_the_columns_of_every_chunk(tmp_path, monkeypatch, output_format, reader):
+    monkeypatch.setattr(exporters, "XLSX_MAX_ROWS_PER_SHEET", 2)
+    path = str(tmp_path / f"results.{output_format}")
+    writer = exporters.open_result_writer(path, output_format)
+    writer.write(pd.DataFrame({'Name': ['Amit', 'Ravi'], 'status': ['Not Found', 'Not Found']}))
+    writer.write(pd.DataFrame({'Name': ['Neha'], 'Category': ['OBC'], 'status': ['Duplicate Found']}))
+    writer.write(pd.DataFrame({'Roll No': ['R-7'], 'Name': ['Sita, "S"'], 'status': ['Not Found']}))
+    writer.close()
+    exported = reader(path)
+    assert list(exported.columns) == ['Name', 'status', 'Category', 'Roll No']
+    assert exported['Name'].tolist() == ['Amit', 'Ravi', 'Neha', 'Sita, "S"']
+    assert exported['Category'].tolist()[2] == 'OBC' and exported['Roll No'].tolist()[3] == 'R-7'
+    assert exported['Category'].isna().tolist() == [True, True, False, True]
+    assert os.listdir(tmp_path) == [f"results.{output_format}"] # Part files are removed
+
+def test_export_cache_exports_once_and_deletes_with_the_frame(tmp_path):
+    cache = ExportCache(directory=str(tmp_path))
+    results = _results()
+    path = cache.get(results, "csv")
+    assert cache.get(results, "csv") == path
+    assert cache.get(results, "xlsx") != path
+    assert len(cache) == 2
+
+    del results
+    gc.collect()
+    assert not os.path.exists(path)
+    assert len(cache) == 0
+
+def test_export_cache_does_not_block_other_frames_on_a_slow_export(tmp_path, monkeypatch):
+    cache = ExportCache(directory=str(tmp_path))
+    slow_results, fast_results = _results(), _results()
+    slow_started, release_slow = threading.Event(), threading.Event()
+    original_export = exporters.export_results
+    def export(results_df, path, output_format):
+        if results_df is slow_results:
+            slow_started.set()
+            release_slow.wait(10)
+        original_export(results_df, path, output_format)
+    monkeypatch.setattr(exporters, 'export_results', export)
+
+    slow_paths = []
+    slow_thread = threading.Thread(target=lambda: slow_paths.append(cache.get(slow_results, "csv")))
+    slow_thread.start()
+    assert slow_started.wait(10)
+    assert os.path.exists(cache.get(fast_results, "csv")) # Returns while the other export is still running
+    release_slow.set()
+    slow_thread.join(10)
+    assert cache.get(slow_results, "csv") == slow_paths[0]
+    assert cache._export_locks == {}
+
+def test_export_cache_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError):
+        ExportCache(directory=str(tmp_path)).get(_results(), "json")
@@ -0,0 +1,92 @@
+import pandas as pd
+from scholarship_checker.src.incremental import IncrementalMatcher
+from scholarship_checker.src.matcher import find_duplicates
+from scholarship_checker.src.blocking import BlockingConfig
+
+RESULT_COLUMNS = ['status', 'matched_file', 'matched_sheet']
+
+def _client():
+    return {'Sheet1': pd.DataFrame({'Name': ['Priya Verma', 'Amit Kumarr', 'Zoya Akhtar', '', 'Rahul Sharma']})}
+
+def _db_files():
+    return {
+        'db_2022.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Rahul Sharma', 'Priya Verma']})},
+        'db_2023.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Amit Kumar', 'Priya Verma']})},
+        'db_2024.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Zoya Akhtar']})},
+    }
+
+def _assert_same_as_full_run(matcher, client, db_data, fuzzy_threshold, blocking=None):
+    incremental = matcher.results(fuzzy_threshold)
+    full = find_duplicates(client, ['Name'], db_data, ['Student Name'], fuzzy_threshold=fuzzy_threshold, blocking=blocking)
+    pd.testing.assert_frame_equal(incremental[RESULT_COLUMNS], full[RESULT_COLUMNS])
+    return incremental
+
+def test_adding_files_only_scores_unmatched_rows():
+    client, db_files = _client(), _db_files()
+    matcher = IncrementalMatcher(client, ['Name'], ['Student Name'])
+    db_data = {'db_2022.xlsx': db_files['db_2022.xlsx']}
+    matcher.sync_db_files(db_data)
+    first = _assert_same_as_full_run(matcher, client, db_data, 85)
+    assert first.attrs['pairs_scored'] == 4 # Four non-empty rows against one sheet
+
+    db_data = dict(db_data, **{'db_2023.xlsx': db_files['db_2023.xlsx']})
+    matcher.sync_db_files(db_data)
+    second = _assert_same_as_full_run(matcher, client, db_data, 85)
+    assert second.attrs['pairs_scored'] == 2 # Only 'Amit Kumarr' and 'Zoya Akhtar' were still unmatched
+    assert second['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Not Found", "Skipped (Empty Client Data)", "Duplicate Found"]
+
+def test_removing_a_file_reevaluates_only_its_rows():
+    client, db_data = _client(), _db_files()
+    matcher = IncrementalMatcher(client, ['Name'], ['Student Name'])
+    matcher.sync_db_files(db_data)
+    _assert_same_as_full_run(matcher, client, db_data, 85)
+
+    del db_data['db_2022.xlsx']
+    matcher.sync_db_files(db_data)
+    results = _assert_same_as_full_run(matcher, client, db_data, 85)
+    # 'Priya Verma' and 'Rahul Sharma' had matched db_2022; only they were scored against db_2023 and db_2024
+    assert results.attrs['pairs_scored'] == 3
+    assert results['matched_file'].iloc[0] == 'db_2023.xlsx'
+
+def test_threshold_changes_reuse_cached_scores():
+    client, db_data = _client(), _db_files()
+    matcher = IncrementalMatcher(client, ['Name'], ['Student Name'], blocking=BlockingConfig())
+    matcher.sync_db_files(db_data)
+    _assert_same_as_full_run(matcher, client, db_data, 85, blocking=BlockingConfig())
+    lowered = _assert_same_as_full_run(matcher, client, db_data, 40, blocking=BlockingConfig())
+    assert lowered.attrs['pairs_scored'] == 0
+    strict = _assert_same_as_full_run(matcher, client, db_data, 100, blocking=BlockingConfig())
+    assert strict.loc[1, 'status'] == "Not Found"
+
+def test_replaced_file_is_rescored_and_order_follows_db_data():
+    client, db_files = _client(), _db_files()
+    matcher = IncrementalMatcher(client, ['Name'], ['Student Name'])
+    db_data = {'db_2023.xlsx': db_files['db_2023.xlsx'], 'db_2022.xlsx': db_files['db_2022.xlsx']}
+    matcher.sync_db_files(db_data)
+    assert matcher.results(85)['matched_file'].iloc[0] == 'db_2023.xlsx'
+
+    db_data = {'db_2022.xlsx': db_files['db_2022.xlsx'], 'db_2023.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Zoya Akhtar']})}}
+    matcher.sync_db_files(db_data)
+    assert matcher.db_file_names == ['db_2022.xlsx', 'db_2023.xlsx']
+    _assert_same_as_full_run(matcher, client, db_data, 85)
+    assert matcher.is_for(client, ['Name'], ['Student Name'])
+    assert not matcher.is_for(client, ['Name'], ['Roll No'])
+
+def test_reloaded_files_with_the_same_content_key_keep_their_scores():
+    client, db_data = _client(), _db_files()
+    content_keys = {'db_2022.xlsx': 'a', 'db_2023.xlsx': 'b', 'db_2024.xlsx': 'c'}
+    matcher = IncrementalMatcher(client, ['Name'], ['Student Name'], content_key=lambda file_name, sheets_dict: content_keys[file_name])
+    matcher.sync_db_files(db_data)
+    _assert_same_as_full_run(matcher, client, db_data, 85)
+
+    # Reloaded with a display column: new frames, same bytes and match columns
+    db_data = {file_name: {sheet_name: df.assign(Marks=1) for sheet_name, df in sheets.items()} for file_name, sheets in _db_files().items()}
+    matcher.sync_db_files(db_data)
+    assert _assert_same_as_full_run(matcher, client, db_data, 85).attrs['pairs_scored'] == 0
+
+    # Other bytes under the same name are scored again: the four rows against db_2022, then
+    # 'Priya Verma', which it no longer has, against db_2023 for the first time
+    content_keys['db_2022.xlsx'] = 'a2'
+    db_data = dict(db_data, **{'db_2022.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Rahul Sharma']})}})
+    matcher.sync_db_files(db_data)
+    assert _assert_same_as_full_run(matcher, client, db_data, 85).attrs['pairs_scored'] == 5
@@ -0,0 +1,58 @@
+import logging
+import pandas as pd
+from scholarship_checker.src.instrumentation import MatchStats, STAGES
+from scholarship_checker.src.matcher import find_duplicates
+from scholarship_checker.src.incremental import IncrementalMatcher
+
+def _inputs():
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['Priya Verma', 'Amit Kumarr', 'Zoya Akhtar', '']})}
+    db_data = {'db_2022.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Priya Verma', 'Amit Kumar', 'Rahul Sharma']})}}
+    return client_data, db_data
+
+def test_match_stats_accumulates_and_orders_stages():
+    stats = MatchStats()
+    stats.add_time("write", 0.5)
+    stats.add_time("fuzzy_scoring", 1.0)
+    stats.add_time("parse", 2.0)
+    stats.count("exact_hits", 3)
+    stats.merge({"timings": {"parse": 1.0}, "counters": {"exact_hits": 2, "fuzzy_hits": 1}})
+    assert list(stats.ordered_timings()) == ["parse", "fuzzy_scoring", "write"]
+    assert stats.timings["parse"] == 3.0
+    assert stats.counters == {"exact_hits": 5, "fuzzy_hits": 1}
+    assert stats.timings_frame()["share"].tolist() == ["67%", "22%", "11%"]
+
+def test_find_duplicates_reports_stage_timings_and_counters():
+    client_data, db_data = _inputs()
+    results = find_duplicates(client_data, ['Name'], db_data, ['Student Name'])
+    match_stats = results.attrs['match_stats']
+    assert set(match_stats['timings']) >= set(STAGES) - {"parse"}
+    counters = match_stats['counters']
+    assert counters['rows: Duplicate Found'] == 2
+    assert counters['rows: Not Found'] == 1
+    assert counters['rows: Skipped (Empty Client Data)'] == 1
+    assert counters['exact_hits'] == 1
+    assert counters['fuzzy_queries'] == 2
+    assert counters['fuzzy_comparisons'] == 6 # Two fuzzy queries against three DB rows
+    assert counters['db_rows_indexed'] == 3
+
+def test_stats_accumulate_over_calls_and_match_incremental():
+    client_data, db_data = _inputs()
+    stats = MatchStats()
+    find_duplicates(client_data, ['Name'], db_data, ['Student Name'], stats=stats)
+    find_duplicates(client_data, ['Name'], db_data, ['Student Name'], stats=stats)
+    assert stats.counters['client_rows'] == 8
+
+    matcher = IncrementalMatcher(client_data, ['Name'], ['Student Name'])
+    matcher.sync_db_files(db_data)
+    counters = matcher.results(85).attrs['match_stats']['counters']
+    assert counters['rows: Duplicate Found'] == 2
+    assert counters['pairs_scored'] == 3
+    assert matcher.results(85).attrs['match_stats']['counters']['pairs_scored'] == 0
+
+def test_row_match_logging_is_opt_in(caplog):
+    client_data, db_data = _inputs()
+    with caplog.at_level(logging.INFO):
+        find_duplicates(client_data, ['Name'], db_data, ['Student Name'])
+        assert "Match found for client row" not in caplog.text
+        find_duplicates(client_data, ['Name'], db_data, ['Student Name'], log_row_matches=True)
+    assert caplog.text.count("Match found for client row") == 2
@@ -0,0 +1,89 @@
+import pandas as pd
+from scholarship_checker.src import jobs
+from scholarship_checker.src.incremental import IncrementalMatcher
+from scholarship_checker.src.jobs import IncrementalMatchJob, MatchJob, iter_client_chunks
+from scholarship_checker.src.matcher import find_duplicates
+
+RESULT_COLUMNS = ['Name', 'status', 'matched_file', 'matched_sheet']
+
+def _inputs():
+    client_data = {
+        'Applicants': pd.DataFrame({'Name': ['Priya Verma', 'Amit Kumarr', 'Zoya Akhtar', '', 'Rahul Sharma']}),
+        'Notes': pd.DataFrame({'Remarks': ['no name column']}),
+        'Late': pd.DataFrame({'Name': ['Amit Kumar', 'Neha Jain']}),
+    }
+    db_data = {
+        'db_2022.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Rahul Sharma', 'Priya Verma']})},
+        'db_2023.xlsx': {'Sheet1': pd.DataFrame({'Student Name': ['Amit Kumar']})},
+    }
+    return client_data, db_data
+
+def test_iter_client_chunks_skips_tables_without_the_columns():
+    client_data, _ = _inputs()
+    chunks = list(iter_client_chunks(client_data, ['Name'], chunk_rows=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1, 2]
+
+def test_job_results_equal_a_single_run():
+    client_data, db_data = _inputs()
+    job = MatchJob(client_data, ['Name'], db_data, ['Student Name'], chunk_rows=2, fuzzy_threshold=85).start()
+    job.join()
+    expected = find_duplicates(client_data, ['Name'], db_data, ['Student Name'], fuzzy_threshold=85)
+    results = job.results()
+    # Chunks without any match hold None rather than NaN in matched_file/matched_sheet
+    pd.testing.assert_frame_equal(results[RESULT_COLUMNS].fillna(''), expected[RESULT_COLUMNS].fillna(''), check_dtype=False)
+    progress = job.progress()
+    assert progress['state'] == "done"
+    assert (progress['rows_done'], progress['rows_total'], progress['fraction']) == (7, 7, 1.0)
+    assert progress['eta_seconds'] is None
+    assert results.attrs['match_stats']['counters']['client_rows'] == 7
+
+def test_cancelled_job_keeps_partial_results(monkeypatch):
+    client_data, db_data = _inputs()
+    job = MatchJob(client_data, ['Name'], db_data, ['Student Name'], chunk_rows=2, fuzzy_threshold=85)
+    def cancel_after_first_chunk(*args, **kwargs):
+        job.cancel()
+        return find_duplicates(*args, **kwargs)
+    monkeypatch.setattr(jobs, 'find_duplicates', cancel_after_first_chunk)
+    job.start().join()
+    assert job.progress()['state'] == "cancelled"
+    assert job.results()['Name'].tolist() == ['Priya Verma', 'Amit Kumarr']
+
+def test_failed_job_reports_the_error():
+    client_data, _ = _inputs()
+    job = MatchJob(client_data, ['Name'], {'broken.xlsx': None}, ['Student Name']).start()
+    job.join()
+    assert job.progress()['state'] == "failed"
+    assert job.progress()['error']
+    assert job.results().empty
+
+def test_worker_pool_is_started_once_per_job(monkeypatch):
+    client_data, db_data = _inputs()
+    pools, match_worker_pool = [], jobs.match_worker_pool
+    def counting_pool(*args):
+        pools.append(match_worker_pool(*args))
+        return pools[-1]
+    monkeypatch.setattr(jobs, 'match_worker_pool', counting_pool)
+    job = MatchJob(client_data, ['Name'], db_data, ['Student Name'], chunk_rows=2, fuzzy_threshold=85, workers=2).start()
+    job.join()
+    expected = find_duplicates(client_data, ['Name'], db_data, ['Student Name'], fuzzy_threshold=85)
+    pd.testing.assert_frame_equal(job.results()[RESULT_COLUMNS].fillna(''), expected[RESULT_COLUMNS].fillna(''), check_dtype=False)
+    assert len(pools) == 1
+
+def test_incremental_job_equals_the_matcher_results():
+    client_data, db_data = _inputs()
+    matcher = IncrementalMatcher(client_data, ['Name'], ['Student Name'])
+    job = IncrementalMatchJob(matcher, db_data, 85, chunk_rows=2).start()
+    job.join()
+    expected = find_duplicates(client_data, ['Name'], db_data, ['Student Name'], fuzzy_threshold=85)
+    pd.testing.assert_frame_equal(job.results()[RESULT_COLUMNS].fillna(''), expected[RESULT_COLUMNS].fillna(''), check_dtype=False)
+    assert (job.progress()['state'], job.progress()['rows_done'], job.progress()['rows_total']) == ("done", 7, 7)
+    assert matcher.db_file_names == list(db_data)
+
+def test_cancelled_incremental_job_keeps_the_rows_before_the_cancel():
+    client_data, db_data = _inputs()
+    matcher = IncrementalMatcher(client_data, ['Name'], ['Student Name'])
+    job = IncrementalMatchJob(matcher, db_data, 85, chunk_rows=2)
+    job._record_progress = lambda rows_done: job.cancel()
+    job.start().join()
+    assert job.progress()['state'] == "cancelled"
+    assert job.results()['Name'].tolist() == ['Priya Verma', 'Amit Kumarr']
@@ -0,0 +1,84 @@
+import io
+
+import numpy as np
+import pandas as pd
+from scholarship_checker.src.match_store import MatchStore, mapped_columns
+from scholarship_checker.src.matcher import find_duplicates
+
+def _db_sheets():
+    return {
+        'Sheet1': pd.DataFrame({'Student Name': ['  Rahul  SHARMA', 'Priya Verma', None], 'Roll No': [101, np.nan, 103],
+                                'DOB': pd.to_datetime(['2001-05-03', '2002-11-20', None]), 'Mobile': [9876543210.0, np.nan, 9123456789.0],
+                                'Marks': [91, 78, 66]}),
+        'Notes': pd.DataFrame({'Remarks': ['no match columns']}),
+    }
+
+def _workbook_bytes(sheets):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return buffer.getvalue()
+
+def test_mapped_columns_keeps_columns_with_a_standard_name():
+    assert mapped_columns(['Student Name', 'Marks', 'Roll No', 'Remarks']) == ['Student Name', 'Roll No']
+
+def test_stored_sheets_match_like_the_parsed_workbook(tmp_path):
+    store = MatchStore(str(tmp_path / "store.sqlite"))
+    store.ingest('db_2022.xlsx', _db_sheets(), 'digest')
+    client_data = {'Applicants': pd.DataFrame({'Name': ['rahul sharma', 'Priya Vermaa', 'Zoya Akhtar'], 'Roll': [101, 102, 103]})}
+    client_data['Applicants']['DOB'] = ['2001-05-03', '2002-11-21', None]
+    client_data['Applicants']['Mobile'] = ['+91 98765 43210', None, '9123456789']
+    for client_columns, db_columns in ((['Name'], ['Student Name']), (['Name', 'Roll'], ['Student Name', 'Roll No']),
+                                       (['DOB'], ['DOB']), (['Mobile'], ['Mobile'])):
+        expected = find_duplicates(client_data, client_columns, {'db_2022.xlsx': _db_sheets()}, db_columns)
+        stored = find_duplicates(client_data, client_columns, store.load(db_columns), db_columns)
+        pd.testing.assert_frame_equal(stored, expected)
+    # Dates are stored as the matcher spells them, so an exact date still scores 100
+    best = find_duplicates(client_data, ['DOB'], store.load(['Student Name', 'DOB']), ['DOB'], fuzzy_threshold=100, match_mode="best")
+    assert best['status'].tolist()[0] == "Duplicate Found" and best['match_score'].tolist()[0] == 100
+
+def test_load_round_trips_any_text(tmp_path):
+    store = MatchStore(str(tmp_path / "store.sqlite"))
+    names = ['Zoë "Z" O\'Neil', None, 'tab\there\nnewline', '\u0930\u093e\u0939\u0941\u0932', '']
+    store.ingest('db.xlsx', {'Sheet1': pd.DataFrame({'Name': names, 'Roll No': [None, None, 7, None, 9]})}, 'digest')
+    loaded = store.load(['Name', 'Roll No'])['db.xlsx']['Sheet1']
+    assert loaded['Name'].tolist()[2:] == names[2:] and loaded['Name'].tolist()[0] == names[0] and pd.isna(loaded['Name'][1])
+    assert loaded['Roll No'].isna().tolist() == [True, True, False, True, False]
+
+def test_store_persists_and_skips_unchanged_files(tmp_path):
+    path = str(tmp_path / "store.sqlite")
+    content = _workbook_bytes(_db_sheets())
+    store = MatchStore(path)
+    assert store.ingest_file('db_2022.xlsx', content)
+    store.close()
+
+    store = MatchStore(path)
+    assert not store.ingest_file('db_2022.xlsx', content)
+    assert store.files()[['file_name', 'sheets', 'rows']].values.tolist() == [['db_2022.xlsx', 1, 3]]
+    assert list(store.headers()['db_2022.xlsx']['Sheet1'].columns) == ['Student Name', 'Roll No', 'DOB', 'Mobile']
+    # Display values are kept as parsed, not normalized
+    assert store.load(['Student Name'])['db_2022.xlsx']['Sheet1']['Student Name'].iloc[0] == '  Rahul  SHARMA'
+
+    # Asking for a column that is not stored yet re-ingests the unchanged file; asking for one it lacks does not
+    assert store.ingest_file('db_2022.xlsx', content, columns=['Marks'])
+    assert list(store.headers()['db_2022.xlsx']['Sheet1'].columns) == ['Student Name', 'Roll No', 'DOB', 'Mobile', 'Marks']
+    assert store.load(['Marks'])['db_2022.xlsx']['Sheet1']['Marks'].tolist() == ['91', '78', '66']
+    assert not store.ingest_file('db_2022.xlsx', content, columns=['Marks', 'Unknown'])
+
+def test_changed_files_replace_the_stored_copy(tmp_path):
+    store = MatchStore(str(tmp_path / "store.sqlite"))
+    store.ingest_file('db_2022.xlsx', _workbook_bytes(_db_sheets()))
+    loaded = store.load(['Student Name'])
+    assert store.load(['Student Name'])['db_2022.xlsx'] is loaded['db_2022.xlsx']
+    assert store.key_of(loaded['db_2022.xlsx']) == ('db_2022.xlsx', store.file_hash('db_2022.xlsx'))
+    assert store.key_of(_db_sheets()) is None
+
+    store.ingest_file('db_2022.xlsx', _workbook_bytes({'Sheet1': pd.DataFrame({'Student Name': ['Amit Kumar']})}))
+    reloaded = store.load(['Student Name'])
+    assert reloaded['db_2022.xlsx'] is not loaded['db_2022.xlsx']
+    assert reloaded['db_2022.xlsx']['Sheet1']['Student Name'].tolist() == ['Amit Kumar']
+
+    store.remove_file('db_2022.xlsx')
+    assert store.load(['Student Name']) == {}
+    assert store.files().empty
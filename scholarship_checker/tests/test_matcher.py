@@ -1,29 +1,176 @@
-# Placeholder for matcher tests
-# Future tests for find_duplicates would go here.
-# These tests would likely be more complex, requiring mock DataFrames for client and DB data.
-
-# Example structure:
-# import pandas as pd
-# from scholarship_checker.src.matcher import find_duplicates
-# from scholarship_checker.src.column_utils import DEFAULT_MAPPING_RULES
-
-# def test_find_duplicates_no_match():
-#     client_data = {'Sheet1': pd.DataFrame({'Name': ['Alice'], 'ID': [1]})}
-#     selected_client_cols = ['Name', 'ID']
-#     db_data = {'DB1': {'Sheet1': pd.DataFrame({'Student Name': ['Bob'], 'Roll': [2]})}}
-#     selected_db_cols = ['Student Name', 'Roll']
-#     results = find_duplicates(client_data, selected_client_cols, db_data, selected_db_cols)
-#     # Assertions: e.g., results['status'] should be 'Not Found' for Alice
-#     pass
-
-# def test_find_duplicates_exact_match():
-#     # ... setup data for an exact match ...
-#     pass
-
-# def test_find_duplicates_fuzzy_match():
-#     # ... setup data for a fuzzy match ...
-#     pass
-
-# def test_find_duplicates_multiple_columns():
-#     # ... setup data for matching on two columns ...
-#     pass
+import pandas as pd
+import pytest
+from scholarship_checker.src.matcher import find_duplicates, build_db_match_indexes, score_fuzzy_batch, score_fuzzy_top_k, db_columns_to_load
+from scholarship_checker.src.blocking import BlockingConfig
+
+def _db():
+    return {
+        'db_2022.xlsx': {
+            'Sheet1': pd.DataFrame({'Student Name': ['Rahul Sharma', 'Priya Verma'], 'Roll No': ['2022UCS101', '2022UCS102']}),
+        },
+        'db_2023.xlsx': {
+            'Sheet1': pd.DataFrame({'Student Name': ['Amit Kumar', 'Priya Verma'], 'Roll No': ['2023UEC201', '2022UCS102']}),
+            'Other': pd.DataFrame({'Unrelated': ['x']}),
+        },
+    }
+
+def test_find_duplicates_no_match():
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['Zoya Akhtar']})}
+    results = find_duplicates(client_data, ['Name'], _db(), ['Student Name'])
+    assert results['status'].tolist() == ["Not Found"]
+    assert results['matched_file'].isna().all()
+
+def test_find_duplicates_exact_match():
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['  AMIT   kumar ']})}
+    results = find_duplicates(client_data, ['Name'], _db(), ['Student Name'])
+    assert results.loc[0, 'status'] == "Duplicate Found"
+    assert results.loc[0, 'matched_file'] == 'db_2023.xlsx'
+    assert results.loc[0, 'matched_sheet'] == 'Sheet1'
+
+def test_find_duplicates_fuzzy_match():
+    client_data = [pd.DataFrame({'Name': ['Rahul Sharmaa', 'Rahul Sharmaa']})]
+    results = find_duplicates(client_data, ['Name'], _db(), ['Student Name'], fuzzy_threshold=85)
+    assert results['status'].tolist() == ["Duplicate Found", "Duplicate Found"]
+    strict = find_duplicates(client_data, ['Name'], _db(), ['Student Name'], fuzzy_threshold=100)
+    assert strict['status'].tolist() == ["Not Found", "Not Found"]
+
+def test_find_duplicates_first_file_wins():
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['Priya Verma']})}
+    results = find_duplicates(client_data, ['Name'], _db(), ['Student Name'])
+    assert results.loc[0, 'matched_file'] == 'db_2022.xlsx'
+
+def test_find_duplicates_multiple_columns():
+    client_data = {'Sheet1': pd.DataFrame({'Applicant Name': ['Priya Verma', 'Priya Verma'], 'Roll Number': ['2022UCS102', '1999XYZ999']})}
+    results = find_duplicates(client_data, ['Applicant Name', 'Roll Number'], _db(), ['Student Name', 'Roll No'], fuzzy_threshold=95)
+    assert results['status'].tolist() == ["Duplicate Found", "Not Found"]
+
+def test_find_duplicates_skips_empty_client_rows():
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['   ', 'Amit Kumar'], 'Extra': [1, 2]})}
+    results = find_duplicates(client_data, ['Name'], _db(), ['Student Name'])
+    assert results['status'].tolist() == ["Skipped (Empty Client Data)", "Duplicate Found"]
+    assert results['Extra'].tolist() == [1, 2]
+
+def test_find_duplicates_no_columns_selected():
+    assert find_duplicates({'Sheet1': pd.DataFrame({'Name': ['a']})}, [], _db(), ['Student Name']).empty
+
+def test_prebuilt_indexes_are_reused():
+    indexes = build_db_match_indexes(_db(), ['Name'], ['Student Name'])
+    # The 'Other' sheet has no usable column and is left out
+    assert [(i.file_name, i.sheet_name) for i in indexes] == [('db_2022.xlsx', 'Sheet1'), ('db_2023.xlsx', 'Sheet1')]
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['Amit Kumar']})}
+    results = find_duplicates(client_data, ['Name'], {}, ['Student Name'], db_match_indexes=indexes)
+    assert results.loc[0, 'matched_file'] == 'db_2023.xlsx'
+
+def test_exact_index_returns_every_matching_row():
+    db = {'db.xlsx': {'Sheet1': pd.DataFrame({'Name': ['Amit Kumar', 'Neha Jain', ' AMIT  KUMAR']})}}
+    index = build_db_match_indexes(db, ['Name'], ['Name'])[0]
+    assert index.lookup_exact('amit kumar') == [0, 2]
+    assert index.first_exact('amit kumar') == 0
+    assert index.lookup_exact('nobody') == []
+    assert index.first_exact('nobody') is None
+
+def test_score_fuzzy_batch_matches_extract_one():
+    from rapidfuzz import fuzz, process
+    queries = ['rahul sharmaa', 'priya varma', 'zoya akhtar', 'amit kumar']
+    choices = ['amit kumar', 'rahul sharma', 'priya verma', 'rahul sharma']
+    for threshold in (0, 60, 85, 100):
+        best_choice, best_score = score_fuzzy_batch(queries, choices, threshold)
+        for query, choice, score in zip(queries, best_choice, best_score):
+            expected = process.extractOne(query, choices, scorer=fuzz.WRatio, score_cutoff=threshold)
+            if expected is None:
+                assert choice == -1
+            else:
+                assert choice == expected[2]
+                assert abs(score - expected[1]) < 1e-3
+
+def test_fuzzy_skips_missing_db_keys():
+    db = {'db.xlsx': {'Sheet1': pd.DataFrame({'Name': [None, 'Rahul Sharma']})}}
+    index = build_db_match_indexes(db, ['Name'], ['Name'])[0]
+    positions, _ = index.best_fuzzy(['rahul sharmaa'], 85)
+    assert positions.tolist() == [1]
+
+def test_parallel_matching_keeps_first_file_order(monkeypatch):
+    from scholarship_checker.src import matcher
+    monkeypatch.setattr(matcher, 'PARALLEL_CHUNK_ROWS', 2)
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['Priya Verma', 'Amit Kumar', '', 'Zoya Akhtar', 'Rahul Sharmaa']})}
+    sequential = find_duplicates(client_data, ['Name'], _db(), ['Student Name'])
+    parallel = find_duplicates(client_data, ['Name'], _db(), ['Student Name'], workers=2)
+    pd.testing.assert_frame_equal(sequential, parallel)
+    assert parallel['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Skipped (Empty Client Data)", "Not Found", "Duplicate Found"]
+    assert parallel['matched_file'].iloc[[0, 1, 4]].tolist() == ['db_2022.xlsx', 'db_2023.xlsx', 'db_2022.xlsx']
+    # Rows matched in the first file are not looked up or scored again in later ones
+    assert parallel.attrs['match_stats']['counters'] == sequential.attrs['match_stats']['counters']
+    assert parallel.attrs['blocking_report'] == sequential.attrs['blocking_report']
+
+def test_results_are_columnar_and_leave_client_frame_untouched():
+    client_df = pd.DataFrame({'Name': ['Amit Kumar', 'Zoya Akhtar'], 'Marks': [91, 78]}, index=[10, 11])
+    second_df = pd.DataFrame({'Name': ['Neha Jain'], 'Category': ['OBC']})
+    results = find_duplicates([client_df, second_df], ['Name'], _db(), ['Student Name'])
+    assert list(results.columns) == ['Name', 'Marks', 'status', 'matched_file', 'matched_sheet', 'Category']
+    assert results.index.tolist() == [0, 1, 2]
+    assert results['status'].tolist() == ["Duplicate Found", "Not Found", "Not Found"]
+    assert results['Marks'].iloc[:2].tolist() == [91, 78]
+    assert list(client_df.columns) == ['Name', 'Marks']
+    assert client_df.index.tolist() == [10, 11]
+
+def test_db_columns_to_load_resolves_each_sheet_from_headers():
+    headers = {
+        'db_2022.xlsx': {'Sheet1': pd.DataFrame(columns=['Student Name', 'Roll No', 'Address'])},
+        'db_2023.xlsx': {'Sheet1': pd.DataFrame(columns=['Name', 'Mobile'])},
+    }
+    # 'Name' and 'Student Name' standardize alike, so each sheet contributes its own column
+    assert db_columns_to_load(headers, ['Applicant Name'], ['Student Name'], extra_columns=['Address', 'Roll No']) == ['Student Name', 'Name', 'Address', 'Roll No']
+
+def test_score_fuzzy_top_k_first_column_equals_best_match():
+    queries = ['priya verma', 'amit kumarr', 'zoya akhtar']
+    choices = ['amit kumar', 'priya varma', 'priya verma', 'rahul sharma']
+    top_choice, top_score = score_fuzzy_top_k(queries, choices, 3, 60, workers=1)
+    best_choice, best_score = score_fuzzy_batch(queries, choices, 60, workers=1)
+    assert top_choice[:, 0].tolist() == best_choice.tolist()
+    assert top_score[:, 0].tolist() == best_score.tolist()
+    assert top_choice[0, :2].tolist() == [2, 1]
+    assert (top_score[:, :-1] >= top_score[:, 1:]).all()
+
+@pytest.mark.parametrize("blocking", [None, BlockingConfig()])
+def test_find_duplicates_best_mode_ranks_candidates_across_sheets(blocking):
+    client_data = {'Sheet1': pd.DataFrame({'Name': ['Priya Verma', 'Amit Kumarr', 'Zoya Akhtar', '']})}
+    first = find_duplicates(client_data, ['Name'], _db(), ['Student Name'], blocking=blocking)
+    best = find_duplicates(client_data, ['Name'], _db(), ['Student Name'], blocking=blocking,
+                           match_mode="best", top_k=2, db_detail_columns=['Roll No'])
+    assert best['status'].tolist() == first['status'].tolist()
+    # Equal scores keep the earlier file, so the exact hit in db_2022 ranks above the one in db_2023
+    assert best.loc[0, ['matched_file', 'matched_row', 'match_score']].tolist() == ['db_2022.xlsx', 1, 100.0]
+    assert best.loc[0, ['match_2_file', 'match_2_row', 'match_2_score']].tolist() == ['db_2023.xlsx', 1, 100.0]
+    assert best.loc[1, 'matched_file'] == 'db_2023.xlsx' and best.loc[1, 'match_score'] < 100
+    # Scores are rounded in float64, so they export as e.g. 95.24 rather than 95.239998
+    assert best['match_score'].dropna().tolist() == [round(score, 2) for score in best['match_score'].dropna()]
+    assert best.loc[1, 'match_score'] != int(best.loc[1, 'match_score'])
+    assert best['db_Roll No'].iloc[:2].tolist() == ['2022UCS102', '2023UEC201']
+    assert best['db_Roll No'].iloc[2:].isna().all()
+    assert best.loc[2:, 'matched_row'].isna().all()
+
+def test_find_duplicates_rejects_unknown_match_mode():
+    with pytest.raises(ValueError):
+        find_duplicates({'Sheet1': pd.DataFrame({'Name': ['x']})}, ['Name'], _db(), ['Student Name'], match_mode="all")
+
+def test_fields_plan_joins_identifiers_before_fuzzy_names():
+    client_data = {'Sheet1': pd.DataFrame({
+        'Name': ['Someone Else', 'Amit Kumarr', 'Zoya Akhtar', None],
+        'Roll Number': ['2023-uec-201', 'unknown', None, '2022 ucs 101'],
+    })}
+    results = find_duplicates(client_data, ['Name', 'Roll Number'], _db(), ['Student Name', 'Roll No'], match_plan="fields")
+    # Row 0 by roll number despite the name, row 1 by fuzzy name, row 3 by roll number without a name
+    assert results['status'].tolist() == ["Duplicate Found", "Duplicate Found", "Not Found", "Duplicate Found"]
+    assert results['matched_file'].tolist()[:2] == ['db_2023.xlsx', 'db_2023.xlsx']
+    assert results.loc[3, 'matched_file'] == 'db_2022.xlsx'
+    counters = results.attrs['match_stats']['counters']
+    assert counters['identifier_lookups'] == 3 and counters['identifier_hits'] == 2
+    assert counters['exact_lookups'] == 4 # Only the unresolved rows with a name, 'Amit Kumarr' and 'Zoya Akhtar', against both sheets
+
+def test_fields_plan_with_only_identifiers_does_no_fuzzy_scoring():
+    client_data = {'Sheet1': pd.DataFrame({'Roll No': ['2022UCS102', '2022UCS109', None]})}
+    results = find_duplicates(client_data, ['Roll No'], _db(), ['Roll No'], match_plan="fields")
+    assert results['status'].tolist() == ["Duplicate Found", "Not Found", "Skipped (Empty Client Data)"]
+    assert 'fuzzy_queries' not in results.attrs['match_stats']['counters']
+    with pytest.raises(ValueError):
+        find_duplicates(client_data, ['Roll No'], _db(), ['Roll No'], match_plan="fields", match_mode="best")
@@ -0,0 +1,79 @@
+import io
+import os
+import time
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from scholarship_checker.src.parse_cache import ParseCache, content_hash
+
+def test_content_hash_is_independent_of_container():
+    data = b"scholarship workbook bytes"
+    assert content_hash(data) == content_hash(io.BytesIO(data))
+
+def test_roundtrip_dict_of_sheets(tmp_path):
+    cache = ParseCache(cache_dir=str(tmp_path))
+    sheets = {'2022': pd.DataFrame({'Name': ['Amit', 'Neha'], 'Roll No': [101, 102]}),
+              'Mixed': pd.DataFrame({'Roll No': [101, 'A-102'], 7: ['x', 'y']})} # Needs the pickle fallback
+    cache.put('parse_excel', 'abc', sheets)
+    loaded = cache.get('parse_excel', 'abc')
+    assert list(loaded) == ['2022', 'Mixed']
+    for name in sheets:
+        assert_frame_equal(loaded[name], sheets[name], check_dtype=False)
+    assert cache.get('parse_excel', 'other') is None
+
+def test_entries_of_other_parser_versions_are_not_served(tmp_path, monkeypatch):
+    from scholarship_checker.src import parse_cache
+    cache = ParseCache(cache_dir=str(tmp_path))
+    cache.put('parse_excel', 'abc', {'Sheet1': pd.DataFrame({'Name': ['Amit']})})
+    monkeypatch.setattr(parse_cache, 'PARSER_VERSION', parse_cache.PARSER_VERSION + 1)
+    assert cache.get('parse_excel', 'abc') is None
+
+def test_roundtrip_list_keeps_source_attrs(tmp_path):
+    cache = ParseCache(cache_dir=str(tmp_path))
+    df = pd.DataFrame({'Name': ['Amit']})
+    df.attrs['source'] = "Page_1_Table_1"
+    cache.put('parse_pdf', 'abc', [df])
+    loaded = cache.get('parse_pdf', 'abc')
+    assert isinstance(loaded, list)
+    assert loaded[0].attrs['source'] == "Page_1_Table_1"
+
+def test_cached_parse_parses_once_and_skips_failures(tmp_path):
+    cache = ParseCache(cache_dir=str(tmp_path))
+    calls = []
+    def parse_excel(file_content, file_name):
+        calls.append(file_name)
+        return {'Sheet1': pd.DataFrame({'Name': ['Amit']})}
+    def parse_word(file_content, file_name):
+        calls.append(file_name)
+        return []
+    upload = io.BytesIO(b"same bytes")
+    cache.cached_parse(parse_excel, upload, 'a.xlsx')
+    result = cache.cached_parse(parse_excel, io.BytesIO(b"same bytes"), 'renamed.xlsx')
+    assert calls == ['a.xlsx']
+    assert result['Sheet1']['Name'].tolist() == ['Amit']
+    cache.cached_parse(parse_word, upload, 'a.docx')
+    cache.cached_parse(parse_word, upload, 'a.docx')
+    assert calls == ['a.xlsx', 'a.docx', 'a.docx']
+
+def test_lru_eviction_respects_size_cap(tmp_path):
+    cache = ParseCache(cache_dir=str(tmp_path), max_bytes=10**9)
+    big = {'Sheet1': pd.DataFrame({'Name': [f"student {i}" for i in range(2000)]})}
+    for digest in ('old', 'used', 'new'):
+        cache.put('parse_excel', digest, big)
+        time.sleep(0.01)
+    cache.get('parse_excel', 'old') # 'old' becomes the most recently used entry
+    new_entry = cache._entry_dir('parse_excel', 'new')
+    entry_size = sum(os.path.getsize(os.path.join(new_entry, f)) for f in os.listdir(new_entry))
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(cache._entry_dir('parse_excel', digest)) for digest in ('new', 'old'))
+
+def test_cached_parse_many_serves_hits_and_parses_misses(tmp_path):
+    cache = ParseCache(cache_dir=str(tmp_path))
+    def parse_excel(file_content, file_name):
+        return {'Sheet1': pd.DataFrame({'Name': [file_content.getvalue().decode()]})}
+    cache.cached_parse(parse_excel, io.BytesIO(b"cached"), 'a.xlsx')
+    files = [('a.xlsx', io.BytesIO(b"cached")), ('b.xlsx', io.BytesIO(b"fresh"))]
+    results = {position: (parsed, from_cache) for position, _, parsed, from_cache in cache.cached_parse_many(parse_excel, files, max_workers=1)}
+    assert results[0][1] is True and results[1][1] is False
+    assert results[1][0]['Sheet1']['Name'].tolist() == ['fresh']
+    assert cache.get('parse_excel', content_hash(b"fresh")) is not None
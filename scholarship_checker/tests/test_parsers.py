@@ -0,0 +1,164 @@
+import io
+import pandas as pd
+import pytest
+from scholarship_checker.src import parsers
+
+def _pdf_bytes(pages):
+    """
+    Minimal PDF writer: one ruled table per page, pages is a list of tables (lists of rows).
+    """
+    objects = []
+    def add(body):
+        objects.append(body)
+        return len(objects) # PDF object number
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for table in pages:
+        ops = []
+        top, height, width = 750, 20, 150
+        n_rows, n_cols = len(table), len(table[0])
+        for r in range(n_rows + 1):
+            y = top - r * height
+            ops.append(f"50 {y} m {50 + n_cols * width} {y} l S")
+        for c in range(n_cols + 1):
+            x = 50 + c * width
+            ops.append(f"{x} {top} m {x} {top - n_rows * height} l S")
+        for r, row in enumerate(table):
+            for c, text in enumerate(row):
+                ops.append(f"BT /F1 10 Tf {55 + c * width} {top - (r + 1) * height + 6} Td ({text}) Tj ET")
+        stream = "\n".join(ops).encode("latin-1")
+        contents = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 {font} 0 R >> >> /Contents {contents} 0 R >>".encode()))
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode()
+    objects[pages_obj - 1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+def _workbook_bytes():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        pd.DataFrame({'Student Name': ['Amit Kumar', 'Neha Jain'], 'Roll No': [101, 102]}).to_excel(writer, sheet_name='2022', index=False)
+        pd.DataFrame({'Name': ['Priya Verma']}).to_excel(writer, sheet_name='2023', index=False)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("calamine", [False, True])
+def test_parse_excel_reads_all_sheets(monkeypatch, calamine):
+    if calamine and not parsers.CALAMINE_AVAILABLE:
+        pytest.skip("python-calamine not installed")
+    monkeypatch.setattr(parsers, 'CALAMINE_AVAILABLE', calamine)
+    sheets = parsers.parse_excel(io.BytesIO(_workbook_bytes()), 'db.xlsx')
+    assert list(sheets) == ['2022', '2023']
+    assert sheets['2022']['Student Name'].tolist() == ['Amit Kumar', 'Neha Jain']
+    assert sheets['2022']['Roll No'].tolist() == [101, 102]
+
+def test_parse_excel_uses_upload_buffer_without_copy():
+    class Upload(io.BytesIO):
+        def getvalue(self):
+            raise AssertionError("the upload should not be copied")
+    upload = Upload(_workbook_bytes())
+    upload.seek(5) # A previous reader left the position mid-file
+    assert list(parsers.parse_excel(upload, 'db.xlsx')) == ['2022', '2023']
+
+def test_parse_excel_invalid_file_returns_empty_dict():
+    assert parsers.parse_excel(io.BytesIO(b"not a workbook"), 'broken.xlsx') == {}
+
+def test_parse_excel_headers_reads_preview_rows_only():
+    headers = parsers.parse_excel_headers(io.BytesIO(_workbook_bytes()), 'db.xlsx', preview_rows=1)
+    assert list(headers) == ['2022', '2023']
+    assert list(headers['2022'].columns) == ['Student Name', 'Roll No']
+    assert len(headers['2022']) == 1
+
+def test_parse_excel_columns_projects_and_compacts():
+    sheets = parsers.parse_excel_columns(io.BytesIO(_workbook_bytes()), 'db.xlsx', ['Roll No', 'Name'])
+    assert list(sheets['2022'].columns) == ['Roll No']
+    assert sheets['2022']['Roll No'].dtype == 'int8'
+    assert sheets['2023']['Name'].tolist() == ['Priya Verma']
+
+def test_compact_dtypes_keeps_values():
+    df = pd.DataFrame({'Category': ['SC', 'ST', 'SC', 'SC'], 'Name': ['a', 'b', 'c', None],
+                       'Mixed': pd.Series(['x', 1, 'y', 2], dtype=object), 'Amount': [1000, 2000, 3000, 4000]})
+    compact = parsers.compact_dtypes(df)
+    assert isinstance(compact['Category'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_string_dtype(compact['Name'].dtype)
+    assert compact['Mixed'].dtype == object
+    assert compact['Amount'].dtype == 'int16'
+    for column in df.columns:
+        assert compact[column].astype(str).tolist() == df[column].astype(str).tolist()
+
+def test_parse_files_concurrently_reports_every_position():
+    files = [(f"db_{i}.xlsx", io.BytesIO(_workbook_bytes())) for i in range(3)] + [("broken.xlsx", io.BytesIO(b"junk"))]
+    results = {position: (file_name, parsed) for position, file_name, parsed in parsers.parse_files_concurrently(parsers.parse_excel, files, max_workers=2)}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert [results[i][0] for i in range(4)] == [name for name, _ in files]
+    assert list(results[0][1]) == ['2022', '2023']
+    assert results[3][1] == {}
+
+def _merit_list_pdf(page_count):
+    return _pdf_bytes([[['Name', 'Roll No']] + [[f'Student {page}-{row}', f'{page:03d}{row:02d}'] for row in range(3)] for page in range(page_count)])
+
+def test_parse_pdf_labels_tables_by_page():
+    tables = parsers.parse_pdf(io.BytesIO(_merit_list_pdf(2)), 'merit.pdf', workers=1)
+    assert [df.attrs['source'] for df in tables] == ['Page_1_Table_1', 'Page_2_Table_1']
+    assert tables[1]['Name'].tolist() == ['Student 1-0', 'Student 1-1', 'Student 1-2']
+
+def test_parse_pdf_page_sharding_matches_sequential(monkeypatch):
+    monkeypatch.setattr(parsers, 'PDF_PARALLEL_MIN_PAGES', 2)
+    pdf_bytes = _merit_list_pdf(9)
+    sequential = parsers.parse_pdf(io.BytesIO(pdf_bytes), 'merit.pdf', workers=1)
+    sharded = parsers.parse_pdf(io.BytesIO(pdf_bytes), 'merit.pdf', workers=2)
+    assert [df.attrs['source'] for df in sharded] == [df.attrs['source'] for df in sequential]
+    for left, right in zip(sequential, sharded):
+        pd.testing.assert_frame_equal(left, right)
+
+def test_iter_pdf_tables_streams_per_page():
+    stream = parsers.iter_pdf_tables(io.BytesIO(_merit_list_pdf(3)), 'merit.pdf')
+    first = next(stream)
+    assert first.attrs['source'] == 'Page_1_Table_1'
+    assert [df.attrs['source'] for df in stream] == ['Page_2_Table_1', 'Page_3_Table_1']
+
+def test_invalid_pdf():
+    assert parsers.parse_pdf(io.BytesIO(b"not a pdf"), 'broken.pdf') == []
+    assert list(parsers.iter_pdf_tables(io.BytesIO(b"not a pdf"), 'broken.pdf')) == []
+
+def _word_bytes():
+    from docx import Document
+    doc = Document()
+    doc.add_paragraph("Merit list")
+    table = doc.add_table(rows=4, cols=3)
+    for row, values in enumerate([['Name', 'Roll No', 'Remarks'], ['Amit Kumar', '101', 'ok'], ['Neha Jain', '102', 'ok'], ['Priya Verma', '103', 'late']]):
+        for col, value in enumerate(values):
+            table.cell(row, col).text = value
+    table.cell(1, 2).merge(table.cell(2, 2)) # Vertical merge
+    table.cell(3, 1).merge(table.cell(3, 2)) # Horizontal merge
+    table.cell(0, 2).add_paragraph("(if any)")
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = "Only a header"
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def test_parse_word_fast_reader_matches_python_docx():
+    fast = list(parsers._iter_docx_tables_fast(io.BytesIO(_word_bytes())))
+    assert fast == list(parsers._iter_docx_tables_python_docx(io.BytesIO(_word_bytes())))
+    assert fast[0][2] == ['Neha Jain', '102', 'ok\nok'] # Merged cells repeat their text, as python-docx does
+
+def test_parse_word_builds_labelled_tables():
+    tables = parsers.parse_word(io.BytesIO(_word_bytes()), 'list.docx')
+    assert [df.attrs['source'] for df in tables] == ['Table_1', 'Table_2']
+    assert list(tables[0].columns) == ['Name', 'Roll No', 'Remarks\n(if any)']
+    assert tables[0]['Name'].tolist() == ['Amit Kumar', 'Neha Jain', 'Priya Verma']
+    assert tables[1].empty
+
+def test_parse_word_invalid_file():
+    assert parsers.parse_word(io.BytesIO(b"old binary .doc"), 'list.doc') == []